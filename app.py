@@ -15,7 +15,9 @@ from config.jwt import setup_jwt
 from config.mongo_uri import setup_mongo_uri
 from services.DataService import DataService
 from services.MovieQueryService import MovieQueryService
+from services.MovieSearchIndex import MovieSearchIndex
 from services.GenderStatisticsService import GenderStatisticsService
+from services.GenderStatisticsEngine import GenderStatisticsEngine
 from services.AggregationPipelineService import AggregationPipelineService
 from repositories.DBRepo import DBRepo
 from controllers.api.AccountController import AccountController
@@ -29,6 +31,8 @@ from models.MovieModel import MovieMetaData
 from models.CreditsModel import Credit
 from models.RatingsModel import Rating
 from models.GenderDataModel import GenderStatistics
+from models.ActorModel import Actor
+from models.GenderRollupModel import GenderRollup
 from routes.api.v1.account_router import create_account_blueprint
 from routes.api.v1.movie_router import create_movie_blueprint
 from routes.api.v1.credit_router import create_credit_blueprint
@@ -38,8 +42,11 @@ from routes.api.v1.health import health_blueprint
 from utils.JsonWebToken import JsonWebToken
 from services.GenerateHateoasLinks import GenerateHateoasLinks
 from utils.JsonConvert import JsonConvert
+from utils.TTLCache import TTLCache
+from utils.SQLiteCache import SQLiteCache
 from utils.CustomErrors import CustomError
-from seed.seed_db import seed_database
+from seed.seed_db import check_seed_status
+from seed.seed_state import get_seeded_at
 from pymongo.errors import ConnectionFailure
 
 # Load environment variables
@@ -105,20 +112,50 @@ check_mongo_connection()
 json_web_token = JsonWebToken(logger)
 generate_hateoas_links = GenerateHateoasLinks(logger, app)
 json_convert = JsonConvert(logger)
+count_cache = TTLCache(ttl=int(os.getenv("COUNT_CACHE_TTL", 60)))
 user_db_repo = DBRepo(User, logger)
 movie_db_repo = DBRepo(MovieMetaData, logger)
 credit_db_repo = DBRepo(Credit, logger)
 rating_db_repo = DBRepo(Rating, logger)
 gender_data_db_repo = DBRepo(GenderStatistics, logger)
-data_service = DataService(logger, gender_data_db_repo)
-movie_query_service = MovieQueryService(logger, movie_db_repo, credit_db_repo, rating_db_repo)
+actor_db_repo = DBRepo(Actor, logger)
+gender_rollup_db_repo = DBRepo(GenderRollup, logger)
+data_service = DataService(logger, movie_db_repo, rating_db_repo, credit_db_repo, gender_data_db_repo, actor_db_repo, gender_rollup_db_repo, batch_size=int(os.getenv("SEED_BATCH_SIZE", 1000)))
+
+# Movie search backend for title, description and genre filters: "regex" queries the database, "memory" uses an
+# in-memory inverted index built at startup
+movie_search_index = None
+if os.getenv("MOVIE_SEARCH_BACKEND", "regex") == "memory":
+    movie_search_index = MovieSearchIndex(logger, movie_db_repo)
+    movie_search_index.build()
+
+movie_query_service = MovieQueryService(logger, movie_db_repo, credit_db_repo, rating_db_repo, actor_db_repo, movie_search_index)
 aggregation_pipeline_service = AggregationPipelineService(logger)
-gender_statistics_service = GenderStatisticsService(logger, gender_data_db_repo, aggregation_pipeline_service)
+
+# Gender statistics only change when the database is reseeded, their aggregations are cached in process and, with
+# GENDER_STATS_CACHE_PATH set, in a SQLite file shared by the workers of the host
+gender_statistics_cache_ttl = int(os.getenv("GENDER_STATS_CACHE_TTL", 3600))
+gender_statistics_cache = TTLCache(ttl=gender_statistics_cache_ttl, maxsize=512)
+gender_statistics_shared_cache = None
+if os.getenv("GENDER_STATS_CACHE_PATH"):
+    gender_statistics_shared_cache = SQLiteCache(os.getenv("GENDER_STATS_CACHE_PATH"), ttl=gender_statistics_cache_ttl)
+
+# Gender statistics backend: "mongo" reads the seed-time rollups (or aggregates the collection), "numpy" loads the
+# gender statistics into an in-process columnar engine at startup
+gender_statistics_engine = None
+if os.getenv("GENDER_STATS_BACKEND", "mongo") == "numpy":
+    gender_statistics_engine = GenderStatisticsEngine(logger, gender_data_db_repo)
+
+gender_statistics_service = GenderStatisticsService(
+    logger, gender_data_db_repo, aggregation_pipeline_service, gender_rollup_db_repo, gender_statistics_engine,
+    gender_statistics_cache, gender_statistics_shared_cache, get_seeded_at
+)
+gender_statistics_service.refresh_engine()
 account_controller = AccountController(logger, json_web_token, User, user_db_repo, generate_hateoas_links)
-movie_controller = MovieController(logger, movie_db_repo, credit_db_repo, rating_db_repo, generate_hateoas_links, json_convert, data_service, movie_query_service)
+movie_controller = MovieController(logger, movie_db_repo, credit_db_repo, rating_db_repo, generate_hateoas_links, json_convert, data_service, movie_query_service, count_cache)
 user_controller = UserController(logger, user_db_repo)
-rating_controller = RatingController(logger, rating_db_repo, movie_db_repo, json_convert, generate_hateoas_links, movie_query_service)
-actor_controller = ActorController(logger, credit_db_repo, json_convert, generate_hateoas_links, movie_query_service, movie_db_repo)
+rating_controller = RatingController(logger, rating_db_repo, movie_db_repo, json_convert, generate_hateoas_links, movie_query_service, count_cache)
+actor_controller = ActorController(logger, credit_db_repo, json_convert, generate_hateoas_links, movie_query_service, movie_db_repo, actor_db_repo)
 gender_data_controller = GenderDataController(logger, gender_data_db_repo, gender_statistics_service, generate_hateoas_links)
 
 # Register the main router blueprint
@@ -139,8 +176,8 @@ app.register_blueprint(gender_statistics_blueprint, url_prefix='/api/v1')
 # Health check route
 app.register_blueprint(health_blueprint)
 
-# Seed the database with extracted movie data, if neccessary
-seed_database(data_service, logger)
+# Check that the database has been seeded, seeding runs as a separate job (python -m seed)
+check_seed_status(logger)
 
 # Log each request
 @app.before_request
@@ -0,0 +1,64 @@
+"""
+Benchmark the query behind GET /movies?genre=<genre>: the previous regex + materialize + $in approach against the
+$in on the indexed genres.name used now. Runs against the database configured in .env (a seeded one).
+
+Usage (from the project root):
+    python benchmarks/genre_filter.py [genre] [repetitions]
+"""
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.logger import get_logger
+from config.mongo_engine import connect_to_database
+from config.mongo_uri import setup_mongo_uri
+from repositories.DBRepo import DBRepo
+from models.MovieModel import MovieMetaData
+from models.CreditsModel import Credit
+from models.RatingsModel import Rating
+from models.ActorModel import Actor
+from services.MovieQueryService import MovieQueryService
+
+# The fields GET /movies returns
+MOVIE_LIST_FIELDS = ['id', 'movie_id', 'title', 'release_date', 'genres', 'overview']
+
+def previous_genre_query(movie_db_repo, genre):
+    """
+    The previous genre filter: a regex query materializing every matching movie, then its ids added back as an $in.
+    """
+    query = {'genres__name__icontains': genre}
+    movie_ids = [movie.movie_id for movie in movie_db_repo.find_by_query(query)]
+    query.update({'movie_id': {'$in': movie_ids}})
+    return query
+
+def time_it(label, build_query, movie_db_repo, repetitions):
+    started_at = time.perf_counter()
+    for _ in range(repetitions):
+        query = build_query()
+        # One page of results and the total, as served by GET /movies
+        page = list(movie_db_repo.find_by_query_with_pagination(query, page=1, per_page=20, fields=MOVIE_LIST_FIELDS))
+        total = movie_db_repo.count(query)
+    elapsed = (time.perf_counter() - started_at) / repetitions
+    print(f"{label:<10} {elapsed * 1000:8.1f} ms/request  ({total} movies, {len(page)} on the page)")
+    return elapsed
+
+if __name__ == "__main__":
+    genre = sys.argv[1] if len(sys.argv) > 1 else "Drama"
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    load_dotenv()
+    logger = get_logger()
+    connect_to_database(setup_mongo_uri(None))
+
+    movie_db_repo = DBRepo(MovieMetaData, logger)
+    movie_query_service = MovieQueryService(
+        logger, movie_db_repo, DBRepo(Credit, logger), DBRepo(Rating, logger), DBRepo(Actor, logger)
+    )
+
+    print(f"GET /movies?genre={genre}, average of {repetitions} requests")
+    before = time_it("before", lambda: previous_genre_query(movie_db_repo, genre), movie_db_repo, repetitions)
+    after = time_it("after", lambda: movie_query_service.build_query('movies', {'genre': genre}), movie_db_repo, repetitions)
+    print(f"Speed-up: {before / after:.1f}x")
@@ -0,0 +1,38 @@
+"""
+Micro-benchmark ast.literal_eval against utils.parse_literal on the stringified list/dict columns of the Kaggle CSVs.
+
+Usage (from the project root):
+    python benchmarks/literal_parsing.py [path/to/credits.csv] [rows]
+"""
+import ast
+import os
+import sys
+import time
+import pandas as pandas
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.parse_literal import parse_literal
+
+def time_it(label, parse, values):
+    started_at = time.perf_counter()
+    for value in values:
+        parse(value)
+    elapsed = time.perf_counter() - started_at
+    print(f"{label:<14} {elapsed:8.2f}s  {len(values) / elapsed:10.0f} values/s")
+    return elapsed
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "movie_data/credits.csv"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    credits_frame = pandas.read_csv(csv_path, nrows=rows)
+    values = [value for column in ('cast', 'crew') for value in credits_frame[column] if isinstance(value, str)]
+
+    # Both parsers must agree before timing means anything
+    mismatches = sum(1 for value in values if parse_literal(value) != ast.literal_eval(value))
+    print(f"Parsing {len(values)} cast/crew values from {csv_path} ({mismatches} mismatches)")
+
+    literal_eval = time_it("literal_eval", ast.literal_eval, values)
+    fast = time_it("parse_literal", parse_literal, values)
+    print(f"Speed-up: {literal_eval / fast:.1f}x")
@@ -1,12 +1,17 @@
 from flask import jsonify, make_response, request
 from utils.CustomErrors import CustomError  
 from utils.custom_status_codes import CREDIT_CUSTOM_STATUS_CODES
+from utils.pagination_cursor import encode_cursor, decode_cursor
 from bson import ObjectId
 
+# Fields of an actor used by the actor list
+ACTOR_LIST_FIELDS = ['person_id', 'name', 'movies']
+
 class ActorController:
-  def __init__(self, logger, credit_db_repo, json_convert, generate_hateoas_links, movie_query_service, movie_db_repo):
+  def __init__(self, logger, credit_db_repo, json_convert, generate_hateoas_links, movie_query_service, movie_db_repo, actor_db_repo):
     self.credit_db_repo = credit_db_repo
     self.movie_db_repo = movie_db_repo
+    self.actor_db_repo = actor_db_repo
     self.movie_query_service = movie_query_service
     self.json_convert = json_convert
     self.generate_hateoas_links = generate_hateoas_links
@@ -21,9 +26,13 @@ class ActorController:
       try:
         page = int(query_params.pop('page', 1))
         per_page = int(query_params.pop('per_page', 20))
+        # A cursor (empty for the first page) selects keyset pagination instead of page numbers
+        cursor = query_params.pop('cursor', None)
 
         if page < 1 or per_page < 1:
           raise ValueError("Page and per_page must be greater than 0")
+
+        after = decode_cursor(cursor) if cursor else None
       except ValueError:
         self.logger.error("Invalid pagination parameters")
         raise CustomError(CREDIT_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
@@ -34,52 +43,41 @@ class ActorController:
         # Validate the query parameters
         query = self.movie_query_service.build_query('actors', query_params)
         self.logger.info("Query built successfully")
-      
-        # Replace 'movie_id' with '_id' in the query for the credits collection
-        if 'movie_id' in query:
-          query['id'] = query.pop('movie_id')
-          self.logger.info("Replaced 'movie_id' with 'id' in the query for credits collection")
       else: 
         self.logger.info("Query parameters not provided, fetching all actors...")
         query = {}
 
-      credits = self.credit_db_repo.find_by_query_with_pagination(query, page=page, per_page=per_page)
+      # Actors are read from the actor collection, which is derived from the cast of the credits when seeding
+      next_cursor = None
+      if cursor is not None:
+        page = None
+        actors, next_position = self.actor_db_repo.find_by_query_with_cursor(query, after=after, per_page=per_page, fields=ACTOR_LIST_FIELDS)
+        next_cursor = encode_cursor(next_position) if next_position else None
+      else:
+        actors = list(self.actor_db_repo.find_by_query_with_pagination(query, page=page, per_page=per_page, fields=ACTOR_LIST_FIELDS))
 
-      if not credits:
-        self.logger.info("No credits found")
+      if not actors:
+        self.logger.info("No actors found")
         raise CustomError(CREDIT_CUSTOM_STATUS_CODES[404]["no_credits_found"], 404)
 
-      actor_dict = {}
-      actors_json = []
+      total = self.actor_db_repo.count(query)
 
-      # Extract actors from credits (as suggested by copilot)
-      for credit in credits:
-          movie = self.movie_db_repo.find_by_field('movie_id', credit.id)
+      actors_json = [
+        {
+          "id": actor.person_id,
+          "name": actor.name,
+          # An actor can have several roles in the same movie, each title is listed once
+          "movies_played": list(dict.fromkeys(movie.title for movie in actor.movies)),
+        }
+        for actor in actors
+      ]
 
-          if not movie:
-              continue
-    
-          # Filter actors based on query parameters, allow partial matches (as suggested by copilot)          
-          for cast_member in credit.cast:
-              if query_params.get('actor', '').lower() in cast_member.name.lower():
-                if cast_member.id not in actor_dict:
-                  actor_dict[cast_member.id] = {
-                      "id": cast_member.id,
-                      "name": cast_member.name,
-                      "movies_played": [],
-                  }
-                # Add the movie title to the movies_played list if not already present
-                if movie.title not in actor_dict[cast_member.id]["movies_played"]:
-                  actor_dict[cast_member.id]["movies_played"].append(movie.title)
-
-      actors_json = list(actor_dict.values())
-
-      pagination_links = self.generate_hateoas_links.create_pagination_links("credit.get_actors", page, per_page, len(actors_json))
+      pagination_links = self.generate_hateoas_links.create_pagination_links("credit.get_actors", page, per_page, total, next_cursor, filters=query_params)
       self.logger.info("Pagination links generated")
 
       response = {
         "message": "Actors fetched successfully",
-        "total": len(actors_json),
+        "total": total,
         "actors": actors_json,
         "_links": {
           **pagination_links
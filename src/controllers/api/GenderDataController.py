@@ -1,6 +1,8 @@
 from flask import request, jsonify, make_response
 from utils.CustomErrors import CustomError
 from utils.custom_status_codes import GENDER_DATA_CUSTOM_STATUS_CODES
+from utils.pagination_cursor import encode_cursor, decode_cursor
+from services.AggregationPipelineService import GENDER_DISTRIBUTION_DIMENSIONS
 
 class GenderDataController:
     def __init__(self, logger, gender_data_db_repo, gender_statistics_service, generate_hateoas_links):
@@ -21,6 +23,8 @@ class GenderDataController:
           # Extract and validate pagination parameters
           page = int(query_params.pop('page', 1))
           per_page = int(query_params.pop('per_page', 100))
+          # A cursor (empty for the first page) selects keyset pagination, deep pages then cost the same as the first one
+          cursor = query_params.pop('cursor', None)
 
           if page < 1 or per_page < 1:
             raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
@@ -28,12 +32,24 @@ class GenderDataController:
             self.logger.warning("per_page exceeds maximum limit of 100, setting to 100")
             per_page = 100
 
+          try:
+            after = decode_cursor(cursor) if cursor else None
+          except ValueError:
+            self.logger.error("Invalid pagination cursor")
+            raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
+
           # Fetch total records for pagination
           query = {}  
-          total_records = self.gender_data_db_repo.find_by_query(query).count()
+          total_records = self.gender_data_db_repo.count(query)
           self.logger.info(f"Total records found: {total_records}")
         
-          gender_data = self.gender_data_db_repo.find_by_query_with_pagination(query, page=page, per_page=per_page)
+          next_cursor = None
+          if cursor is not None:
+            page = None
+            gender_data, next_position = self.gender_data_db_repo.find_by_query_with_cursor(query, after=after, per_page=per_page)
+            next_cursor = encode_cursor(next_position) if next_position else None
+          else:
+            gender_data = self.gender_data_db_repo.find_by_query_with_pagination(query, page=page, per_page=per_page)
       
           if not gender_data:
             self.logger.info("No gender statistics data found")
@@ -58,7 +74,7 @@ class GenderDataController:
           ] 
           
           # Create pagination links
-          pagination_links = self.generate_hateoas_links.create_pagination_links("gender_statistics.get_gender_data", page, per_page, total_records)
+          pagination_links = self.generate_hateoas_links.create_pagination_links("gender_statistics.get_gender_data", page, per_page, total_records, next_cursor)
           self.logger.info("Pagination links generated")
       
           response = {
@@ -79,6 +95,117 @@ class GenderDataController:
           self.logger.error(f"Error fetching gender data: {e}")
           raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
 
+    def parse_aggregation_options(self, query_params, allow_cursor=True):
+      """
+      Extract the sort (total or value), limit, min_total and cursor parameters of an aggregation endpoint.
+      Returns the options of the gender statistics service and the cursor, None without cursor pagination.
+      """
+      sort = query_params.pop('sort', None)
+      # A cursor (empty for the first page) pages through the entries instead of returning them all
+      cursor = query_params.pop('cursor', None)
+
+      try:
+        limit = int(query_params.pop('limit')) if 'limit' in query_params else None
+        min_total = int(query_params.pop('min_total')) if 'min_total' in query_params else None
+        after = decode_cursor(cursor) if cursor else None
+      except ValueError:
+        self.logger.error("Invalid limit, min_total or cursor")
+        raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
+
+      if sort not in (None, 'total', 'value'):
+        self.logger.error(f"Invalid sort: {sort}")
+        raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_query"], 400)
+
+      if (limit is not None and limit < 1) or (min_total is not None and min_total < 1) or (cursor is not None and not allow_cursor):
+        raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
+
+      if cursor is not None:
+        # Pages need a stable order and a size, the largest entries come first by default
+        sort = sort or 'total'
+        limit = limit or 50
+
+        if after and sort == 'total' and "value" not in after:
+          self.logger.error("Cursor does not match the sort")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
+
+      options = {"sort": sort, "limit": limit, "min_total": min_total, "after": after}
+      return {option: value for option, value in options.items() if value is not None}, cursor
+
+    def parse_filter_values(self, dimension, value):
+      """
+      Parse the comma separated values of a dimension filter, e.g. country=US,GB: a single value, or a list of values.
+      Years are numbers.
+      """
+      values = [item.strip() for item in value.split(',') if item.strip()]
+
+      if dimension == 'year':
+        try:
+          values = [int(item) for item in values]
+        except ValueError:
+          self.logger.error(f"Invalid year: {value}")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_query"], 400)
+
+      return values[0] if len(values) == 1 else values
+
+    def parse_genders(self, value):
+      """
+      Parse the comma separated genders of a gender filter, e.g. gender=1,2.
+      """
+      try:
+        genders = [int(item) for item in value.split(',') if item.strip()]
+      except ValueError:
+        genders = None
+
+      if not genders or any(gender not in (0, 1, 2) for gender in genders):
+        self.logger.error(f"Invalid gender: {value}")
+        raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_query"], 400)
+
+      return genders
+
+    def get_distribution(self, dimension, value, options, cursor):
+      """
+      Get the gender statistics by a dimension from the service: the list of entries, or with a cursor one page of them
+      with pagination links.
+      """
+      get_gender_statistics = getattr(self.gender_statistics_service, f"get_gender_statistics_by_{dimension}")
+      values = self.parse_filter_values(dimension, value) if value else None
+
+      if cursor is None:
+        return get_gender_statistics(values, options)
+
+      # One more entry than shown tells whether there is a next page
+      limit = options["limit"]
+      entries = get_gender_statistics(values, {**options, "limit": limit + 1})
+      page = entries[:limit]
+
+      next_cursor = None
+      if len(entries) > limit:
+        last = page[-1]
+        # Position of the last entry, as returned by DBRepo.find_by_query_with_cursor: its key and sort value
+        position = {"pk": last["_id"]}
+        if options["sort"] == 'total':
+          position["value"] = last["total_count"]
+        next_cursor = encode_cursor(position)
+
+      params = {option: options[option] for option in ("sort", "min_total") if option in options}
+      if value:
+        params[dimension] = value
+
+      pagination_links = self.generate_hateoas_links.create_pagination_links(
+        f"gender_statistics.get_gender_statistics_by_{dimension}", None, limit, None, next_cursor, size_param="limit", filters=params
+      )
+
+      response = {
+        "message": "Gender statistics data fetched successfully",
+        "total": len(page),
+        "gender_statistics": page,
+        "_links": {
+          **pagination_links
+        }
+      }
+
+      return make_response(jsonify(response), 200)
+
     def get_gender_statistics_by_country(self):
       """
       Get gender statistics data by specific country.
@@ -87,16 +214,17 @@ class GenderDataController:
         # Get potential query parameters from the request
         query_params = request.args.to_dict()
         self.logger.info(f"Query parameters received: {query_params}")
+        options, cursor = self.parse_aggregation_options(query_params)
         country = query_params.get('country')
       
         if not query_params or country is None:
           self.logger.info("No country provided, fetching all gender statistics data for movie production countries")
           
-          return self.gender_statistics_service.get_gender_statistics_by_country()
+          return self.get_distribution("country", None, options, cursor)
         
         self.logger.info(f"Fetching gender statistics data for country: {country}")
         
-        return self.gender_statistics_service.get_gender_statistics_by_country(country)
+        return self.get_distribution("country", country, options, cursor)
       
       except CustomError as e:
         self.logger.error(f"Custom error occurred: {e}")
@@ -113,16 +241,17 @@ class GenderDataController:
         # Get potential query parameters from the request
         query_params = request.args.to_dict()
         self.logger.info(f"Query parameters received: {query_params}")
+        options, cursor = self.parse_aggregation_options(query_params)
         company = query_params.get('company')
         
         if not query_params or company is None:
           self.logger.info("No production company provided, fetching all gender statistics data for movie production companies")
             
-          return self.gender_statistics_service.get_gender_statistics_by_company()
+          return self.get_distribution("company", None, options, cursor)
         
         self.logger.info(f"Fetching gender statistics data for production company: {company}")
         
-        return self.gender_statistics_service.get_gender_statistics_by_company(company)
+        return self.get_distribution("company", company, options, cursor)
       
       except CustomError as e:
         self.logger.error(f"Custom error occurred: {e}")
@@ -139,16 +268,17 @@ class GenderDataController:
         # Get potential query parameters from the request
         query_params = request.args.to_dict()
         self.logger.info(f"Query parameters received: {query_params}")
+        options, cursor = self.parse_aggregation_options(query_params)
         genre = query_params.get('genre')
         
         if not query_params or genre is None:
           self.logger.info("No movie genre provided, fetching gender statistics data for all movie genres")
           
-          return self.gender_statistics_service.get_gender_statistics_by_genre()
+          return self.get_distribution("genre", None, options, cursor)
         
         self.logger.info(f"Fetching gender statistics data for movie genre: {genre}")
         
-        return self.gender_statistics_service.get_gender_statistics_by_genre(genre)
+        return self.get_distribution("genre", genre, options, cursor)
       
       except CustomError as e:
         self.logger.error(f"Custom error occurred: {e}")
@@ -165,17 +295,21 @@ class GenderDataController:
         # Get potential query parameters from the request
         query_params = request.args.to_dict()
         self.logger.info(f"Query parameters received: {query_params}")
+        options, cursor = self.parse_aggregation_options(query_params)
         department = query_params.get('department')
         
         if not query_params or department is None:
           self.logger.info("No department provided, fetching gender statistics data for all departments")
           
-          return self.gender_statistics_service.get_gender_statistics_by_department()
+          return self.get_distribution("department", None, options, cursor)
         
         self.logger.info(f"Fetching gender statistics data for department: {department}")
         
-        return self.gender_statistics_service.get_gender_statistics_by_department(department)
+        return self.get_distribution("department", department, options, cursor)
       
+      except CustomError as e:
+        self.logger.error(f"Custom error occurred: {e}")
+        raise e
       except Exception as e:
         self.logger.error(f"Error fetching data by department: {e}")
         raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
@@ -188,16 +322,17 @@ class GenderDataController:
         # Get potential query parameters from the request
         query_params = request.args.to_dict()
         self.logger.info(f"Query parameters received: {query_params}")
+        options, cursor = self.parse_aggregation_options(query_params)
         year = query_params.get('year')
         
         if not query_params or year is None:
           self.logger.info("No production year provided, fetching gender statistics data for all production years")
           
-          return self.gender_statistics_service.get_gender_statistics_by_year()
+          return self.get_distribution("year", None, options, cursor)
         
         self.logger.info(f"Fetching gender statistics data for production year: {year}")
         
-        return self.gender_statistics_service.get_gender_statistics_by_year(year)
+        return self.get_distribution("year", year, options, cursor)
       
       except CustomError as e:
         self.logger.error(f"Custom error occurred: {e}")
@@ -207,4 +342,98 @@ class GenderDataController:
         raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
         
         
-      
\ No newline at end of file
+      
+
+    def get_gender_statistics_summary(self):
+      """
+      Get the gender statistics of several dimensions (all by default) in a single response.
+      """
+      try:
+        # Get potential query parameters from the request
+        query_params = request.args.to_dict()
+        self.logger.info(f"Query parameters received: {query_params}")
+        # Sort, limit and min_total apply to every dimension, a summary is not paginated
+        options, _ = self.parse_aggregation_options(query_params, allow_cursor=False)
+
+        # Comma separated dimensions, e.g. dimensions=country,year
+        dimensions = [dimension.strip() for dimension in query_params.get('dimensions', '').split(',') if dimension.strip()]
+        invalid_dimensions = [dimension for dimension in dimensions if dimension not in GENDER_DISTRIBUTION_DIMENSIONS]
+
+        if invalid_dimensions:
+          self.logger.error(f"Invalid dimensions: {', '.join(invalid_dimensions)}")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_query"], 400)
+
+        return self.gender_statistics_service.get_gender_statistics_summary(dimensions, options)
+
+      except CustomError as e:
+        self.logger.error(f"Custom error occurred: {e}")
+        raise e
+      except Exception as e:
+        self.logger.error(f"Error fetching gender statistics summary: {e}")
+        raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def get_gender_statistics_crosstab(self):
+      """
+      Get the gender statistics of every combination of the values of two dimensions, e.g. rows=year&cols=department.
+      """
+      try:
+        # Get potential query parameters from the request
+        query_params = request.args.to_dict()
+        self.logger.info(f"Query parameters received: {query_params}")
+        options, _ = self.parse_aggregation_options(query_params, allow_cursor=False)
+        rows = query_params.get('rows')
+        cols = query_params.get('cols')
+
+        if rows not in GENDER_DISTRIBUTION_DIMENSIONS or cols not in GENDER_DISTRIBUTION_DIMENSIONS or rows == cols:
+          self.logger.error(f"Invalid crosstab dimensions: rows={rows}, cols={cols}")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_query"], 400)
+
+        return self.gender_statistics_service.get_gender_statistics_crosstab(rows, cols, options)
+
+      except CustomError as e:
+        self.logger.error(f"Custom error occurred: {e}")
+        raise e
+      except Exception as e:
+        self.logger.error(f"Error fetching gender statistics crosstab: {e}")
+        raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def get_gender_statistics_distribution(self):
+      """
+      Get the gender statistics by any dimensions, filtered by the values of any dimension, a year range and genders,
+      e.g. group_by=year,department&country=US,GB&year_from=1990&year_to=1999.
+      """
+      try:
+        # Get potential query parameters from the request
+        query_params = request.args.to_dict()
+        self.logger.info(f"Query parameters received: {query_params}")
+        options, _ = self.parse_aggregation_options(query_params, allow_cursor=False)
+
+        group_by = [dimension.strip() for dimension in query_params.get('group_by', '').split(',') if dimension.strip()]
+
+        if not group_by or len(set(group_by)) < len(group_by) or any(dimension not in GENDER_DISTRIBUTION_DIMENSIONS for dimension in group_by):
+          self.logger.error(f"Invalid group_by dimensions: {query_params.get('group_by')}")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_query"], 400)
+
+        filters = {
+          dimension: self.parse_filter_values(dimension, query_params[dimension])
+          for dimension in GENDER_DISTRIBUTION_DIMENSIONS if query_params.get(dimension)
+        }
+
+        year_range = None
+        if query_params.get('year_from') or query_params.get('year_to'):
+          try:
+            year_range = tuple(int(query_params[bound]) if query_params.get(bound) else None for bound in ('year_from', 'year_to'))
+          except ValueError:
+            self.logger.error("Invalid year_from or year_to")
+            raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[400]["invalid_query"], 400)
+
+        genders = self.parse_genders(query_params['gender']) if query_params.get('gender') else None
+
+        return self.gender_statistics_service.get_gender_statistics_distribution(group_by, filters, year_range, genders, options)
+
+      except CustomError as e:
+        self.logger.error(f"Custom error occurred: {e}")
+        raise e
+      except Exception as e:
+        self.logger.error(f"Error fetching gender statistics distribution: {e}")
+        raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
@@ -3,9 +3,13 @@ from bson import ObjectId
 from utils.CustomErrors import CustomError
 from utils.custom_status_codes import MOVIE_CUSTOM_STATUS_CODES
 from utils.validate import validate_fields
+from utils.pagination_cursor import encode_cursor, decode_cursor
+
+# Fields used by the movie list response, the other (large) fields of a movie are not loaded
+MOVIE_LIST_FIELDS = ['id', 'movie_id', 'title', 'release_date', 'genres', 'overview', 'rating_summary']
 
 class MovieController:
-  def __init__ (self, logger, movie_db_repo, credit_db_repo, rating_db_repo, generate_hateoas_links, json_convert, data_service, movie_query_service):
+  def __init__ (self, logger, movie_db_repo, credit_db_repo, rating_db_repo, generate_hateoas_links, json_convert, data_service, movie_query_service, count_cache):
     self.logger = logger
     self.json_convert = json_convert
     self.movie_db_repo = movie_db_repo
@@ -14,11 +18,12 @@ class MovieController:
     self.generate_hateoas_links = generate_hateoas_links
     self.data_service = data_service
     self.movie_query_service = movie_query_service
+    self.count_cache = count_cache
    
-  # Helper methods to check if the movie has actors or ratings 
+  # Helper methods to check if the movie has actors or ratings, without loading the credits or ratings themselves
   def check_if_actors(self, movie_id):
     try:
-        has_actors = bool(self.credit_db_repo.find_by_field("id", movie_id))
+        has_actors = self.credit_db_repo.exists({"id": movie_id})
     except Exception as e:
         self.logger.error(f"Error checking actors for movie {movie_id}: {e}")
         has_actors = False
@@ -30,13 +35,59 @@ class MovieController:
           # Movie id converted to int for querying the ratings collection
           movie_id_int = int(movie_id)
         
-          has_ratings = bool(self.rating_db_repo.find_by_field("movie_id", movie_id_int))
+          has_ratings = self.rating_db_repo.exists({"movie_id": movie_id_int})
       except Exception as e:
           self.logger.error(f"Error checking ratings for movie {movie_id}: {e}")
           has_ratings = False
         
       return has_ratings
 
+  def find_movies_with_actors_and_ratings(self, movie_ids):
+    """
+    Check which of several movies have actors and which have ratings, with one query per collection.
+    Returns the sets of movie ids with actors and with ratings.
+    """
+    movie_ids = list(movie_ids)
+
+    try:
+      with_actors = self.credit_db_repo.existing_values("id", movie_ids)
+    except Exception as e:
+      self.logger.error(f"Error checking actors for movies: {e}")
+      with_actors = set()
+
+    try:
+      # Ratings store movie ids as ints, movies created through the API have uuids and no ratings
+      int_ids = [int(movie_id) for movie_id in movie_ids if movie_id.isdigit()]
+      with_ratings = {str(movie_id) for movie_id in self.rating_db_repo.existing_values("movie_id", int_ids)}
+    except Exception as e:
+      self.logger.error(f"Error checking ratings for movies: {e}")
+      with_ratings = set()
+
+    return with_actors, with_ratings
+
+  def get_rating_stats(self, movie, histogram=False):
+    """
+    Rating stats of a movie, read from its rating summary instead of its ratings. None for movies without ratings.
+    """
+    summary = movie.rating_summary
+
+    if not summary or not summary.count:
+      return None
+
+    stats = {"mean": round(summary.mean, 2), "count": summary.count}
+    if histogram:
+      stats["histogram"] = summary.histogram
+
+    return stats
+
+  def count_movies(self, query, search_text=None):
+    """
+    Count the movies matching a query, cached for a short while since clients page through the same query repeatedly.
+    """
+    cache_key = ("movies", repr(sorted(query.items())), search_text)
+
+    return self.count_cache.get_or_set(cache_key, lambda: self.movie_db_repo.count(query, search_text))
+
   def get_movies(self):
     try:
       # Get potential query parameters from the request
@@ -46,13 +97,26 @@ class MovieController:
       try:
         page = int(query_params.pop('page', 1))
         per_page = int(query_params.pop('per_page', 20))
+        # A cursor (empty for the first page) selects keyset pagination instead of page numbers
+        cursor = query_params.pop('cursor', None)
 
         if page < 1 or per_page < 1:
           raise ValueError("Page and per_page must be greater than 0")
+
+        after = decode_cursor(cursor) if cursor else None
       except ValueError:
         self.logger.error("Invalid pagination parameters")
         raise CustomError(MOVIE_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
 
+      if per_page > 100:
+        self.logger.warning("per_page exceeds maximum limit of 100, setting to 100")
+        per_page = 100
+
+      # Full-text search on title, tagline and overview, ranked by relevance and combinable with the other filters
+      search_text = query_params.get('q', '').strip() or None
+      if search_text:
+        self.logger.info(f"Searching movies for text: {search_text}")
+
       if query_params:
         self.logger.info("Query parameters provided, fetching movies by filter...")
       
@@ -63,32 +127,52 @@ class MovieController:
         self.logger.info("Query parameters not provided, fetching all movies...")
         query = {}
      
-      movies = self.movie_db_repo.find_by_query(query)
+      # Only the requested page is fetched, with only the fields the response uses
+      next_cursor = None
+      if cursor is not None:
+        page = None
+        movies, next_position = self.movie_db_repo.find_by_query_with_cursor(query, after=after, per_page=per_page, fields=MOVIE_LIST_FIELDS, search_text=search_text)
+        next_cursor = encode_cursor(next_position) if next_position else None
+      else:
+        movies = list(self.movie_db_repo.find_by_query_with_pagination(query, page=page, per_page=per_page, fields=MOVIE_LIST_FIELDS, search_text=search_text))
 
       if not movies:
         self.logger.info("No movies found")
         raise CustomError(MOVIE_CUSTOM_STATUS_CODES[404]["movie_not_found"], 404)
 
-      self.logger.info(f"Found {len(movies)} movies")
+      total = self.count_movies(query, search_text)
+      self.logger.info(f"Found {total} movies, returning {len(movies)}")
     
-      movies_json = [
-              {
-                  "id": str(movie.id),
-                  "movie_id": movie.movie_id,
-                  "title": movie.title,
-                  "release_year": movie.release_date.year if movie.release_date else None,
-                  "genre": [genre.name for genre in movie.genres],
-                  "description": movie.overview,
-              }
-              for movie in movies
-          ]
-
-      pagination_links = self.generate_hateoas_links.create_pagination_links("movie.get_movies", page, per_page, len(movies))
+      # Actor and rating links of every movie on the page, checked with one query per collection
+      with_actors, with_ratings = self.find_movies_with_actors_and_ratings(movie.movie_id for movie in movies)
+
+      movies_json = []
+      for movie in movies:
+        has_actors = movie.movie_id in with_actors
+        has_ratings = movie.movie_id in with_ratings
+        movie_links = self.generate_hateoas_links.create_movies_links(str(movie.id), has_actors, has_ratings)
+
+        movies_json.append({
+            "id": str(movie.id),
+            "movie_id": movie.movie_id,
+            "title": movie.title,
+            "release_year": movie.release_date.year if movie.release_date else None,
+            "genre": [genre.name for genre in movie.genres],
+            "description": movie.overview,
+            "rating": self.get_rating_stats(movie),
+            "_links": {
+              "self": movie_links['self'],
+              "actors": movie_links['actors'] if has_actors else None,
+              "ratings": movie_links['ratings'] if has_ratings else None,
+            }
+        })
+
+      pagination_links = self.generate_hateoas_links.create_pagination_links("movie.get_movies", page, per_page, total, next_cursor, filters=query_params)
       self.logger.info("Pagination links generated")
   
       response = {
         "message": "Movies fetched successfully",
-        "total": len(movies),
+        "total": total,
         "movies": movies_json,
         "_links": {
           **pagination_links
@@ -133,6 +217,7 @@ class MovieController:
           "release_year": movie.release_date.year if movie.release_date else None,
           "genre": [genre.name for genre in movie.genres],
           "description": movie.overview,
+          "rating": self.get_rating_stats(movie, histogram=True),
         }
 
       response = {
@@ -174,6 +259,10 @@ class MovieController:
 
     try:
       movie_id = self.data_service.save_new_movie(movie_data)
+
+      # Keep the movie search index (if any) and the genre names of the genre filter in sync
+      self.movie_query_service.index_movie(self.movie_db_repo.find_by_id(movie_id))
+      self.movie_query_service.clear_genre_names()
       
       movie_links = self.generate_hateoas_links.create_movies_links(movie_id, has_actors=False, has_ratings=False)
       
@@ -210,6 +299,10 @@ class MovieController:
         # Delete the movie
         self.movie_db_repo.delete(movie_id)
         self.logger.info(f"Movie with ID {movie_id} deleted successfully")
+
+        # Keep the derived actor collection and the movie search index (if any) in sync
+        self.data_service.remove_actor_movie(movie.movie_id)
+        self.movie_query_service.unindex_movie(movie.movie_id)
       except Exception as e:
         self.logger.error(f"Error deleting movie: {e}")
         raise e
@@ -256,6 +349,12 @@ class MovieController:
         self.logger.info(f"Movie with ID {movie_id} not found")
         raise CustomError(MOVIE_CUSTOM_STATUS_CODES[404]["movie_not_found"], 404)
 
+      # Keep the movie titles stored in the derived actor collection, the movie search index (if any) and the genre
+      # names of the genre filter in sync
+      self.data_service.update_actor_movie_title(movie.movie_id, movie.title)
+      self.movie_query_service.index_movie(movie)
+      self.movie_query_service.clear_genre_names()
+
       has_actors = self.check_if_actors(movie.movie_id)
       has_ratings = self.check_if_ratings(movie.movie_id)
 
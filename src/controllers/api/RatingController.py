@@ -2,16 +2,38 @@
 from flask import jsonify, make_response, request
 from utils.CustomErrors import CustomError 
 from utils.custom_status_codes import RATING_CUSTOM_STATUS_CODES
+from utils.pagination_cursor import encode_cursor, decode_cursor
 from bson import ObjectId
 
+# Fields of a rating used by the rating list
+RATING_LIST_FIELDS = ['id', 'movie_id', 'rating']
+
 class RatingController:
-  def __init__(self, logger, rating_db_repo, movie_db_repo, json_convert, generate_hateoas_links, movie_query_service):
+  def __init__(self, logger, rating_db_repo, movie_db_repo, json_convert, generate_hateoas_links, movie_query_service, count_cache):
     self.rating_db_repo = rating_db_repo
     self.movie_db_repo = movie_db_repo
     self.json_convert = json_convert
     self.generate_hateoas_links = generate_hateoas_links
     self.movie_query_service = movie_query_service
+    self.count_cache = count_cache
     self.logger = logger
+
+  def count_ratings(self, query):
+    """
+    Count the ratings matching a query, cached for a short while since clients page through the same query repeatedly.
+    """
+    cache_key = ("ratings", repr(sorted(query.items())))
+
+    return self.count_cache.get_or_set(cache_key, lambda: self.rating_db_repo.count(query))
+
+  def get_movie_titles(self, movie_ids):
+    """
+    Look up the titles of several movies with a single query, returns a dict of title by movie id.
+    Ratings store movie ids as ints while movies store them as strings, the dict is keyed by the string.
+    """
+    movies = self.movie_db_repo.find_by_query({"movie_id__in": list({str(movie_id) for movie_id in movie_ids})}, fields=['movie_id', 'title'])
+
+    return {movie.movie_id: movie.title for movie in movies}
  
   def get_ratings(self):
     try:
@@ -22,9 +44,13 @@ class RatingController:
       try:
         page = int(query_params.pop('page', 1))
         per_page = int(query_params.pop('per_page', 20))
+        # A cursor (empty for the first page) selects keyset pagination instead of page numbers
+        cursor = query_params.pop('cursor', None)
 
         if page < 1 or per_page < 1:
           raise ValueError("Page and per_page must be greater than 0")
+
+        after = decode_cursor(cursor) if cursor else None
       except ValueError:
         self.logger.error("Invalid pagination parameters")
         raise CustomError(RATING_CUSTOM_STATUS_CODES[400]["invalid_pagination"], 400)
@@ -33,7 +59,7 @@ class RatingController:
         self.logger.info("Query parameter provided, fetching ratings by filter...")
 
         # Validate the query parameters
-        query = self.movie_query_service.build_query('rating', query_params)
+        query = self.movie_query_service.build_query('ratings', query_params)
         self.logger.info("Query built successfully")
       else:
         self.logger.info("Query parameters not provided, fetching all ratings...")
@@ -42,7 +68,13 @@ class RatingController:
       self.logger.info(f"Fetching ratings with query: {query}")
       
       try:
-        ratings = self.rating_db_repo.find_by_query_with_pagination(query, page=page, per_page=per_page)
+        next_cursor = None
+        if cursor is not None:
+          page = None
+          ratings, next_position = self.rating_db_repo.find_by_query_with_cursor(query, after=after, per_page=per_page, fields=RATING_LIST_FIELDS)
+          next_cursor = encode_cursor(next_position) if next_position else None
+        else:
+          ratings = list(self.rating_db_repo.find_by_query_with_pagination(query, page=page, per_page=per_page, fields=RATING_LIST_FIELDS))
       except Exception as e:
         self.logger.error(f"Error fetching ratings: {e}")
         raise CustomError(RATING_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
@@ -51,35 +83,26 @@ class RatingController:
         self.logger.info("No ratings found")
         raise CustomError(RATING_CUSTOM_STATUS_CODES[404]["no_ratings"], 404)
 
-      try:
-        # Convert ratings to JSON format
-        self.json_convert.serialize_documents(ratings)
-        self.logger.info("Ratings converted to JSON format")
-      except Exception as e:
-        self.logger.error(f"Error converting ratings to JSON format: {e}")
-        raise CustomError(RATING_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+      total = self.count_ratings(query)
+
+      # Titles of all movies on the page, fetched at once instead of one query per rating
+      movie_titles = self.get_movie_titles(rating.movie_id for rating in ratings)
 
       processed_ratings = []
 
       for rating in ratings:
         try:
-          rating_id = str(rating.id)
-          movie_id = str(rating.movie_id)
-  
-          movie = self.movie_db_repo.find_by_field("movie_id", movie_id)
-          movie_title = movie.title if movie else "Unknown"
-
           processed_ratings.append({
-              "id": rating_id,
+              "id": str(rating.id),
               "text": f"{rating['rating']}/5",
-              "movie": movie_title
+              "movie": movie_titles.get(str(rating.movie_id), "Unknown")
           })
         except Exception as e:
           self.logger.error(f"Error processing rating: {e}")
           raise CustomError(RATING_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
 
       try:
-        pagination_links = self.generate_hateoas_links.create_pagination_links("rating.get_ratings", page, per_page, len(ratings))
+        pagination_links = self.generate_hateoas_links.create_pagination_links("rating.get_ratings", page, per_page, total, next_cursor, filters=query_params)
         self.logger.info("Pagination links generated")
       except Exception as e:
         self.logger.error(f"Error generating pagination links: {e}")
@@ -87,7 +110,7 @@ class RatingController:
 
       response = {
               "message": "Ratings fetched successfully",
-              "total": len(ratings),
+              "total": total,
               "ratings": processed_ratings,
               "_links": {
                   **pagination_links
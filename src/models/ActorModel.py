@@ -0,0 +1,14 @@
+import mongoengine as m_engine
+from .BaseSchema import BaseDocument
+
+# Defines the model for the Actors collection, derived from the cast of the credits collection to search actors by name
+class ActorMovie(m_engine.EmbeddedDocument):
+    movie_id = m_engine.StringField(required=True)
+    title = m_engine.StringField(default="")
+
+class Actor(BaseDocument):
+    person_id = m_engine.IntField(required=True, unique=True) # Id of the person in the cast of the credits collection
+    name = m_engine.StringField(required=True)
+    normalized_name = m_engine.StringField(required=True) # Name without accents in lower case, for prefix lookups
+    name_tokens = m_engine.ListField(m_engine.StringField(), default=list) # Words of the normalized name
+    movies = m_engine.ListField(m_engine.EmbeddedDocumentField(ActorMovie), default=list)
@@ -10,4 +10,5 @@ class GenderStatistics(BaseDocument):
     genres = m_engine.ListField(m_engine.StringField(), required=False)
     department = m_engine.StringField(required=True) # Department of the person (e.g., acting, writing, directing, etc.)
     gender = m_engine.IntField(default=0)  # 0 = unknown, 1 = female, 2 = male
-    name = m_engine.StringField(default="") # Name of the person (from the cast or crew)
\ No newline at end of file
+    name = m_engine.StringField(default="") # Name of the person (from the cast or crew)
+    credit_id = m_engine.StringField(default="") # Id of the cast or crew credit, unique within a movie
\ No newline at end of file
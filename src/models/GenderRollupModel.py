@@ -0,0 +1,23 @@
+import mongoengine as m_engine
+from .BaseSchema import BaseDocument
+
+# Gender statistics fields rolled up by the gender distribution endpoints, keyed by dimension
+ROLLUP_DIMENSIONS = {
+    'country': 'countries',
+    'company': 'companies',
+    'genre': 'genres',
+    'department': 'department',
+    'year': 'year',
+}
+
+def rollup_id(dimension, value):
+    return f"{dimension}:{value}"
+
+# Defines the model for the gender rollup collection, the number of people of each gender per production country,
+# company, genre, department and year, computed from the gender statistics collection when seeding
+class GenderRollup(BaseDocument):
+    id = m_engine.StringField(primary_key=True) # "<dimension>:<value>", e.g. "country:US"
+    dimension = m_engine.StringField(required=True) # Key of ROLLUP_DIMENSIONS
+    value = m_engine.DynamicField(required=True) # Country code, company, genre, department or year
+    total_count = m_engine.IntField(default=0)
+    counts = m_engine.DictField(m_engine.IntField(), default=dict) # Number of people by gender, "0", "1" or "2"
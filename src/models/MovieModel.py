@@ -18,6 +18,13 @@ class SpokenLanguage(m_engine.EmbeddedDocument):
     iso_639_1 = m_engine.StringField(required=True)
     name = m_engine.StringField(required=True)
 
+# Aggregates of the ratings of a movie, maintained as ratings are written so movies can be filtered by average rating
+class RatingSummary(m_engine.EmbeddedDocument):
+    count = m_engine.IntField(default=0, min_value=0)
+    total = m_engine.FloatField(default=0.0, min_value=0.0) # Sum of the ratings, kept to update the mean incrementally
+    mean = m_engine.FloatField(default=0.0, min_value=0.0, max_value=5.0)
+    histogram = m_engine.DictField(m_engine.IntField(), default=dict) # Number of ratings by whole star, "4" counts 4 and 4.5
+
 class MovieMetaData(BaseDocument):
     movie_id = m_engine.StringField(required=True, unique=True)
     adult = m_engine.BooleanField(default=False)
@@ -42,4 +49,5 @@ class MovieMetaData(BaseDocument):
     title = m_engine.StringField(required=True)
     video = m_engine.BooleanField(default=False)
     vote_average = m_engine.FloatField(default=0.0, min_value=0.0, max_value=10.0)
-    vote_count = m_engine.IntField(default=0, min_value=0)
\ No newline at end of file
+    vote_count = m_engine.IntField(default=0, min_value=0)
+    rating_summary = m_engine.EmbeddedDocumentField(RatingSummary) # Unset for movies without ratings
\ No newline at end of file
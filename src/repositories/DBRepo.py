@@ -1,5 +1,7 @@
 import mongoengine as m_engine
 from mongoengine import Document
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from utils.CustomErrors import CustomError
 from utils.custom_status_codes import GENERAL_CUSTOM_STATUS_CODES
 
@@ -76,6 +78,18 @@ class DBRepo:
             self.logger.error(f"Error deleting document with ID {object_id}: {e}")
             raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
     
+    def delete_by_query(self, query):
+        """
+        Delete all documents matching a query.
+        :param query: The query selecting the documents.
+        :return: The number of documents deleted.
+        """
+        try:
+            return self.model.objects(**query).delete()
+        except Exception as e:
+            self.logger.error(f"Error deleting documents by query {query}: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
     def find_by_field(self, field_name, value):
         """
         Find document by a specific field and value.
@@ -104,33 +118,253 @@ class DBRepo:
             self.logger.error(f"Error finding documents by field {field_name}: {e}")
             raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
 
-    def find_by_query(self, query):
+    def find_by_query(self, query, fields=None):
         """
         Find document(s) by a specific query.
         :param query: The query to execute.
+        :param fields: Optional list of fields to load, the others are not sent by the database.
         """
         try:
-            return self.model.objects(**query)
+            documents = self.model.objects(**query)
+
+            return documents.only(*fields) if fields else documents
         except Exception as e:
             self.logger.error(f"Error finding document by query {query}: {e}")
             raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
         
-    def find_by_query_with_pagination(self, query, page=1, per_page=100):
+    def exists(self, query):
+        """
+        Check whether any document matches a query, without loading it (only its _id is sent, and at most one).
+        :param query: The query to execute.
+        :return: True if a document matches.
+        """
+        try:
+            return self.model.objects(**query).only('id').as_pymongo().first() is not None
+        except Exception as e:
+            self.logger.error(f"Error checking documents exist for query {query}: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def existing_values(self, field_name, values, query=None):
+        """
+        Find which of the given values of a field are stored, in a single query instead of one existence check per value.
+        :param field_name: The name of the field, should be covered by an index.
+        :param values: The values to check.
+        :param query: Optional query to restrict the documents considered.
+        :return: The set of values at least one document has.
+        """
+        values = list(values)
+        if not values:
+            return set()
+
+        try:
+            return set(self.model.objects(**(query or {}), **{f"{field_name}__in": values}).distinct(field_name))
+        except Exception as e:
+            self.logger.error(f"Error finding existing values for field {field_name}: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def find_by_query_with_pagination(self, query, page=1, per_page=100, fields=None, search_text=None):
         """
         Find documents by a specific query with pagination.
         :param query: The query to execute.
         :param page: The page number (default is 1).
         :param per_page: The number of documents per page (default is 100).
+        :param fields: Optional list of fields to load, the others are not sent by the database.
+        :param search_text: Optional full-text search (requires a text index), results are ranked by relevance.
         """
         try:
             # Calculate the number of documents to skip (as suggested by copilot)
             skip_count = (page - 1) * per_page
 
-            return self.model.objects(**query).skip(skip_count).limit(per_page)
+            documents = self.model.objects(**query)
+            if search_text:
+                documents = documents.search_text(search_text).order_by('$text_score')
+            if fields:
+                documents = documents.only(*fields)
+
+            return documents.skip(skip_count).limit(per_page)
         except Exception as e:
             self.logger.error(f"Error finding documents by query {query} with pagination: {e}")
             raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
         
+    def find_by_query_with_cursor(self, query, after=None, per_page=100, fields=None, search_text=None):
+        """
+        Find documents by a specific query with keyset pagination. Instead of skipping the documents of earlier pages,
+        the query seeks past the last document of the previous page, so every page costs the same whatever its depth.
+        :param query: The query to execute.
+        :param after: Position of the last document of the previous page, as returned for that page (None for the first page).
+        :param per_page: The number of documents per page (default is 100).
+        :param fields: Optional list of fields to load, the others are not sent by the database.
+        :param search_text: Optional full-text search (requires a text index), results keep the keyset order.
+        :return: The documents of the page and the position to pass as after for the next page (None on the last page).
+        """
+        try:
+            documents = self.model.objects(**query)
+            if search_text:
+                documents = documents.search_text(search_text)
+
+            if after:
+                documents = documents.filter(pk__gt=after["pk"])
+
+            if fields:
+                documents = documents.only(*fields)
+
+            # One extra document tells whether there is a next page
+            page = list(documents.order_by("pk").limit(per_page + 1))
+
+            next_position = None
+            if len(page) > per_page:
+                page = page[:per_page]
+                last = page[-1]
+                next_position = {"pk": last.pk}
+
+            return page, next_position
+        except Exception as e:
+            self.logger.error(f"Error finding documents by query {query} with cursor: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def update_by_query(self, query, **kwargs):
+        """
+        Update all documents matching a query.
+        :param query: The query selecting the documents.
+        :param kwargs: MongoEngine update operations (e.g. set__title="...", pull__movies__movie_id="...").
+        :return: The number of documents updated.
+        """
+        try:
+            return self.model.objects(**query).update(**kwargs)
+        except Exception as e:
+            self.logger.error(f"Error updating documents by query {query}: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def count(self, query=None, search_text=None):
+        """
+        Count the documents matching a query.
+        :param query: Optional query, without one the count is read from the collection metadata instead of scanning it.
+        :param search_text: Optional full-text search (requires a text index).
+        :return: The number of matching documents.
+        """
+        try:
+            if not query and not search_text:
+                return self.model._get_collection().estimated_document_count()
+
+            documents = self.model.objects(**(query or {}))
+            if search_text:
+                documents = documents.search_text(search_text)
+
+            return documents.count()
+        except Exception as e:
+            self.logger.error(f"Error counting documents by query {query}: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def distinct(self, field_name, query=None):
+        """
+        Find the distinct values of a field, optionally restricted by a query.
+        :param field_name: The name of the field.
+        :param query: Optional query to restrict the documents considered.
+        :return: A list of distinct values.
+        """
+        try:
+            return self.model.objects(**(query or {})).distinct(field_name)
+        except Exception as e:
+            self.logger.error(f"Error finding distinct values for field {field_name}: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def insert_many(self, documents, ordered=False):
+        """
+        Insert raw documents into the collection in a single round trip.
+        Duplicate key errors are skipped, so an unordered insert keeps writing the rest of the batch.
+        :param documents: List of raw (already validated) documents.
+        :param ordered: Whether the server should stop at the first failing document.
+        :return: The number of documents inserted.
+        """
+        if not documents:
+            return 0
+
+        try:
+            result = self.model._get_collection().insert_many(documents, ordered=ordered)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+
+            # Only tolerate duplicates (code 11000), anything else is a real failure
+            if any(error.get("code") != 11000 for error in write_errors):
+                self.logger.error(f"Error inserting documents: {e.details}")
+                raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+            self.logger.warning(f"Skipped {len(write_errors)} duplicate documents during insert")
+            return e.details.get("nInserted", 0)
+        except Exception as e:
+            self.logger.error(f"Error inserting documents: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def upsert_many(self, documents, key_fields, ordered=False, add_to_set=None, return_upserted=False):
+        """
+        Insert raw documents that are not stored yet, matching stored documents on their natural key fields.
+        Stored documents are left untouched ($setOnInsert), so repeating the same upserts is a no-op.
+        :param documents: List of raw (already validated) documents.
+        :param key_fields: Fields that identify a document, should be covered by an index.
+        :param ordered: Whether the server should stop at the first failing document.
+        :param add_to_set: Optional list fields whose items are added to the stored document's list ($addToSet) instead.
+        :param return_upserted: Whether to return the inserted documents themselves instead of their number.
+        :return: The number of documents inserted (or the inserted documents).
+        """
+        if not documents:
+            return [] if return_upserted else 0
+
+        add_to_set = add_to_set or []
+
+        requests = []
+        for document in documents:
+            key = {field: document.get(field) for field in key_fields}
+            # The _id of an upserted document is taken from the filter and cannot be set again
+            fields = {field: value for field, value in document.items() if field != "_id" and field not in add_to_set}
+            update = {"$setOnInsert": fields}
+
+            if add_to_set:
+                update["$addToSet"] = {field: {"$each": document.get(field, [])} for field in add_to_set}
+
+            requests.append(UpdateOne(key, update, upsert=True))
+
+        try:
+            result = self.model._get_collection().bulk_write(requests, ordered=ordered)
+            if return_upserted:
+                return [documents[index] for index in result.upserted_ids]
+            return result.upserted_count
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+
+            # Concurrent upserts of the same key can race on a unique index (code 11000), the document exists either way
+            if any(error.get("code") != 11000 for error in write_errors):
+                self.logger.error(f"Error upserting documents: {e.details}")
+                raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+            self.logger.warning(f"Skipped {len(write_errors)} concurrently inserted documents during upsert")
+            if return_upserted:
+                return [documents[upserted["index"]] for upserted in e.details.get("upserted", [])]
+            return e.details.get("nUpserted", 0)
+        except Exception as e:
+            self.logger.error(f"Error upserting documents: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def bulk_update(self, updates, ordered=False, upsert=False):
+        """
+        Apply many single-document updates in one round trip.
+        :param updates: List of (filter, update) pairs of raw MongoDB queries, an update can be an aggregation pipeline.
+        :param ordered: Whether the updates must be applied in order (e.g. when an update reads a field set by the previous one).
+        :param upsert: Whether to insert a document when none matches the filter.
+        :return: The number of documents modified or inserted.
+        """
+        if not updates:
+            return 0
+
+        try:
+            result = self.model._get_collection().bulk_write(
+                [UpdateOne(query, update, upsert=upsert) for query, update in updates], ordered=ordered
+            )
+            return result.modified_count + result.upserted_count
+        except Exception as e:
+            self.logger.error(f"Error updating documents: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
     def create_indexes(self, fields, **kwargs):
         """
         Create indexes on the specified fields.
@@ -25,7 +25,7 @@ def create_credit_blueprint(controller):
             schema:
               type: string
             description: 
-              Filter actors by name.
+              Filter actors by name, matching the start of each word of the name (case and accent insensitive).
           - name: page
             in: query
             required: false
@@ -40,6 +40,12 @@ def create_credit_blueprint(controller):
               type: integer
             description: 
               Number of items per page for pagination.
+          - name: cursor
+            in: query
+            required: false
+            schema:
+              type: string
+            description: Keyset pagination cursor, taken from the next link (empty for the first page). Replaces page, deep pages are as fast as the first one.
         responses:
           200:
             description: Actors fetched successfully
@@ -30,6 +30,12 @@ def create_gender_statistics_blueprint(controller):
           required: false
           schema:
             type: integer
+        - name: cursor
+          in: query
+          description: Keyset pagination cursor, taken from the next link (empty for the first page). Replaces page, deep pages are as fast as the first one.
+          required: false
+          schema:
+            type: string
       responses:
         200:
           description: Gender statistics data fetched successfully.
@@ -50,10 +56,34 @@ def create_gender_statistics_blueprint(controller):
       parameters:
         - name: country
           in: query
-          description: Country code for production country, e.g. US.
+          description: Country code for production country, e.g. US, or comma separated codes, e.g. US,GB.
+          required: false
+          schema:
+            type: integer
+        - name: sort
+          in: query
+          description: Sort order of the entries, total (largest first) or value. Unsorted by default, by total with a cursor.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of entries returned, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return entries counting at least this many people.
           required: false
           schema:
             type: integer
+        - name: cursor
+          in: query
+          description: Keyset pagination cursor, taken from the next link (empty for the first page). The entries are then returned a page of limit (default 50) at a time, with pagination links.
+          required: false
+          schema:
+            type: string
       responses:
         200:
           description: Gender distribution statistics by production country fetched successfully.
@@ -103,10 +133,34 @@ def create_gender_statistics_blueprint(controller):
       parameters:
         - name: company
           in: query
-          description: Name of the production company.
+          description: Name of the production company, or comma separated names.
           required: false
           schema:
             type: integer
+        - name: sort
+          in: query
+          description: Sort order of the entries, total (largest first) or value. Unsorted by default, by total with a cursor.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of entries returned, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return entries counting at least this many people.
+          required: false
+          schema:
+            type: integer
+        - name: cursor
+          in: query
+          description: Keyset pagination cursor, taken from the next link (empty for the first page). The entries are then returned a page of limit (default 50) at a time, with pagination links.
+          required: false
+          schema:
+            type: string
       responses:
         200:
           description: Gender distribution statistics by production company fetched successfully.
@@ -156,10 +210,34 @@ def create_gender_statistics_blueprint(controller):
       parameters:
         - name: genre
           in: query
-          description: Movie genre, e.g. Action, Comedy.
+          description: Movie genre, e.g. Action, or comma separated genres, e.g. Action,Comedy.
           required: false
           schema:
             type: integer
+        - name: sort
+          in: query
+          description: Sort order of the entries, total (largest first) or value. Unsorted by default, by total with a cursor.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of entries returned, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return entries counting at least this many people.
+          required: false
+          schema:
+            type: integer
+        - name: cursor
+          in: query
+          description: Keyset pagination cursor, taken from the next link (empty for the first page). The entries are then returned a page of limit (default 50) at a time, with pagination links.
+          required: false
+          schema:
+            type: string
       responses:
         200:
           description: Gender distribution statistics by movie genre fetched successfully.
@@ -209,10 +287,34 @@ def create_gender_statistics_blueprint(controller):
       parameters:
         - name: department
           in: query
-          description: Department name, e.g. Directing, Acting.
+          description: Department name, e.g. Directing, or comma separated names, e.g. Directing,Acting.
           required: false
           schema:
             type: integer
+        - name: sort
+          in: query
+          description: Sort order of the entries, total (largest first) or value. Unsorted by default, by total with a cursor.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of entries returned, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return entries counting at least this many people.
+          required: false
+          schema:
+            type: integer
+        - name: cursor
+          in: query
+          description: Keyset pagination cursor, taken from the next link (empty for the first page). The entries are then returned a page of limit (default 50) at a time, with pagination links.
+          required: false
+          schema:
+            type: string
       responses:
         200:
           description: Gender distribution statistics by department (e.g. Directing, Acting).
@@ -262,10 +364,34 @@ def create_gender_statistics_blueprint(controller):
       parameters:
         - name: year
           in: query
-          description: Production year, e.g. 1995.
+          description: Production year, e.g. 1995, or comma separated years, e.g. 1995,1996.
+          required: false
+          schema:
+            type: integer
+        - name: sort
+          in: query
+          description: Sort order of the entries, total (largest first) or value. Unsorted by default, by total with a cursor.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of entries returned, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return entries counting at least this many people.
           required: false
           schema:
             type: integer
+        - name: cursor
+          in: query
+          description: Keyset pagination cursor, taken from the next link (empty for the first page). The entries are then returned a page of limit (default 50) at a time, with pagination links.
+          required: false
+          schema:
+            type: string
       responses:
         200:
           description: Gender distribution statistics by movie production year fetched successfully.
@@ -300,6 +426,201 @@ def create_gender_statistics_blueprint(controller):
                 example: "An unexpected error occurred while processing the request."
       """
       return controller.get_gender_statistics_by_year()
+
+    # Get gender statistics by several dimensions at once
+    @gender_statistics_blueprint.route('/gender-statistics/summary', methods=['GET'])
+    def get_gender_statistics_summary():
+      """
+      Get aggregated and computed gender statistics by several dimensions in a single response.
+      ---
+      tags:
+        - Gender Statistics
+      summary: Retrieve the gender distribution statistics by production country, company, genre, department and year at once.
+      description: Computes the distributions of all (or the selected) dimensions in a single pass over the data, the result of each dimension is the same as its own endpoint's.
+      parameters:
+        - name: dimensions
+          in: query
+          description: Comma separated dimensions to include (country, company, genre, department, year), all by default. E.g. country,year.
+          required: false
+          schema:
+            type: string
+        - name: sort
+          in: query
+          description: Sort order of the entries of each dimension, total (largest first) or value. Unsorted by default.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of entries of each dimension returned per dimension, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return entries of each dimension counting at least this many people.
+          required: false
+          schema:
+            type: integer
+      responses:
+        200:
+          description: Gender distribution statistics by dimension fetched successfully.
+          schema:
+            type: object
+            properties:
+              country:
+                type: array
+                description: The gender distribution by production country, as returned by /gender-statistics/country.
+              year:
+                type: array
+                description: The gender distribution by production year, as returned by /gender-statistics/year.
+        400:
+          description: Invalid dimensions.
+        500:
+          description: An unexpected error occurred while processing the request.
+      """
+      return controller.get_gender_statistics_summary()
+
+    # Get gender statistics by two dimensions
+    @gender_statistics_blueprint.route('/gender-statistics/crosstab', methods=['GET'])
+    def get_gender_statistics_crosstab():
+      """
+      Get aggregated and computed gender statistics by two dimensions, e.g. by year and department.
+      ---
+      tags:
+        - Gender Statistics
+      summary: Retrieve the gender distribution statistics (in numbers and percentages) of every combination of two dimensions.
+      description: Computes the gender breakdown of every (row, column) cell in a single pass over the data. A movie with several production countries, companies or genres counts in the cell of each of them.
+      parameters:
+        - name: rows
+          in: query
+          description: Dimension of the rows (country, company, genre, department or year).
+          required: true
+          schema:
+            type: string
+        - name: cols
+          in: query
+          description: Dimension of the columns (country, company, genre, department or year), different from rows.
+          required: true
+          schema:
+            type: string
+        - name: sort
+          in: query
+          description: Sort order of the cells, total (largest first) or value. By row and column value by default.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of cells returned, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return cells counting at least this many people.
+          required: false
+          schema:
+            type: integer
+      responses:
+        200:
+          description: Gender distribution statistics by cell fetched successfully.
+          schema:
+            type: array
+            items:
+              type: object
+              properties:
+                year:
+                  type: number
+                  description: The value of the rows dimension (here rows=year).
+                  example: 1995
+                department:
+                  type: string
+                  description: The value of the columns dimension (here cols=department).
+                  example: Directing
+                total_count:
+                  type: integer
+                  description: The number of people (cast or crew) in the cell.
+                  example: 120
+                breakdown:
+                  type: array
+                  description: The count and percentage of every gender (1 = female, 2 = male, 0 = undefined) in the cell.
+                  example: [{"gender": 1, "count": 12, "percentage": 10.0}, {"gender": 2, "count": 108, "percentage": 90.0}]
+        400:
+          description: Missing, invalid or identical dimensions.
+        500:
+          description: An unexpected error occurred while processing the request.
+      """
+      return controller.get_gender_statistics_crosstab()
+
+    # Get gender statistics by any dimensions, with filters
+    @gender_statistics_blueprint.route('/gender-statistics/distribution', methods=['GET'])
+    def get_gender_statistics_distribution():
+      """
+      Get aggregated and computed gender statistics by any dimensions, filtered by any dimension, years and genders.
+      ---
+      tags:
+        - Gender Statistics
+      summary: Retrieve the gender distribution statistics (in numbers and percentages) of a dashboard query in one request.
+      description: Computes the gender breakdown of every combination of the values of the group_by dimensions, counting only the people matching the filters, in a single pass over the data. E.g. group_by=year,department&country=US,GB&year_from=1990&year_to=1999.
+      parameters:
+        - name: group_by
+          in: query
+          description: Comma separated dimensions to group by (country, company, genre, department, year), e.g. year,department.
+          required: true
+          schema:
+            type: string
+        - name: country
+          in: query
+          description: Comma separated country codes to keep, e.g. US,GB. Likewise company, genre, department and year.
+          required: false
+          schema:
+            type: string
+        - name: year_from
+          in: query
+          description: First production year to count.
+          required: false
+          schema:
+            type: integer
+        - name: year_to
+          in: query
+          description: Last production year to count.
+          required: false
+          schema:
+            type: integer
+        - name: gender
+          in: query
+          description: Comma separated genders to count (1 = female, 2 = male, 0 = undefined), all by default.
+          required: false
+          schema:
+            type: string
+        - name: sort
+          in: query
+          description: Sort order of the entries, total (largest first) or value. By value by default with several dimensions.
+          required: false
+          schema:
+            type: string
+        - name: limit
+          in: query
+          description: Maximum number of entries returned, e.g. the top 20 with sort=total.
+          required: false
+          schema:
+            type: integer
+        - name: min_total
+          in: query
+          description: Only return entries counting at least this many people.
+          required: false
+          schema:
+            type: integer
+      responses:
+        200:
+          description: Gender distribution statistics fetched successfully, one entry per combination of values with its total_count and breakdown, as returned by /gender-statistics/crosstab.
+        400:
+          description: Missing or invalid dimensions, filters or options.
+        500:
+          description: An unexpected error occurred while processing the request.
+      """
+      return controller.get_gender_statistics_distribution()
     
     return gender_statistics_blueprint
   
\ No newline at end of file
@@ -22,6 +22,12 @@ def create_movie_blueprint(controller):
         summary: Retrieve all movies with optional filters
         description: Fetches all movies from the database with optional filter (e.g. by title, genre, year).
         parameters:
+          - name: q
+            in: query
+            required: false
+            schema:
+              type: string
+            description: Full-text search on title, tagline and description, results are ranked by relevance (with page pagination).
           - name: title
             in: query
             required: false
@@ -48,7 +54,7 @@ def create_movie_blueprint(controller):
             description: Filter movies by description.
           - name: rating
             in: query
-            description: Filter movies by rating.
+            description: Filter movies by average rating (movies rated at least this on average, 0 to 5).
             required: false
             schema:
               type: number
@@ -72,6 +78,12 @@ def create_movie_blueprint(controller):
               type: integer
               default: 20
             description: Number of items per page for pagination.
+          - name: cursor
+            in: query
+            required: false
+            schema:
+              type: string
+            description: Keyset pagination cursor, taken from the next link (empty for the first page). Replaces page, deep pages are as fast as the first one.
         responses:
           200:
             description: Movies fetched successfully
@@ -119,6 +131,17 @@ def create_movie_blueprint(controller):
                         type: string
                         description: Movie ID
                         example: 1234        
+                      rating:
+                        type: object
+                        description: Average rating and number of ratings, null for movies without ratings
+                        example: {"mean": 3.87, "count": 247}
+                      _links:
+                        type: object
+                        description: Links of the movie, actors and ratings are null when the movie has none
+                        example:
+                          self: /api/v1/movies/12345abcde
+                          actors: /api/v1/credits/actors/12345abcde/actors
+                          ratings: /api/v1/ratings/12345abcde/ratings
           400:
             description: Invalid query parameters
           404:
@@ -182,6 +205,10 @@ def create_movie_blueprint(controller):
                   type: string
                   description: Movie title
                   example: The Shakespearian Adventure       
+                rating:
+                  type: object
+                  description: Average rating, number of ratings and number of ratings by whole star, null for movies without ratings
+                  example: {"mean": 3.87, "count": 247, "histogram": {"3": 80, "4": 120, "5": 47}}
           400:
             description: Invalid movie ID format
           404:
@@ -41,6 +41,12 @@ def create_rating_blueprint(controller):
         type: integer
         default: 20
       description: Number of items per page for pagination.
+    - name: cursor
+      in: query
+      required: false
+      schema:
+        type: string
+      description: Keyset pagination cursor, taken from the next link (empty for the first page). Replaces page, deep pages are as fast as the first one.
     responses:
       200:
         description: Successfully fetched all ratings
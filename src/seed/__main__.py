@@ -0,0 +1,58 @@
+"""
+Standalone seeding job, run from the project root with src on the path:
+
+    PYTHONPATH=src python -m seed [--workers N] [--batch-size N] [--force]
+"""
+import argparse
+import os
+from dotenv import load_dotenv
+from config.logger import get_logger
+from config.mongo_engine import connect_to_database
+from config.mongo_uri import setup_mongo_uri
+from repositories.DBRepo import DBRepo
+from services.DataService import DataService
+from models.MovieModel import MovieMetaData
+from models.RatingsModel import Rating
+from models.CreditsModel import Credit
+from models.GenderDataModel import GenderStatistics
+from models.ActorModel import Actor
+from models.GenderRollupModel import GenderRollup
+from seed.seed_db import seed_database
+
+def main():
+    # Load environment variables before reading any settings
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(prog="python -m seed", description="Seed the movie database from the Kaggle CSV files.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SEED_WORKERS", os.cpu_count() or 1)),
+                        help="Processes seeding credits and gender data (default: SEED_WORKERS or the CPU count)")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("SEED_BATCH_SIZE", 1000)),
+                        help="Documents written per bulk insert (default: SEED_BATCH_SIZE or 1000)")
+    parser.add_argument("--force", action="store_true",
+                        help="Reseed from the beginning even if the database is already seeded")
+    args = parser.parse_args()
+
+    logger = get_logger()
+
+    mongo_uri = setup_mongo_uri(None)
+    if not mongo_uri:
+        logger.error("ERROR: Mongo uri is not valid or set")
+        raise SystemExit(1)
+
+    connect_to_database(mongo_uri)
+
+    data_service = DataService(
+        logger,
+        DBRepo(MovieMetaData, logger),
+        DBRepo(Rating, logger),
+        DBRepo(Credit, logger),
+        DBRepo(GenderStatistics, logger),
+        DBRepo(Actor, logger),
+        DBRepo(GenderRollup, logger),
+        batch_size=args.batch_size
+    )
+
+    seed_database(data_service, logger, mongo_uri, workers=args.workers, force=args.force)
+
+if __name__ == "__main__":
+    main()
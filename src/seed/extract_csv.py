@@ -1,11 +1,40 @@
+import os
 import pandas as pandas
 
-# extract data from ratings_small, movies_metadata, and credits CSV files
-def extract_csv():
-    ratings_small = pandas.read_csv("movie_data/ratings_small.csv").to_dict('records')
-    movies_metadata = pandas.read_csv("movie_data/movies_metadata.csv").to_dict('records')
-    credits_data = pandas.read_csv("movie_data/credits.csv").to_dict('records')
+# Paths to the Kaggle CSV files, the full ratings.csv can be used in production instead of ratings_small.csv.
+# Settings are read when a file is streamed, so that values loaded from .env after import still apply.
+def movies_metadata_csv():
+    return os.getenv("MOVIES_METADATA_CSV", "movie_data/movies_metadata.csv")
 
-    return ratings_small, movies_metadata, credits_data
-  
-ratings_small, movies_metadata, credits_data = extract_csv()
+def ratings_csv():
+    return os.getenv("RATINGS_CSV", "movie_data/ratings_small.csv")
+
+def credits_csv():
+    return os.getenv("CREDITS_CSV", "movie_data/credits.csv")
+
+# Number of CSV rows held in memory at a time while seeding
+def seed_chunk_size():
+    return int(os.getenv("SEED_CHUNK_SIZE", 10000))
+
+# Stream a CSV file in chunks of rows, so that memory use is bounded by the chunk size rather than the file size.
+# The first skip_rows data rows are skipped, to resume seeding after the rows written by an earlier run.
+def stream_csv(path, chunksize=None, skip_rows=0):
+    # A callable, because pandas turns a range of rows to skip into a set, which would not fit in memory for ratings.csv
+    skiprows = (lambda row: 0 < row <= skip_rows) if skip_rows else None
+
+    with pandas.read_csv(path, chunksize=chunksize or seed_chunk_size(), skiprows=skiprows, low_memory=False) as reader:
+        for chunk in reader:
+            yield chunk
+
+# Stream movies_metadata as DataFrame chunks, so that its columns can be parsed a whole column at a time
+def stream_movies_metadata(chunksize=None, skip_rows=0):
+    yield from stream_csv(movies_metadata_csv(), chunksize, skip_rows)
+
+# Stream ratings and credits as chunks of records
+def stream_ratings(chunksize=None, skip_rows=0):
+    for chunk in stream_csv(ratings_csv(), chunksize, skip_rows):
+        yield chunk.to_dict('records')
+
+def stream_credits(chunksize=None, skip_rows=0):
+    for chunk in stream_csv(credits_csv(), chunksize, skip_rows):
+        yield chunk.to_dict('records')
@@ -0,0 +1,236 @@
+import multiprocessing
+import queue
+import zlib
+from mongoengine import disconnect
+from concurrent.futures import ProcessPoolExecutor, wait
+from config.mongo_engine import connect_to_database
+from repositories.DBRepo import DBRepo
+from services.DataService import DataService
+from models.MovieModel import MovieMetaData
+from models.RatingsModel import Rating
+from models.CreditsModel import Credit
+from models.GenderDataModel import GenderStatistics
+from models.ActorModel import Actor
+from models.GenderRollupModel import GenderRollup
+from seed.extract_csv import stream_credits
+from seed.seed_state import get_checkpoint, save_checkpoint, save_partition_checkpoint
+
+# State of a seeding worker process, set once by init_worker
+worker_state = {}
+
+def partition_of(movie_id, partitions):
+    """
+    Map a movie id to a partition. crc32 is used instead of hash(), which is salted differently in every process.
+    """
+    return zlib.crc32(str(movie_id).encode()) % partitions
+
+def get_partition_offsets(partitions):
+    """
+    Return the number of credit rows each partition has already written in an earlier run.
+    Offsets saved for a different number of partitions cannot be reused, the stage then starts over (the upserts keep that safe).
+    """
+    checkpoint = get_checkpoint("credits")
+
+    if checkpoint.get("partitions") != partitions:
+        save_checkpoint("credits", 0, partitions=partitions, offsets={})
+        return [0] * partitions
+
+    offsets = checkpoint.get("offsets", {})
+    return [offsets.get(str(partition), 0) for partition in range(partitions)]
+
+def stream_credit_partitions(offsets, partitions):
+    """
+    Read the credits CSV once, from the earliest offset of the partitions, and split every chunk of rows by partition.
+    Yields (partition, offset, rows) for the partitions that have not written the chunk yet, offset being the number of
+    CSV rows read at the end of the chunk. A partition may get rows it wrote in an earlier run again when its offset falls
+    inside a chunk, the upserts keep that safe.
+    """
+    offset = min(offsets)
+
+    for credits_data in stream_credits(skip_rows=offset):
+        offset += len(credits_data)
+
+        rows = [[] for _ in range(partitions)]
+        for credit in credits_data:
+            rows[partition_of(credit.get('id'), partitions)].append(credit)
+
+        for partition in range(partitions):
+            if offset > offsets[partition]:
+                yield partition, offset, rows[partition]
+
+def seed_credits_partition(data_service, movie_lookup, partition, chunks, on_progress=None):
+    """
+    Seed the credits, gender data and actors of the (offset, rows) chunks of one partition, see stream_credit_partitions.
+    All rows of a movie belong to the same partition, so they are always handled by the same worker.
+    """
+    for offset, credits_data in chunks:
+        credits_inserted = data_service.save_credits(credits_data)
+        gender_data_inserted = data_service.save_gender_data(movie_lookup, credits_data)
+        data_service.save_actors(movie_lookup, credits_data)
+        # Cast and crew are parsed once per chunk and shared by the steps above
+        data_service.clear_parsed_credits()
+
+        save_partition_checkpoint("credits", partition, offset)
+
+        if on_progress:
+            on_progress(len(credits_data), credits_inserted, gender_data_inserted)
+
+def init_worker(mongo_uri, movie_lookup, batch_size, chunk_queues, progress_queue, logger):
+    """
+    Set up a seeding worker with its own MongoDB connection and DataService.
+    """
+    # A forked worker inherits the parent's MongoDB client, which must not be used after a fork
+    disconnect()
+    connect_to_database(mongo_uri)
+
+    worker_state["movie_lookup"] = movie_lookup
+    worker_state["chunk_queues"] = chunk_queues
+    worker_state["progress_queue"] = progress_queue
+    worker_state["data_service"] = DataService(
+        logger,
+        DBRepo(MovieMetaData, logger),
+        DBRepo(Rating, logger),
+        DBRepo(Credit, logger),
+        DBRepo(GenderStatistics, logger),
+        DBRepo(Actor, logger),
+        DBRepo(GenderRollup, logger),
+        batch_size=batch_size
+    )
+
+def seed_worker_partition(partition):
+    """
+    Seed one partition in a worker process from the chunks the parent process sends it, until it sends None.
+    Progress is reported to the parent process.
+    """
+    progress_queue = worker_state["progress_queue"]
+
+    seed_credits_partition(
+        worker_state["data_service"],
+        worker_state["movie_lookup"],
+        partition,
+        iter(worker_state["chunk_queues"][partition].get, None),
+        on_progress=lambda *progress: progress_queue.put(progress)
+    )
+
+def send_chunk(chunk_queue, chunk, check_workers):
+    """
+    Send a chunk (or None, the end of the rows) to a worker, checking on the workers while its queue is full.
+    """
+    while True:
+        try:
+            chunk_queue.put(chunk, timeout=5)
+            return
+        except queue.Full:
+            check_workers()
+
+def stop_workers(chunk_queues):
+    """
+    Make every worker stop after its current chunk, dropping the chunks they have not started, e.g. after a worker failed.
+    """
+    for chunk_queue in chunk_queues:
+        while True:
+            try:
+                while True:
+                    chunk_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            try:
+                chunk_queue.put(None, timeout=1)
+                break
+            except queue.Full:
+                continue
+
+def report_progress(progress_queue, totals, logger):
+    """
+    Merge the progress reported by the workers into the running totals and log them.
+    """
+    updated = False
+
+    while True:
+        try:
+            rows, credits_inserted, gender_data_inserted = progress_queue.get_nowait()
+        except queue.Empty:
+            break
+
+        totals["rows"] += rows
+        totals["credits"] += credits_inserted
+        totals["gender_data"] += gender_data_inserted
+        updated = True
+
+    if updated:
+        logger.info(f"🚀 Processed {totals['rows']} credit rows: {totals['credits']} credits and {totals['gender_data']} gender statistics inserted")
+
+def seed_credits(data_service, movie_lookup, logger, mongo_uri=None, workers=1, heartbeat=None):
+    """
+    Seed credits, gender statistics and actors, resuming every partition from its checkpoint.
+    With more than one worker, the CSV is read once and a pool of processes seeds one partition of movie ids each.
+    The optional heartbeat is called regularly, e.g. to keep the seeding lock alive.
+    """
+    partitions = workers if workers > 1 and mongo_uri else 1
+
+    if partitions > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        # A spawned worker would re-import (and re-run) the module that started the seeding
+        logger.warning("⚠️ Worker processes need the fork start method, which this platform lacks, seeding credits with one process")
+        partitions = 1
+
+    offsets = get_partition_offsets(partitions)
+    totals = {"rows": 0, "credits": 0, "gender_data": 0}
+
+    if partitions == 1:
+        logger.info("🚀 Seeding credits and gender data...")
+
+        def on_progress(rows, credits_inserted, gender_data_inserted):
+            totals["rows"] += rows
+            totals["credits"] += credits_inserted
+            totals["gender_data"] += gender_data_inserted
+            if heartbeat:
+                heartbeat()
+
+        chunks = ((offset, rows) for _, offset, rows in stream_credit_partitions(offsets, 1))
+        seed_credits_partition(data_service, movie_lookup, 0, chunks, on_progress)
+        return totals
+
+    context = multiprocessing.get_context("fork")
+    # The CSV is read and split once, here, every worker gets the rows of its partition through its own queue.
+    # Queues hold a couple of chunks, enough to keep the workers busy while the next chunk is read.
+    chunk_queues = [context.Queue(maxsize=2) for _ in range(partitions)]
+    progress_queue = context.Queue()
+
+    logger.info(f"🚀 Seeding credits and gender data with {partitions} worker processes...")
+
+    with ProcessPoolExecutor(
+        max_workers=partitions,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(mongo_uri, movie_lookup, data_service.batch_size, chunk_queues, progress_queue, logger)
+    ) as executor:
+        futures = [executor.submit(seed_worker_partition, partition) for partition in range(partitions)]
+
+        def check_workers():
+            report_progress(progress_queue, totals, logger)
+            if heartbeat:
+                heartbeat()
+            # Raise the error of a failed worker, if any, rather than waiting for it forever
+            for future in futures:
+                if future.done():
+                    future.result()
+
+        try:
+            for partition, offset, rows in stream_credit_partitions(offsets, partitions):
+                send_chunk(chunk_queues[partition], (offset, rows), check_workers)
+
+            for chunk_queue in chunk_queues:
+                send_chunk(chunk_queue, None, check_workers)
+
+            pending = futures
+            while pending:
+                _, pending = wait(pending, timeout=5)
+                check_workers()
+        except BaseException:
+            stop_workers(chunk_queues)
+            raise
+
+    report_progress(progress_queue, totals, logger)
+
+    return totals
@@ -1,46 +1,154 @@
-from seed.extract_csv import extract_csv
-from mongoengine import connection
+from seed.extract_csv import stream_movies_metadata, stream_ratings
+from seed.parallel_seed import seed_credits
+from seed.seed_state import (
+    seed_owner, acquire_seed_lock, refresh_seed_lock, release_seed_lock, get_completed_stages, get_checkpoint,
+    save_checkpoint, mark_stage_completed, clear_seed_state, get_seed_status, get_changed_sources, is_seed_current,
+    mark_seeded, get_collection_counts, has_checkpoints, clear_seeded_collections, SEED_VERSION
+)
 
-# Check if DB has already been seeded with movie data
+# Check if DB has already been seeded with movie data, from collection metadata rather than counting every document
 def is_db_seeded():
-    db = connection.get_db()
-    if (
-        db["movie_meta_data"].count_documents({}) > 0 and
-        db["rating"].count_documents({}) > 0 and
-        db["credit"].count_documents({}) > 0 and
-        db["gender_statistics"].count_documents({}) > 0
-    ):
-        return True
+    return all(count > 0 for count in get_collection_counts().values())
+
+# Check the seed marker at app startup, seeding itself is done by the standalone seeding job (python -m seed)
+def check_seed_status(logger):
+    seed_status = get_seed_status()
+
+    if not seed_status:
+        if is_db_seeded():
+            logger.warning("⚠️ Database has no seed marker, run the seeding job to record it: python -m seed")
+        else:
+            logger.warning("⚠️ Database is not seeded, run the seeding job: python -m seed")
+    elif seed_status.get("version") != SEED_VERSION:
+        logger.warning("⚠️ Database was seeded by an older version, run the seeding job: python -m seed")
+    elif changed_sources := get_changed_sources(seed_status):
+        # Only sizes and modification times are compared at startup, the seeding job checks the content and reseeds if needed
+        logger.warning(f"⚠️ Seed may be stale, {', '.join(changed_sources)} CSV modified since seeding, run the seeding job: python -m seed")
     else:
+        counts = ", ".join(f"{count} {collection}" for collection, count in seed_status.get("counts", {}).items())
+        logger.info(f"✅ Database seeded ({counts}).")
+
+# Seed the movies, returning the per-movie lookup that gender data seeding needs.
+# Every row is read, since the lookup needs all movies, but rows written by an earlier run are not saved again.
+def seed_movies(data_service, heartbeat, save=True):
+    movie_lookup = {}
+    offset = get_checkpoint("movies").get("offset", 0) if save else 0
+    position = 0
+
+    for movies_frame in stream_movies_metadata():
+      position += len(movies_frame)
+      movies = data_service.prepare_movies(movies_frame)
+      if save and position > offset:
+        data_service.save_movies(movies)
+        save_checkpoint("movies", position)
+      # Keep the (small) per-movie lookup that gender data seeding needs, rather than the full rows
+      movie_lookup.update(data_service.build_movie_lookup(movies))
+      heartbeat()
+
+    return movie_lookup
+
+# Seed the ratings, skipping the rows written by an earlier run.
+# Movie rating summaries are updated with every inserted rating, but ratings stored before this run (by an
+# interrupted or older run) may be missing from them, the summaries are then rebuilt from the ratings collection.
+def seed_ratings(data_service, heartbeat):
+    offset = get_checkpoint("ratings").get("offset", 0)
+    rebuild_summaries = offset > 0 or data_service.rating_db_repo.count() > 0
+
+    for ratings in stream_ratings(skip_rows=offset):
+      offset += len(ratings)
+      data_service.save_ratings(ratings)
+      save_checkpoint("ratings", offset)
+      heartbeat()
+
+    if rebuild_summaries:
+      data_service.rebuild_rating_summaries(heartbeat)
+
+# Seed the database with extracted movie data, resuming an interrupted run from its last checkpoint.
+# Documents are upserted on their natural keys, so rows written again after a crash never create duplicates.
+def seed_database(data_service, logger, mongo_uri=None, workers=1, force=False):
+    owner = seed_owner()
+
+    # Only one process may seed at a time, the others leave the seeding to it
+    if not acquire_seed_lock(owner):
+        logger.info("⏳ Another process is seeding the database, skipping seeding process.")
         return False
 
-# Seed the database with extracted movie data
-def seed_database(data_service, logger):
-    if is_db_seeded():
+    def heartbeat():
+      # Another process took the expired lock and seeds too, this one must stop writing
+      if not refresh_seed_lock(owner):
+        raise RuntimeError("Seeding lock lost to another process, stopping seeding")
+
+    try:
+      if force:
+        logger.info("🚀 Forced reseed, discarding previous seed state and seeded data...")
+        clear_seed_state()
+        clear_seeded_collections()
+      elif is_seed_current():
         logger.info("✅ Database already seeded, skipping seeding process.")
-        return
-    else:
+        # Indexes added since the database was seeded are still created (existing indexes are left as is)
+        data_service.create_indexes()
+        return True
+
+      completed_stages = get_completed_stages()
+      seed_status = get_seed_status()
+
+      # Databases seeded before the seed marker existed only need the marker
+      if not force and not seed_status and not completed_stages and is_db_seeded():
+        logger.info("✅ Database already seeded, recording seed marker.")
+        mark_seeded()
+        return True
+
+      if seed_status and not force:
+        logger.info("🚀 Seed marker is outdated or the source CSVs changed, seeding again...")
+
+        # A new reseed (not the resumption of an interrupted one) starts from empty collections, rows are only
+        # written when missing. The marker goes too, an interrupted reseed then resumes from its checkpoints.
+        if not has_checkpoints():
+          clear_seed_state()
+          clear_seeded_collections()
+
+      if completed_stages:
+        logger.info(f"🚀 Resuming seeding, completed stages: {', '.join(sorted(completed_stages))}")
+      else:
         logger.info("🚀 Seeding the database...")
 
-        ratings_small, movies_metadata, credits_data = extract_csv()
+      # The natural key indexes the upserts look documents up by must exist before anything is written
+      data_service.create_seed_indexes()
+
+      # Save extracted movie data to the database, one chunk of CSV rows at a time.
+      # The movie lookup is rebuilt from the CSV when movies were seeded by an earlier run but credits were not.
+      if "movies" not in completed_stages or "credits" not in completed_stages:
+        logger.info("🚀 Seeding movies...")
+        movie_lookup = seed_movies(data_service, heartbeat, save="movies" not in completed_stages)
+        mark_stage_completed("movies")
+
+      if "ratings" not in completed_stages:
+        logger.info("🚀 Seeding ratings...")
+        seed_ratings(data_service, heartbeat)
+        mark_stage_completed("ratings")
+
+      if "credits" not in completed_stages:
+        # Gender rollups are updated with every inserted gender statistic, but gender statistics stored before this run
+        # (by an interrupted or older run) may be missing from them, the rollups are then rebuilt afterwards
+        rebuild_rollups = bool(get_checkpoint("credits").get("offsets")) or data_service.gender_data_db_repo.count() > 0
+
+        # Gender data is by far the largest collection, with several workers it is fanned out over a process pool
+        seed_credits(data_service, movie_lookup, logger, mongo_uri, workers, heartbeat)
+
+        if rebuild_rollups:
+          data_service.rebuild_gender_rollups(heartbeat)
+        mark_stage_completed("credits")
 
-    try:
-      # Save extracted movie data to the database
-      logger.info("🚀 Seeding movies...")
-      data_service.save_movies(movies_metadata)
-      logger.info("🚀 Seeding ratings...")
-      data_service.save_ratings(ratings_small)
-      logger.info("🚀 Seeding credits...")
-      data_service.save_credits(credits_data)
-      logger.info("🚀 Seeding gender data...")
-      data_service.save_gender_data(movies_metadata, credits_data)
-      
       # Create indexes
       logger.info("🚀 Creating indexes...")
       data_service.create_indexes()
 
+      mark_seeded()
       logger.info('✅ Database seeded and indexes created successfully!')
+      return True
 
     except Exception as e:
       logger.error(f"❌ Error seeding database: {e}")
       raise e
+    finally:
+      release_seed_lock(owner)
@@ -0,0 +1,232 @@
+import datetime
+import hashlib
+import os
+import socket
+from mongoengine import connection
+from pymongo.errors import DuplicateKeyError
+from seed.extract_csv import movies_metadata_csv, ratings_csv, credits_csv
+
+# Bump when a change to seeding requires existing databases to be reseeded
+SEED_VERSION = 6
+
+# How long a seeding lock is valid without being refreshed, so a crashed seeder cannot block seeding forever
+SEED_LOCK_TTL = datetime.timedelta(minutes=15)
+
+SEED_STATUS_ID = "seed"
+SEED_LOCK_ID = "seed"
+
+# Collections written by seeding, counted into the seed marker
+SEED_COLLECTIONS = ["movie_meta_data", "rating", "credit", "gender_statistics", "actor", "gender_rollup"]
+
+def seed_owner():
+    """
+    Identify the current process as the holder of the seeding lock.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def acquire_seed_lock(owner):
+    """
+    Take the seeding lock if it is free or expired. Only one process across all hosts can hold it.
+    """
+    now = utcnow()
+
+    try:
+        # The upsert creates the lock document, a concurrent upsert for a held lock fails on the duplicate _id
+        connection.get_db()["seed_lock"].find_one_and_update(
+            {"_id": SEED_LOCK_ID, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "acquired_at": now, "expires_at": now + SEED_LOCK_TTL}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+def refresh_seed_lock(owner):
+    """
+    Extend the seeding lock, call regularly while seeding is in progress.
+    Returns False if the lock is no longer held by the owner (it expired and another process took it).
+    """
+    result = connection.get_db()["seed_lock"].update_one(
+        {"_id": SEED_LOCK_ID, "owner": owner},
+        {"$set": {"expires_at": utcnow() + SEED_LOCK_TTL}}
+    )
+
+    return result.matched_count > 0
+
+def release_seed_lock(owner):
+    connection.get_db()["seed_lock"].delete_one({"_id": SEED_LOCK_ID, "owner": owner})
+
+def get_completed_stages():
+    """
+    Return the seeding stages (movies, ratings, credits) completed by an earlier, possibly interrupted, run.
+    """
+    completed = connection.get_db()["seed_checkpoint"].find({"completed": True}, {"_id": 1})
+    return {checkpoint["_id"] for checkpoint in completed}
+
+def get_checkpoint(stage):
+    """
+    Return the checkpoint of a stage: the number of CSV rows already written ("offset"), or per partition
+    offsets ("offsets") for stages seeded by several workers.
+    """
+    return connection.get_db()["seed_checkpoint"].find_one({"_id": stage}) or {}
+
+def save_checkpoint(stage, offset, **fields):
+    """
+    Record that the first offset CSV rows of a stage have been written.
+    """
+    connection.get_db()["seed_checkpoint"].update_one(
+        {"_id": stage},
+        {"$set": {"offset": offset, "updated_at": utcnow(), **fields}},
+        upsert=True
+    )
+
+def save_partition_checkpoint(stage, partition, offset):
+    """
+    Record that a worker has written its rows among the first offset CSV rows of a stage.
+    """
+    connection.get_db()["seed_checkpoint"].update_one(
+        {"_id": stage},
+        {"$set": {f"offsets.{partition}": offset, "updated_at": utcnow()}},
+        upsert=True
+    )
+
+def mark_stage_completed(stage):
+    connection.get_db()["seed_checkpoint"].update_one(
+        {"_id": stage},
+        {"$set": {"completed": True, "completed_at": utcnow()}},
+        upsert=True
+    )
+
+def has_checkpoints():
+    """
+    Check whether a seeding run has saved any checkpoint, i.e. a run is in progress or was interrupted.
+    """
+    return connection.get_db()["seed_checkpoint"].find_one({}, {"_id": 1}) is not None
+
+def clear_seeded_collections():
+    """
+    Delete the documents of the seeded collections, so a reseed writes every row again.
+    Seeding upserts only insert missing documents, rows changed in the source CSVs would otherwise never be written.
+    """
+    db = connection.get_db()
+    for collection in SEED_COLLECTIONS:
+        db[collection].delete_many({})
+
+def clear_seed_state():
+    """
+    Forget the checkpoints and seed marker, so the next run starts from the beginning.
+    """
+    db = connection.get_db()
+    db["seed_checkpoint"].delete_many({})
+    db["seed_status"].delete_one({"_id": SEED_STATUS_ID})
+
+def get_seed_status():
+    """
+    Read the seed marker, a single document lookup by _id.
+    """
+    return connection.get_db()["seed_status"].find_one({"_id": SEED_STATUS_ID})
+
+def get_seeded_at():
+    """
+    Return when the database was last seeded (None if it never was), changes whenever the seeded data may have changed.
+    """
+    seed_status = connection.get_db()["seed_status"].find_one({"_id": SEED_STATUS_ID}, {"seeded_at": 1})
+    return seed_status.get("seeded_at") if seed_status else None
+
+def get_collection_counts():
+    """
+    Count the documents of the seeded collections from collection metadata, without scanning them.
+    """
+    db = connection.get_db()
+    return {collection: db[collection].estimated_document_count() for collection in SEED_COLLECTIONS}
+
+def get_source_paths():
+    return {"movies": movies_metadata_csv(), "ratings": ratings_csv(), "credits": credits_csv()}
+
+def file_checksum(path):
+    sha256 = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+def describe_source(path):
+    """
+    Fingerprint a source CSV: size and modification time are cheap to compare, the checksum settles any difference.
+    """
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime": stat.st_mtime, "sha256": file_checksum(path)}
+
+def is_source_changed(source, verify=False):
+    """
+    Check whether a source CSV differs from the one recorded in the seed marker, from its size and modification time.
+    With verify, a file whose size is unchanged is hashed to settle whether its content changed (e.g. it was only
+    copied). A missing file (e.g. in an app container without the CSVs) is not reported as a change.
+    """
+    path = source.get("path")
+
+    if not path or not os.path.exists(path):
+        return False
+
+    stat = os.stat(path)
+    if stat.st_size == source.get("size") and stat.st_mtime == source.get("mtime"):
+        return False
+
+    if stat.st_size != source.get("size") or not verify:
+        return True
+
+    return file_checksum(path) != source.get("sha256")
+
+def get_changed_sources(seed_status, verify=False):
+    """
+    Return the names of the source CSVs that changed since the database was seeded. Only size and modification time
+    are compared, cheap enough for app startup. With verify (the seeding job), files are hashed when needed and the
+    marker records the new modification time of the unchanged ones, so they are not hashed again.
+    """
+    changed_sources = []
+
+    for name, source in seed_status.get("sources", {}).items():
+        if is_source_changed(source, verify):
+            changed_sources.append(name)
+            continue
+
+        # An unchanged file with a new modification time (e.g. copied), record it so the file is not hashed again
+        path = source.get("path")
+        mtime = os.stat(path).st_mtime if verify and path and os.path.exists(path) else source.get("mtime")
+        if mtime != source.get("mtime"):
+            connection.get_db()["seed_status"].update_one({"_id": SEED_STATUS_ID}, {"$set": {f"sources.{name}.mtime": mtime}})
+
+    return changed_sources
+
+def is_seed_current():
+    """
+    Check whether the database is seeded by this version from the current CSVs, hashing the CSVs when needed.
+    Used by the seeding job, app startup only reads the marker (see check_seed_status).
+    """
+    seed_status = get_seed_status()
+    return bool(seed_status) and seed_status.get("version") == SEED_VERSION and not get_changed_sources(seed_status, verify=True)
+
+def mark_seeded():
+    """
+    Write the seed marker checked at app startup and drop the checkpoints of the finished run.
+    The marker records the seed version, the collection counts and fingerprints of the source CSVs.
+    """
+    sources = {name: describe_source(path) for name, path in get_source_paths().items() if os.path.exists(path)}
+
+    db = connection.get_db()
+    db["seed_status"].update_one(
+        {"_id": SEED_STATUS_ID},
+        {"$set": {
+            "version": SEED_VERSION,
+            "seeded_at": utcnow(),
+            "counts": get_collection_counts(),
+            "sources": sources
+        }},
+        upsert=True
+    )
+    db["seed_checkpoint"].delete_many({})
@@ -1,127 +1,171 @@
+import functools
+
+# Gender statistics field of each dimension of the gender distributions, in the order of the summary
+GENDER_DISTRIBUTION_FIELDS = {
+    'country': 'countries',
+    'company': 'companies',
+    'genre': 'genres',
+    'department': 'department',
+    'year': 'year',
+}
+GENDER_DISTRIBUTION_DIMENSIONS = list(GENDER_DISTRIBUTION_FIELDS)
+
+# Gender statistics fields holding a list of values, unwound to group by them
+GENDER_DISTRIBUTION_LIST_FIELDS = {'countries', 'companies', 'genres'}
+
+class Param:
+    """
+    Placeholder of a compiled pipeline for the value of a parameter, see bind.
+    """
+    def __init__(self, name):
+        self.name = name
+
+def bind(template, params):
+    """
+    Copy a compiled pipeline, replacing its placeholders with the values of the parameters.
+    """
+    if isinstance(template, Param):
+        return params[template.name]
+    if isinstance(template, dict):
+        return {key: bind(value, params) for key, value in template.items()}
+    if isinstance(template, list):
+        return [bind(item, params) for item in template]
+
+    return template
+
 class AggregationPipelineService:
     def __init__(self, logger):
         self.logger = logger
+        # Pipelines are compiled once per shape, see gender_distribution
+        self.compile_gender_distribution = functools.lru_cache(maxsize=256)(self.compile_gender_distribution)
 
-    def gender_distribution_by_country(self, country=None):
+    def gender_distribution_summary(self, dimensions=None, sort=None, limit=None, min_total=None):
         """
-        Construct aggregation pipeline for gender data by country.
-        If a country is provided, filter the data by that country, if not, return the pipeline for all countries.
+        Construct a single aggregation pipeline computing the gender distributions of several dimensions (all by default)
+        in one pass over the collection, with one $facet per dimension. Returns a single document of results by dimension.
+        The sort, limit and min_total options apply to every dimension.
         """
-        self.logger.info("Constructing aggregation pipeline for gender data by production country...")
-
-        match_stage = { 
-           "countries": { "$exists": True },
-           "gender": { "$in": [0, 1, 2] }
-          }
- 
-        if country:
-            # If a country is provided, filter the data by that country
-            match_stage["countries"] = country
+        self.logger.info("Constructing aggregation pipeline for the gender distribution summary...")
 
         return [
-          # Use match to utilize the compound index on country and gender
-          { "$match": match_stage },
-
-          # Unwind the countries array to get individual country documents
-          { "$unwind": "$countries" },
-          
-          # Match again after unwind if specific country was requested
-          *([{ "$match": { "countries": country } }] if country else []),
+          # Every distribution only counts known genders, filtered once (with the index) before the documents are shared by the facets
+          { "$match": { "gender": { "$in": [0, 1, 2] } } },
 
-          # Group by country and gender to count occurrences
-          {
-            "$group": {
-              "_id": 
-                { 
-                 "country": "$countries", 
-                 "gender": "$gender" 
-                 },
-              "count": { "$sum": 1 }
-            }
-          },
-          
-          # Regroup by country to get total counts
-          {
-            "$group": {
-              "_id": "$_id.country",
-              "total_count": { "$sum": "$count" },
-              "breakdown": {
-                "$push": {
-                  "gender": "$_id.gender",
-                  "count": "$count"
-                }
-              }
-            }
-          },
-          
-          # Project the final output
-          {
-            "$project": {
-              "country": "$_id",
-              "total_count": "$total_count",
-              "breakdown": {
-                "$map": {
-                  "input": "$breakdown",
-                  "as": "item",
-                  "in": {
-                    "gender": "$$item.gender",
-                    "count": "$$item.count",
-                    "percentage": {
-                      "$multiply": [
-                        { "$divide": ["$$item.count", "$total_count"] },
-                        100
-                      ]
-                    }
-                  }
-                }
-              }
-            }
-          }
+          { "$facet": {
+            dimension: self.gender_distribution([dimension], sort=sort, limit=limit, min_total=min_total)
+            for dimension in dimensions or GENDER_DISTRIBUTION_DIMENSIONS
+          } }
         ]
- 
-    def gender_distribution_by_company(self, company=None):
 
+    def gender_crosstab(self, rows, cols, sort=None, limit=None, min_total=None):
         """
-        Construct aggregation pipeline for gender data by company.
-        If a company is provided, filter the data by that company, if not, return the pipeline for all companies.
+        Construct aggregation pipeline for gender data by two dimensions at once (e.g. year and department), with one
+        result per (row, column) cell holding its gender breakdown, in a single grouped pass over the collection.
+        Cells are sorted by row and column unless sorted by total.
         """
-        self.logger.info("Constructing aggregetion pipeline for gender data by company...")
-        
-        match_stage = {
-           "companies": { "$exists": True },
-           "gender": { "$in": [0, 1, 2] }
+        self.logger.info(f"Constructing aggregation pipeline for the gender crosstab by {rows} and {cols}...")
+
+        return self.gender_distribution([rows, cols], sort=sort or 'value', limit=limit, min_total=min_total)
+
+    def gender_distribution(self, group_by, filters=None, year_range=None, genders=None, sort=None, limit=None, min_total=None, after=None):
+        """
+        Construct aggregation pipeline for gender data by any dimensions, e.g. ["year", "department"], with one result
+        per combination of their values holding its gender breakdown.
+        :param group_by: Dimensions to group by (keys of GENDER_DISTRIBUTION_FIELDS).
+        :param filters: Optional value, or list of values, to keep by dimension, e.g. {"country": ["US", "GB"], "department": "Acting"}.
+        :param year_range: Optional (from, to) years, inclusive, either of them may be None.
+        :param genders: Optional genders to count (0, 1 or 2), all of them by default.
+        The sort, limit, min_total and after options are those of pagination_stages.
+        Pipelines are compiled once per shape (the dimensions, filters and options used, not their values), then bound
+        to the values of the request.
+        """
+        self.logger.info(f"Constructing aggregation pipeline for gender data by {', '.join(group_by)}...")
+
+        filters = {dimension: value for dimension, value in (filters or {}).items() if value}
+        year_from, year_to = year_range or (None, None)
+
+        shape = (
+          tuple(group_by),
+          tuple(sorted((dimension, isinstance(value, (list, tuple))) for dimension, value in filters.items())),
+          year_from is not None,
+          year_to is not None,
+          bool(genders),
+          sort,
+          bool(limit),
+          bool(min_total),
+          bool(after)
+        )
+
+        params = {
+          **{f"filter_{dimension}": list(value) if isinstance(value, (list, tuple)) else value for dimension, value in filters.items()},
+          "year_from": year_from,
+          "year_to": year_to,
+          "genders": list(genders or []),
+          "limit": limit,
+          "min_total": min_total,
+          "after_pk": after.get("pk") if after else None,
+          "after_value": after.get("value") if after else None,
         }
-        
-        if company:
-            # If a company is provided, filter the data by that company
-            match_stage["companies"] = company
-        
-        return [
-          # Use match to utilize the compound index on company
-          { "$match": match_stage },
-          
-          # Unwind the companies array to get individual company documents
-          { "$unwind": "$companies" },
-          
-          # Match again after unwind if specific company was requested
-          *([{ "$match": { "companies": company } }] if company else []),
-          
-          # Group by company and gender to count occurrences
+
+        return bind(self.compile_gender_distribution(shape), params)
+
+    def compile_gender_distribution(self, shape):
+        """
+        Construct the pipeline of a shape of gender_distribution, with placeholders for the values of the request.
+        """
+        group_by, filters, has_year_from, has_year_to, has_genders, sort, has_limit, has_min_total, has_after = shape
+        self.logger.info(f"Compiling aggregation pipeline for gender data by {', '.join(group_by)}...")
+
+        # Every filter goes in the first $match, before any $unwind, where the compound (field, gender) indexes apply
+        match_stage = {GENDER_DISTRIBUTION_FIELDS[dimension]: { "$exists": True } for dimension in group_by}
+
+        for dimension, is_list in filters:
+            match_stage[GENDER_DISTRIBUTION_FIELDS[dimension]] = { "$in": Param(f"filter_{dimension}") } if is_list else Param(f"filter_{dimension}")
+
+        if has_year_from or has_year_to:
+            year = match_stage.get("year")
+            year = { "$eq": year } if isinstance(year, Param) else { **(year or {}) }
+            # The range implies the year exists
+            year.pop("$exists", None)
+
+            if has_year_from:
+                year["$gte"] = Param("year_from")
+            if has_year_to:
+                year["$lte"] = Param("year_to")
+
+            match_stage["year"] = year
+
+        match_stage["gender"] = { "$in": Param("genders") if has_genders else [0, 1, 2] }
+
+        stages = [{ "$match": match_stage }]
+
+        # Unwind the list fields grouped by, a document counts in the group of each of its values
+        for dimension in group_by:
+            field = GENDER_DISTRIBUTION_FIELDS[dimension]
+
+            if field in GENDER_DISTRIBUTION_LIST_FIELDS:
+                stages.append({ "$unwind": f"${field}" })
+
+                # Match again after unwind if the field is filtered, only its filtered values are counted
+                if dimension in dict(filters):
+                    stages.append({ "$match": { field: match_stage[field] } })
+
+        single = len(group_by) == 1
+        value_fields = ["_id"] if single else [f"_id.{dimension}" for dimension in group_by]
+
+        stages += [
+          # Group by dimensions and gender to count occurrences
           {
             "$group": {
-              "_id": 
-                { 
-                 "company": "$companies",
-                 "gender": "$gender"
-                },
+              "_id": { **{dimension: f"${GENDER_DISTRIBUTION_FIELDS[dimension]}" for dimension in group_by}, "gender": "$gender" },
               "count": { "$sum": 1 }
             }
           },
-          
-          # Regroup by company to get total counts
+
+          # Regroup by dimensions to get total counts
           {
             "$group": {
-              "_id": "$_id.company",
+              "_id": f"$_id.{group_by[0]}" if single else {dimension: f"$_id.{dimension}" for dimension in group_by},
               "total_count": { "$sum": "$count" },
               "breakdown": {
                 "$push": {
@@ -131,12 +175,21 @@ class AggregationPipelineService:
               }
             }
           },
-          
-          # Project the final output
+
+          # Filter, sort and limit the groups before they are projected and sent
+          *self.pagination_stages(
+            sort,
+            Param("limit") if has_limit else None,
+            Param("min_total") if has_min_total else None,
+            { "pk": Param("after_pk"), "value": Param("after_value") } if has_after else None,
+            value_fields
+          ),
+
+          # Project the final output, the value of a single dimension is also kept as _id
           {
             "$project": {
-              "company": "$_id",
-              "total_count": "$total_count",
+              **({ group_by[0]: "$_id" } if single else { "_id": 0, **{dimension: f"$_id.{dimension}" for dimension in group_by} }),
+              "total_count": 1,
               "breakdown": {
                 "$map": {
                   "input": "$breakdown",
@@ -156,221 +209,72 @@ class AggregationPipelineService:
             }
           }
         ]
-        
-    def gender_distribution_by_genre(self, genre=None):
+
+        return stages
+
+    def pagination_stages(self, sort=None, limit=None, min_total=None, after=None, value_fields=("_id",)):
+        """
+        Construct the stages filtering, sorting and limiting the groups of a distribution, placed after its regroup stage
+        (groups keyed by value, with their total_count) so that only the entries a client shows are sent.
+        sort is "total" (largest groups first, ties by value) or "value". after is the position of the last entry of the
+        previous page for keyset pagination, which needs a sort: its value as "pk" and, sorted by total, its total as "value".
+        """
+        stages = []
+
+        if min_total:
+            stages.append({ "$match": { "total_count": { "$gte": min_total } } })
+
+        if after:
+            if sort == 'total':
+                stages.append({ "$match": { "$or": [
+                  { "total_count": { "$lt": after["value"] } },
+                  { "total_count": after["value"], "_id": { "$gt": after["pk"] } }
+                ] } })
+            else:
+                stages.append({ "$match": { "_id": { "$gt": after["pk"] } } })
+
+        # With a $limit right after it, $sort only keeps the top entries in memory
+        if sort == 'total':
+            stages.append({ "$sort": { "total_count": -1, **{ field: 1 for field in value_fields } } })
+        elif sort == 'value':
+            stages.append({ "$sort": { field: 1 for field in value_fields } })
+
+        if limit:
+            stages.append({ "$limit": limit })
+
+        return stages
+
+    def gender_distribution_by_country(self, country=None, sort=None, limit=None, min_total=None, after=None):
+        """
+        Construct aggregation pipeline for gender data by production country.
+        If a country (or a list of countries) is provided, filter the data by it, if not, return the pipeline for all countries.
+        """
+        return self.gender_distribution(["country"], {"country": country}, sort=sort, limit=limit, min_total=min_total, after=after)
+
+    def gender_distribution_by_company(self, company=None, sort=None, limit=None, min_total=None, after=None):
+        """
+        Construct aggregation pipeline for gender data by production company.
+        If a company (or a list of companies) is provided, filter the data by it, if not, return the pipeline for all companies.
+        """
+        return self.gender_distribution(["company"], {"company": company}, sort=sort, limit=limit, min_total=min_total, after=after)
+
+    def gender_distribution_by_genre(self, genre=None, sort=None, limit=None, min_total=None, after=None):
         """
         Construct aggregation pipeline for gender data by movie genre.
-        If a genre is provided, filter the data by that genre, if not, return the pipeline for all genres.
+        If a genre (or a list of genres) is provided, filter the data by it, if not, return the pipeline for all genres.
         """
-        self.logger.info("Retrieving aggregation pipeline for gender data by genre...")
-        
-        match_stage = {
-           "genres": { "$exists": True },
-           "gender": { "$in": [0, 1, 2] }
-        }
-        
-        if genre:
-            # If a genre is provided, filter the data by that genre
-            match_stage["genres"] = genre
-       
-        
-        return [
-          # Use match to utilize the compound index on genre
-          { "$match": match_stage },
-          
-          # Unwind the genres array to get individual genre documents
-          { "$unwind": "$genres" },
-          
-          # Match again after unwind if specific genre was requested
-          *([{ "$match": { "genres": genre } }] if genre else []),
-          
-          # Group by genre and gender to count occurrences
-          {
-            "$group": {
-              "_id": 
-                { 
-                 "genre": "$genres",
-                 "gender": "$gender"
-                },
-              "count": { "$sum": 1 }
-            }
-          },
-          
-          # Regroup by genre to get total counts
-          {
-            "$group": {
-              "_id": "$_id.genre",
-              "total_count": { "$sum": "$count" },
-              "breakdown": {
-                "$push": {
-                  "gender": "$_id.gender",
-                  "count": "$count"
-                }
-              }
-            }
-          },
-          
-          # Project the final output
-          {
-            "$project": {
-              "genre": "$_id",
-              "total_count": "$total_count",
-              "breakdown": {
-                "$map": {
-                  "input": "$breakdown",
-                  "as": "item",
-                  "in": {
-                    "gender": "$$item.gender",
-                    "count": "$$item.count",
-                    "percentage": {
-                      "$multiply": [
-                        { "$divide": ["$$item.count", "$total_count"] },
-                        100
-                      ]
-                    }
-                  }
-                }
-              }
-            }
-          }
-        ]
-    
-    def gender_distribution_by_department(self, department=None):
+        return self.gender_distribution(["genre"], {"genre": genre}, sort=sort, limit=limit, min_total=min_total, after=after)
+
+    def gender_distribution_by_department(self, department=None, sort=None, limit=None, min_total=None, after=None):
         """
         Construct aggregation pipeline for gender data by department.
-        If a department is provided, filter the data by that department, if not, return the pipeline for all departments.
+        If a department (or a list of departments) is provided, filter the data by it, if not, return the pipeline for all departments.
         """
-        self.logger.info("Retrieving aggregation pipeline for gender data by department...")
-      
-        match_stage = {
-           "department": { "$exists": True },
-           "gender": { "$in": [0, 1, 2] }
-        }
-        
-        if department:
-            # If a department is provided, filter the data by that department
-            match_stage["department"] = department
+        return self.gender_distribution(["department"], {"department": department}, sort=sort, limit=limit, min_total=min_total, after=after)
 
-        return [
-          { "$match": match_stage },
-          
-          # Group by department and gender to count occurrences
-          {
-            "$group": {
-              "_id": 
-                { 
-                 "department": "$department",
-                 "gender": "$gender"
-                },
-              "count": { "$sum": 1 }
-            }
-            
-          # Regroup by department to get total counts
-          },
-          {
-            "$group": {
-              "_id": "$_id.department",
-              "total_count": { "$sum": "$count" },
-              "breakdown": {
-                "$push": {
-                  "gender": "$_id.gender",
-                  "count": "$count"
-                }
-              }
-            }
-            
-          # Project the final output
-          },
-          {
-            "$project": {
-              "department": "$_id", 
-              "total_count": 1,
-              "breakdown": {
-                "$map": {
-                  "input": "$breakdown",
-                  "as": "item",
-                  "in": {
-                    "gender": "$$item.gender",
-                    "count": "$$item.count",
-                    "percentage": {
-                      "$multiply": [
-                        { "$divide": ["$$item.count", "$total_count"] },
-                        100
-                      ]
-                    }
-                  }
-                }
-              }
-            }
-          }
-        ]
-    
-    def gender_distribution_by_year(self, year=None):
+    def gender_distribution_by_year(self, year=None, sort=None, limit=None, min_total=None, after=None):
         """
         Construct aggregation pipeline for gender data by year.
-        If a year is provided, filter the data by that year, if not, return the pipeline for all years.
+        If a year (or a list of years) is provided, filter the data by it, if not, return the pipeline for all years.
         """
-        self.logger.info("Retrieving aggregation pipeline for gender data by year...")
-        
-        match_stage = {
-           "year": { "$exists": True },
-           "gender": { "$in": [0, 1, 2] }
-        }
-        
-        if year:
-            # If a year is provided, filter the data by that year
-            match_stage["year"] = year
-        
-        return [
-          { "$match": match_stage },
-          
-          # Group by year and gender to count occurrences
-          {
-            "$group": {
-              "_id": 
-                { 
-                 "year": "$year",
-                 "gender": "$gender"
-                },
-              "count": { "$sum": 1 }
-            }
-            
-          # Regroup by year to get total counts
-          },
-          {
-            "$group": {
-              "_id": "$_id.year",
-              "total_count": { "$sum": "$count" },
-              "breakdown": {
-                "$push": {
-                  "gender": "$_id.gender",
-                  "count": "$count"
-                }
-              }
-            }
-            
-          # Project the final output
-          },
-          {
-            "$project": {
-              "year": "$_id", 
-              "total_count": 1,
-              "breakdown": {
-                "$map": {
-                  "input": "$breakdown",
-                  "as": "item",
-                  "in": {
-                    "gender": "$$item.gender",
-                    "count": "$$item.count",
-                    "percentage": {
-                      "$multiply": [
-                        { "$divide": ["$$item.count", "$total_count"] },
-                        100
-                      ]
-                    }
-                  }
-                }
-              }
-            }
-          }
-        ]
\ No newline at end of file
+        return self.gender_distribution(["year"], {"year": year}, sort=sort, limit=limit, min_total=min_total, after=after)
@@ -1,88 +1,124 @@
 import pandas as pandas
-import ast as ast
 import uuid
 import math
+import time
 from models.MovieModel import MovieMetaData
 from models.RatingsModel import Rating
 from models.CreditsModel import Credit, Cast, Crew
 from models.GenderDataModel import GenderStatistics
+from models.ActorModel import Actor, ActorMovie
+from models.GenderRollupModel import ROLLUP_DIMENSIONS, rollup_id
 from utils.custom_status_codes import GENERAL_CUSTOM_STATUS_CODES
 from utils.CustomErrors import CustomError
+from utils.parse_literal import parse_literal
+from utils.normalize_text import normalize_text, tokenize_text
+
+# Columns of movies_metadata.csv that are stored on MovieMetaData
+MOVIE_CSV_COLUMNS = [
+    'id', 'adult', 'belongs_to_collection', 'budget', 'genres', 'homepage', 'imdb_id', 'original_language',
+    'original_title', 'overview', 'popularity', 'poster_path', 'production_companies', 'production_countries',
+    'release_date', 'revenue', 'runtime', 'spoken_languages', 'status', 'tagline', 'title', 'video',
+    'vote_average', 'vote_count'
+]
+
+# Natural keys of the seeded collections, used to upsert seeded rows without duplicating them
+MOVIE_KEY = ['movie_id']
+RATING_KEY = ['user_id', 'movie_id']
+CREDIT_KEY = ['_id']
+# A person can have several credits in a movie (e.g. Director and Screenplay), each one is a gender statistic
+GENDER_DATA_KEY = ['movie_id', 'credit_id']
+ACTOR_KEY = ['person_id']
+
+# Pipeline update recomputing the mean of a movie's rating summary from its count and total
+RATING_MEAN_UPDATE = [
+    {'$set': {'rating_summary.mean': {'$divide': ['$rating_summary.total', '$rating_summary.count']}}}
+]
 
 # Service to save extracted movie data to the database
 class DataService:
-    def __init__(self, logger, gender_data_db_repo):
+    def __init__(self, logger, movie_db_repo, rating_db_repo, credit_db_repo, gender_data_db_repo, actor_db_repo, gender_rollup_db_repo, batch_size=1000):
         self.logger = logger
+        self.movie_db_repo = movie_db_repo
+        self.rating_db_repo = rating_db_repo
+        self.credit_db_repo = credit_db_repo
         self.gender_data_db_repo = gender_data_db_repo
+        self.actor_db_repo = actor_db_repo
+        self.gender_rollup_db_repo = gender_rollup_db_repo
+        # Number of documents written per insert_many call when seeding
+        self.batch_size = batch_size
+        # Parsed cast and crew lists keyed by movie id, shared between credit and gender data seeding
+        self.parsed_credits = {}
     
-    def save_movies(self, movies_metadata):
-        for movie in movies_metadata[:10000]:  # Limit to 10000 movies for performance
+    def save_movies(self, movies):
+        """
+        Save movies prepared by prepare_movies, skipping movies that are already stored.
+        """
+        documents = []
+        seen_ids = set()
 
-            # Validate movie ID
-            try:
-                movie_id = str(movie['id'])
-            except (ValueError, TypeError):
-                self.logger.warning(f"Invalid movie ID: {movie['id']}. Skipping...")
-                continue
+        # Fetch the ids that are already stored in a single query instead of one probe per movie
+        existing_ids = set(self.movie_db_repo.distinct(
+            'movie_id', {'movie_id__in': [movie['movie_id'] for movie in movies]}
+        ))
+
+        for movie in movies:
+            movie_id = movie['movie_id']
 
-            # Check if the movie already exists
-            if MovieMetaData.objects(movie_id=movie_id).first():
-                self.logger.info(f"Skipping duplicate movie with ID: {movie_id}")
+            # Skip movies that are already stored or appear twice in the source data
+            if movie_id in existing_ids or movie_id in seen_ids:
+                self.logger.debug(f"Skipping duplicate movie with ID: {movie_id}")
                 continue
 
+            seen_ids.add(movie_id)
+
             try:
-                # Preprocess fields to handle invalid values (as suggested by copilot)
-                runtime = movie.get('runtime', 0)
-                runtime = int(runtime) if not pandas.isna(runtime) else 0
-                
-                release_date = pandas.to_datetime(movie.get('release_date'), errors='coerce')
-                release_date = release_date if not pandas.isna(release_date) else None
-                
-                revenue = movie.get('revenue', 0)
-                revenue = int(revenue) if not pandas.isna(revenue) and revenue is not None else 0
-                
-                vote_count = movie.get('vote_count', 0)
-                vote_count = int(vote_count) if not pandas.isna(vote_count) and vote_count is not None else 0
-                
-                budget = movie.get('budget', 0)
-                budget = int(budget) if not pandas.isna(budget) and isinstance(budget, (int, float)) else 0
-                
-                belongs_to_collection = self.convert_to_dict(movie.get('belongs_to_collection'))
-                
-                production_companies = self.convert_to_list(movie.get('production_companies'))
-                production_countries = self.convert_to_list(movie.get('production_countries'))
-                
-                movie_doc = MovieMetaData(
-                    movie_id=movie_id,
-                    adult=movie.get('adult', False),
-                    belongs_to_collection=belongs_to_collection,
-                    budget=budget,
-                    genres=self.convert_to_list(movie.get('genres')),
-                    homepage=self.safe_string(movie.get('homepage')),
-                    imdb_id=self.safe_string(movie.get('imdb_id')),
-                    original_language=self.safe_string(movie.get('original_language')),
-                    original_title=self.safe_string(movie.get('original_title')),
-                    overview=self.safe_string(movie.get('overview')),
-                    popularity=movie.get('popularity', 0.0),
-                    poster_path=self.safe_string(movie.get('poster_path')),
-                    production_companies=production_companies,
-                    production_countries=production_countries,
-                    release_date=release_date,
-                    revenue=revenue,
-                    runtime=runtime,
-                    spoken_languages=self.convert_to_list(movie.get('spoken_languages')),
-                    status=self.safe_string(movie.get('status')),
-                    tagline=self.safe_string(movie.get('tagline')),
-                    title=self.safe_string(movie.get('title')),
-                    video=movie.get('video', False),
-                    vote_average=movie.get('vote_average', 0.0),
-                    vote_count=vote_count
-                )
-                movie_doc.save()
+                documents.append(self.to_raw_document(MovieMetaData(**movie)))
             except Exception as e:
                 self.logger.error(f"Error saving movie with ID: {movie_id}. Error: {e}")
                 raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
-            
+
+        return self.upsert_in_batches(self.movie_db_repo, documents, MOVIE_KEY, "movies")
+
+    def prepare_movies(self, movies_frame):
+        """
+        Parse a chunk of the movies metadata CSV into MovieMetaData field dicts.
+        Scalar columns are coerced a whole column at a time, invalid values become None/0 like before.
+        """
+        frame = movies_frame.reindex(columns=MOVIE_CSV_COLUMNS)
+        frame = frame[frame['id'].notna()]
+
+        # Ids are read as floats when pandas sees a gap in the column, avoid storing them as "862.0"
+        ids = frame['id']
+        if pandas.api.types.is_float_dtype(ids):
+            ids = ids.astype('int64')
+
+        prepared = pandas.DataFrame({'movie_id': ids.astype(str)}, index=frame.index)
+
+        # Coerce unparseable dates to NaT and unparseable numbers to 0 (as the per-row parsing did)
+        release_dates = pandas.to_datetime(frame['release_date'], errors='coerce', format='ISO8601')
+        prepared['release_date'] = release_dates.astype(object).where(release_dates.notna(), None)
+
+        for column in ('runtime', 'revenue', 'budget', 'vote_count'):
+            prepared[column] = pandas.to_numeric(frame[column], errors='coerce').fillna(0).astype('int64')
+
+        for column in ('popularity', 'vote_average'):
+            prepared[column] = pandas.to_numeric(frame[column], errors='coerce').fillna(0.0)
+
+        # The CSV stores booleans as the strings "True"/"False"
+        for column in ('adult', 'video'):
+            prepared[column] = frame[column].astype(str).str.lower() == 'true'
+
+        for column in ('homepage', 'imdb_id', 'original_language', 'original_title', 'overview',
+                       'poster_path', 'status', 'tagline', 'title'):
+            prepared[column] = frame[column].map(self.safe_string)
+
+        prepared['belongs_to_collection'] = frame['belongs_to_collection'].map(self.convert_to_dict)
+
+        for column in ('genres', 'production_companies', 'production_countries', 'spoken_languages'):
+            prepared[column] = frame[column].map(self.convert_to_list)
+
+        return prepared.to_dict('records')
+
     def save_new_movie(self, movie_data):
         self.logger.info("Saving new movie to the database")
 
@@ -116,7 +152,9 @@ class DataService:
             raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
 
     def save_ratings(self, ratings_small):
-        for rating in ratings_small[:10000]:  # Limit to 10000 ratings for performance
+        documents = []
+
+        for rating in ratings_small:
             # Validate user ID and movie ID
             user_id = rating.get('userId')
             movie_id = rating.get('movieId')
@@ -125,24 +163,109 @@ class DataService:
                 continue
 
             try:
-                rating_doc = Rating(
+                documents.append(self.to_raw_document(Rating(
                     user_id=rating['userId'],
                     movie_id=rating['movieId'],
                     rating=rating['rating'],
                     timestamp=rating['timestamp']
-                )
-                rating_doc.save()
+                )))
             except Exception as e:
                 self.logger.error(f"Error saving rating with user ID: {user_id} and movie ID: {movie_id}. Error: {e}")
                 raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
 
-    def save_credits(self, credits_data):    
-        for credit in credits_data[:10000]:  # Limit to 10000 credits for performance
+        # The rating summaries of the movies are updated with the ratings actually inserted, skipped ratings are already counted
+        return self.upsert_in_batches(self.rating_db_repo, documents, RATING_KEY, "ratings", on_inserted=self.add_to_rating_summaries)
+
+    def add_to_rating_summaries(self, ratings):
+        """
+        Add newly stored ratings to the rating summaries of their movies: counts and totals are incremented ($inc),
+        then the mean is recomputed from them on the server, in one round trip per batch.
+        """
+        increments = {}
+
+        for rating in ratings:
+            # Ratings store movie ids as ints while movies store them as strings
+            movie_id = str(rating['movie_id'])
+            value = rating.get('rating', 0.0)
+
+            increment = increments.setdefault(movie_id, {})
+            increment['rating_summary.count'] = increment.get('rating_summary.count', 0) + 1
+            increment['rating_summary.total'] = increment.get('rating_summary.total', 0.0) + value
+            bucket = f"rating_summary.histogram.{int(value)}"
+            increment[bucket] = increment.get(bucket, 0) + 1
+
+        updates = []
+        for movie_id, increment in increments.items():
+            updates.append(({'movie_id': movie_id}, {'$inc': increment}))
+            updates.append(({'movie_id': movie_id}, RATING_MEAN_UPDATE))
+
+        # Ordered, so each mean is computed from the incremented count and total
+        return self.movie_db_repo.bulk_update(updates, ordered=True)
+
+    def rebuild_rating_summaries(self, heartbeat=None):
+        """
+        Recompute the rating summaries of all movies from the ratings collection, for ratings stored without updating
+        the summaries (e.g. by an interrupted or older seeding run).
+        The optional heartbeat is called after every batch, e.g. to keep the seeding lock alive.
+        """
+        self.logger.info("Rebuilding movie rating summaries from the ratings collection...")
+
+        histogram = {
+            str(star): {'$sum': {'$cond': [{'$eq': [{'$floor': '$rating'}, star]}, 1, 0]}}
+            for star in range(6)
+        }
+        pipeline = [
+            {'$group': {'_id': '$movie_id', 'count': {'$sum': 1}, 'total': {'$sum': '$rating'}, **histogram}}
+        ]
+
+        try:
+            # Summaries are replaced in place, readers see the old or the new summary of a movie but never none
+            updates = []
+            updated = 0
+            rated_movie_ids = []
+            for summary in self.rating_db_repo.execute_aggregation_pipeline(pipeline):
+                rated_movie_ids.append(str(summary['_id']))
+                updates.append(({'movie_id': str(summary['_id'])}, {'$set': {'rating_summary': {
+                    'count': summary['count'],
+                    'total': summary['total'],
+                    'mean': summary['total'] / summary['count'],
+                    'histogram': {star: summary[star] for star in map(str, range(6)) if summary[star]}
+                }}}))
+
+                if len(updates) >= self.batch_size:
+                    updated += self.movie_db_repo.bulk_update(updates)
+                    updates = []
+                    if heartbeat:
+                        heartbeat()
+
+            updated += self.movie_db_repo.bulk_update(updates)
+            if heartbeat:
+                heartbeat()
+
+            # Movies whose ratings were all removed must not keep an old summary
+            self.movie_db_repo.update_by_query(
+                {'rating_summary__exists': True, 'movie_id__nin': rated_movie_ids}, unset__rating_summary=True
+            )
+        except Exception as e:
+            self.logger.error(f"Error rebuilding rating summaries: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+        self.logger.info(f"Rating summaries of {updated} movies rebuilt")
+        return updated
+
+    def save_credits(self, credits_data):
+        documents = []
+        seen_ids = set()
+
+        # Fetch the ids that are already stored in a single query instead of one probe per credit
+        existing_ids = set(self.credit_db_repo.distinct(
+            'id', {'id__in': [str(credit.get('id')) for credit in credits_data if credit.get('id')]}
+        ))
+
+        for credit in credits_data:
             # Validate credit ID
             id = credit.get('id')
-            
-            self.logger.info(f"Processing credit with ID: {id}")
-            
+
             if not id:
                 self.logger.warning(f"Skipping credit data without ID: {credit}")
                 continue
@@ -152,123 +275,323 @@ class DataService:
             except (ValueError, TypeError):
                 self.logger.warning(f"Invalid ID: {id}. Skipping...")
                 continue
-     
-            # Check if the credit already exists
-            if Credit.objects(id=id).first():
-                self.logger.info(f"Skipping duplicate credit with ID: {id}")
+
+            # Skip credits that are already stored or appear twice in the source data
+            if id in existing_ids or id in seen_ids:
+                self.logger.debug(f"Skipping duplicate credit with ID: {id}")
                 continue
 
+            seen_ids.add(id)
+
             try:
-                credit_doc = Credit(
+                parsed_credit = self.parse_credit(id, credit)
+                documents.append(self.to_raw_document(Credit(
                     id=id,
-                    cast=[Cast(**cast) for cast in self.convert_to_list(credit.get('cast', [])) if cast.get('id')],
-                    crew=[Crew(**crew) for crew in self.convert_to_list(credit.get('crew', [])) if crew.get('id')]
-                )
-                credit_doc.save()
+                    cast=[Cast(**cast) for cast in parsed_credit['cast'] if cast.get('id')],
+                    crew=[Crew(**crew) for crew in parsed_credit['crew'] if crew.get('id')]
+                )))
             except Exception as e:
                 self.logger.error(f"Error saving credit with ID: {id}. Error: {e}")
                 raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
-                
-    def save_gender_data(self, movies_metadata, credits_data):
+
+        return self.upsert_in_batches(self.credit_db_repo, documents, CREDIT_KEY, "credits")
+
+    def build_movie_lookup(self, movies):
+        """
+        Build the per-movie data (title, countries, companies, genres and year) needed to seed gender data.
+        :param movies: Movies prepared by prepare_movies.
+        """
         # Create a movie lookup dictionary for optimization (as suggested by chatGPT)
         movie_lookup = {}
-        
+
         try:
-            for movie in movies_metadata:
-                movie_id = str(movie['id'])
-                if not movie_id:
-                    self.logger.warning(f"Skipping movie data without ID: {movie}")
-                    continue
+            for movie in movies:
+                release_date = movie['release_date']
 
-                # Preprocess release date (as suggested by copilot)
-                release_date = pandas.to_datetime(movie.get('release_date'), errors='coerce')
-                release_date = release_date if not pandas.isna(release_date) else None
-                release_year = release_date.year if release_date else None
-            
-                movie_lookup[movie_id] = {
-                    'title': self.safe_string(movie.get('title', '')),
-                    'production_countries': self.extract_string_list(movie.get('production_countries'), 'iso_3166_1'),
-                    'production_companies': self.extract_string_list(movie.get('production_companies'), 'name'),
-                    'genres': self.extract_string_list(movie.get('genres'), 'name'),
-                    'year': release_year
+                movie_lookup[movie['movie_id']] = {
+                    'title': movie['title'],
+                    'production_countries': self.extract_string_list(movie['production_countries'], 'iso_3166_1'),
+                    'production_companies': self.extract_string_list(movie['production_companies'], 'name'),
+                    'genres': self.extract_string_list(movie['genres'], 'name'),
+                    'year': release_date.year if release_date else None
                 }
-  
+        except Exception as e:
+            self.logger.error(f"Error processing movie data. Error: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+        return movie_lookup
+
+    def save_gender_data(self, movie_lookup, credits_data):
+        documents = []
+
+        try:
             for credit in credits_data:
                 movie_id = str(credit['id'])
 
-                self.logger.info(f"Processing credit with movie ID: {movie_id}")
-            
                 if not movie_id or movie_id not in movie_lookup:
-                    self.logger.warning(f"Skipping credit data without valid movie ID: {credit}")
+                    self.logger.debug(f"Skipping credit data without valid movie ID: {movie_id}")
                     continue
-            
+
                 movie_info = movie_lookup[movie_id]
-                movie_title = movie_info['title']
-                countries = movie_info['production_countries']
-                companies = movie_info['production_companies']
-                genres = movie_info['genres']
-                year = movie_info['year']
-            
+
                 # This check is added to ensure that we have valid production countries before proceeding, since production countries are essential for gender data visualization and analysis
-                if not countries:
-                    self.logger.warning(f"Missing production countries for movie ID: {movie_id}. Skipping...")
+                if not movie_info['production_countries']:
+                    self.logger.debug(f"Missing production countries for movie ID: {movie_id}. Skipping...")
                     continue
 
-                cast_data = self.convert_to_list(credit.get('cast', []))
-                crew_data = self.convert_to_list(credit.get('crew', []))
- 
-                for cast in cast_data:
-                    self.logger.info(f"Processing cast data: {cast}")
+                parsed_credit = self.parse_credit(movie_id, credit)
+                cast_data = parsed_credit['cast']
+                crew_data = parsed_credit['crew']
 
-                    name = cast.get('name')
+                for position, cast in enumerate(cast_data):
                     gender = cast.get('gender')
-                    department = 'Acting'
-                
+
                     if gender is None:
-                        self.logger.warning(f"Skipping cast data without valid gender: {cast}")
+                        self.logger.debug(f"Skipping cast data without valid gender: {cast}")
                         continue
 
-                    gender_data_doc = GenderStatistics(
-                        movie_id=movie_id,
-                        title=movie_title,
-                        year=year,
-                        countries=countries,
-                        companies=companies,
-                        genres=genres,
-                        department=department,
-                        gender=gender,
-                        name=name
-                    )
-                    gender_data_doc.save()
-
-                for crew in crew_data:
-                    name = crew.get('name')
+                    credit_id = cast.get('credit_id') or f"cast:{position}"
+                    documents.append(self.build_gender_data_document(movie_id, movie_info, 'Acting', gender, cast.get('name'), credit_id))
+
+                for position, crew in enumerate(crew_data):
                     department = crew.get('department')
                     gender = crew.get('gender')
-                
+
                     if not department:
-                        self.logger.warning(f"Skipping crew data without valid department: {crew}")
+                        self.logger.debug(f"Skipping crew data without valid department: {crew}")
                         continue
                     if gender is None:
-                        self.logger.warning(f"Skipping cast data without valid gender: {crew}")
+                        self.logger.debug(f"Skipping crew data without valid gender: {crew}")
                         continue
-     
-                    gender_data_doc = GenderStatistics(
-                        movie_id=movie_id,
-                        title=movie_title,
-                        year=year,
-                        countries=countries,
-                        companies=companies,
-                        genres=genres,
-                        department=department,
-                        gender=gender,
-                        name=name
-                    )
-                    gender_data_doc.save()
+
+                    credit_id = crew.get('credit_id') or f"crew:{position}"
+                    documents.append(self.build_gender_data_document(movie_id, movie_info, department, gender, crew.get('name'), credit_id))
         except Exception as e:
             self.logger.error(f"Error processing crew data. Error: {e}")
             raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
-        
+
+        # The gender rollups are updated with the gender statistics actually inserted, skipped ones are already counted
+        return self.upsert_in_batches(self.gender_data_db_repo, documents, GENDER_DATA_KEY, "gender statistics", on_inserted=self.add_to_gender_rollups)
+
+    def add_to_gender_rollups(self, gender_data):
+        """
+        Add newly stored gender statistics to the gender rollups of their countries, companies, genres, department and
+        year, with one bulk of $inc upserts. Increments are atomic, so workers seeding in parallel can update the same rollups.
+        """
+        increments = {}
+
+        for document in gender_data:
+            gender = document.get('gender')
+
+            # Only known genders are counted, as by the aggregation pipelines
+            if gender not in (0, 1, 2):
+                continue
+
+            for dimension, field in ROLLUP_DIMENSIONS.items():
+                values = document.get(field)
+                if values is None:
+                    continue
+
+                for value in values if isinstance(values, list) else [values]:
+                    increment = increments.setdefault((dimension, value), {})
+                    increment['total_count'] = increment.get('total_count', 0) + 1
+                    increment[f'counts.{gender}'] = increment.get(f'counts.{gender}', 0) + 1
+
+        updates = [
+            ({'_id': rollup_id(dimension, value)}, {'$inc': increment, '$setOnInsert': {'dimension': dimension, 'value': value}})
+            for (dimension, value), increment in increments.items()
+        ]
+
+        return self.gender_rollup_db_repo.bulk_update(updates, upsert=True)
+
+    def rebuild_gender_rollups(self, heartbeat=None):
+        """
+        Recompute all gender rollups from the gender statistics collection, for gender statistics stored without
+        updating the rollups (e.g. by an interrupted or older seeding run). One grouped pass per dimension.
+        The optional heartbeat is called after every pass and batch, e.g. to keep the seeding lock alive.
+        """
+        self.logger.info("Rebuilding gender rollups from the gender statistics collection...")
+
+        try:
+            self.gender_rollup_db_repo.delete_by_query({})
+
+            for dimension, field in ROLLUP_DIMENSIONS.items():
+                pipeline = [
+                    {'$match': {field: {'$exists': True}, 'gender': {'$in': [0, 1, 2]}}},
+                    # A scalar field (department, year) unwinds to itself
+                    {'$unwind': f'${field}'},
+                    {'$group': {'_id': {'value': f'${field}', 'gender': '$gender'}, 'count': {'$sum': 1}}}
+                ]
+
+                rollups = {}
+                groups = self.gender_data_db_repo.execute_aggregation_pipeline(pipeline)
+                if heartbeat:
+                    heartbeat()
+
+                for group in groups:
+                    value = group['_id']['value']
+                    if value is None:
+                        continue
+
+                    rollup = rollups.setdefault(value, {
+                        '_id': rollup_id(dimension, value), 'dimension': dimension, 'value': value, 'total_count': 0, 'counts': {}
+                    })
+                    rollup['total_count'] += group['count']
+                    rollup['counts'][str(group['_id']['gender'])] = group['count']
+
+                inserted = self.upsert_in_batches(
+                    self.gender_rollup_db_repo, list(rollups.values()), ['_id'], f"{dimension} gender rollups", on_batch=heartbeat
+                )
+                self.logger.info(f"{inserted} gender rollups by {dimension} rebuilt")
+        except Exception as e:
+            self.logger.error(f"Error rebuilding gender rollups: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def save_actors(self, movie_lookup, credits_data):
+        """
+        Add the movies of the given credits to the actor collection, one document per cast member.
+        Movies are added to the stored documents ($addToSet), so actors playing in several chunks or workers are merged.
+        """
+        actors = {}
+
+        try:
+            for credit in credits_data:
+                movie_id = str(credit['id'])
+
+                if not movie_id or movie_id not in movie_lookup:
+                    self.logger.debug(f"Skipping credit data without valid movie ID: {movie_id}")
+                    continue
+
+                movie = ActorMovie(movie_id=movie_id, title=movie_lookup[movie_id]['title'])
+
+                for cast in self.parse_credit(movie_id, credit)['cast']:
+                    person_id = cast.get('id')
+                    name = cast.get('name')
+
+                    if person_id is None or not name:
+                        self.logger.debug(f"Skipping cast data without ID or name: {cast}")
+                        continue
+
+                    if person_id not in actors:
+                        actors[person_id] = Actor(
+                            person_id=person_id,
+                            name=name,
+                            normalized_name=normalize_text(name),
+                            name_tokens=tokenize_text(name),
+                            movies=[]
+                        )
+
+                    actors[person_id].movies.append(movie)
+
+            documents = [self.to_raw_document(actor) for actor in actors.values()]
+        except Exception as e:
+            self.logger.error(f"Error processing cast data. Error: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+        return self.upsert_in_batches(self.actor_db_repo, documents, ACTOR_KEY, "actors", add_to_set=['movies'])
+
+    def update_actor_movie_title(self, movie_id, title):
+        """
+        Keep the movie titles stored in the actor collection in sync when a movie is renamed.
+        """
+        return self.actor_db_repo.update_by_query({"movies__movie_id": str(movie_id)}, set__movies__S__title=title)
+
+    def remove_actor_movie(self, movie_id):
+        """
+        Remove a deleted movie from the actor collection.
+        """
+        return self.actor_db_repo.update_by_query({"movies__movie_id": str(movie_id)}, pull__movies__movie_id=str(movie_id))
+
+    def build_gender_data_document(self, movie_id, movie_info, department, gender, name, credit_id):
+        """
+        Build a raw gender statistics document for one cast or crew credit of a movie.
+        Credits without a credit id (not found in the Kaggle CSV) are identified by their position in the cast or crew.
+        """
+        return self.to_raw_document(GenderStatistics(
+            movie_id=movie_id,
+            title=movie_info['title'],
+            year=movie_info['year'],
+            countries=movie_info['production_countries'],
+            companies=movie_info['production_companies'],
+            genres=movie_info['genres'],
+            department=department,
+            gender=gender,
+            name=name,
+            credit_id=credit_id
+        ))
+
+    def parse_credit(self, movie_id, credit):
+        """
+        Parse the cast and crew columns of a credit once, later calls for the same movie id reuse the result.
+        """
+        parsed_credit = self.parsed_credits.get(movie_id)
+
+        if parsed_credit is None:
+            parsed_credit = {
+                'cast': self.convert_to_list(credit.get('cast', [])),
+                'crew': self.convert_to_list(credit.get('crew', []))
+            }
+            self.parsed_credits[movie_id] = parsed_credit
+
+        return parsed_credit
+
+    def clear_parsed_credits(self):
+        """
+        Release the parsed credits of the current chunk once both credits and gender data have been saved.
+        """
+        self.parsed_credits.clear()
+
+    def to_raw_document(self, document):
+        """
+        Validate a MongoEngine document and convert it to the raw form used for bulk inserts.
+        """
+        document.validate()
+        return document.to_mongo()
+
+    def upsert_in_batches(self, db_repo, documents, key_fields, label, add_to_set=None, on_inserted=None, on_batch=None):
+        """
+        Write documents with chunked, unordered bulk upserts on their natural key and report the throughput of each batch.
+        Documents that are already stored are skipped, so seeding the same rows again never duplicates them.
+        The optional on_inserted callback is called with the documents each batch actually inserted, and on_batch
+        (without arguments) after every batch.
+        """
+        total_inserted = 0
+
+        for start in range(0, len(documents), self.batch_size):
+            batch = documents[start:start + self.batch_size]
+
+            started_at = time.perf_counter()
+            if on_inserted:
+                inserted_documents = db_repo.upsert_many(batch, key_fields, ordered=False, add_to_set=add_to_set, return_upserted=True)
+                on_inserted(inserted_documents)
+                inserted = len(inserted_documents)
+            else:
+                inserted = db_repo.upsert_many(batch, key_fields, ordered=False, add_to_set=add_to_set)
+            elapsed = time.perf_counter() - started_at
+
+            total_inserted += inserted
+            rate = len(batch) / elapsed if elapsed > 0 else float(len(batch))
+            self.logger.info(f"Upserted {len(batch)} {label} ({inserted} new) in {elapsed:.2f}s ({rate:.0f} docs/s), {total_inserted} new in total")
+
+            if on_batch:
+                on_batch()
+
+        return total_inserted
+
+    def create_seed_indexes(self):
+        """
+        Create the natural key indexes used by the seeding upserts, must exist before seeding so upserts do not scan.
+        """
+        try:
+            self.rating_db_repo.create_indexes([("user_id", 1), ("movie_id", 1)])
+            self.gender_data_db_repo.create_indexes([("movie_id", 1), ("credit_id", 1)])
+            self.actor_db_repo.create_indexes([("person_id", 1)], unique=True)
+
+            self.logger.info("✅ Seeding indexes created successfully!")
+        except Exception as e:
+            self.logger.error(f"❌ Error creating seeding indexes: {e}")
+            raise CustomError(GENERAL_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
     def create_indexes(self):
         """
         Create indexes for database collections to improve query performance.
@@ -282,6 +605,32 @@ class DataService:
             self.gender_data_db_repo.create_indexes([("genres", 1), ("gender", 1)])
             self.gender_data_db_repo.create_indexes([("companies", 1), ("gender", 1)])
             self.gender_data_db_repo.create_indexes([("year", 1), ("gender", 1)])
+
+            # Index for reading the gender rollups of a dimension
+            self.gender_rollup_db_repo.create_indexes([("dimension", 1), ("value", 1)])
+            # Index for the top entries of a dimension (sort=total), read in index order up to the limit
+            self.gender_rollup_db_repo.create_indexes([("dimension", 1), ("total_count", -1), ("value", 1)])
+
+            # Index for the movie genre filter
+            self.movie_db_repo.create_indexes([("genres.name", 1)])
+
+            # Index for the ratings of a movie (rating list and rating link checks)
+            self.rating_db_repo.create_indexes([("movie_id", 1)])
+
+            # Index for the movie rating filter (a range on the average rating)
+            self.movie_db_repo.create_indexes([("rating_summary.mean", 1)])
+
+            # Text index for movie search (q=), a title match ranks higher than a tagline or overview match
+            self.movie_db_repo.create_indexes(
+                [("title", "text"), ("tagline", "text"), ("overview", "text")],
+                weights={"title": 10, "tagline": 3, "overview": 1},
+                name="movie_text_search"
+            )
+
+            # Indexes for actor search by name prefix or name words, and for keeping movie titles in sync
+            self.actor_db_repo.create_indexes([("normalized_name", 1)])
+            self.actor_db_repo.create_indexes([("name_tokens", 1)])
+            self.actor_db_repo.create_indexes([("movies.movie_id", 1)])
             
             self.logger.info("✅ Compound indexes created successfully!")
         except Exception as e:
@@ -291,8 +640,8 @@ class DataService:
     def convert_to_dict(self, value):
         if isinstance(value, str):
             try:
-                # ast.literal_eval() used since it will evaluate without executing code (lowers the risk of code injection), as suggested by copilot
-                return ast.literal_eval(value)
+                # parse_literal() evaluates without executing code (lowers the risk of code injection) and falls back to ast.literal_eval()
+                return parse_literal(value)
             except (ValueError, SyntaxError):
                 return {} # Return an empty dictionary if the string is not a valid dictionary
         elif isinstance(value, dict):
@@ -302,7 +651,7 @@ class DataService:
     def convert_to_list(self, value):
         if isinstance(value, str):
             try:
-                return ast.literal_eval(value)
+                return parse_literal(value)
             except (ValueError, SyntaxError):
                 return [] # Return an empty list if the string is not a valid list
         elif isinstance(value, list):
@@ -327,7 +676,7 @@ class DataService:
         """
         Extracts a list of strings from a given value. The key parameter allows customization of the extraction process.
         """
-        self.logger.info(f"Extracting string list from value: {value} with key: {key}")
+        self.logger.debug(f"Extracting string list from value: {value} with key: {key}")
 
         # Sanitize bad input
         if value is None or isinstance(value, float) and math.isnan(value):
@@ -344,7 +693,7 @@ class DataService:
                     result.append(str(item))
                 # skip floats, None, etc.
             
-            self.logger.info(f"Extracted string list: {result}")
+            self.logger.debug(f"Extracted string list: {result}")
 
             return result
         except Exception as e:
@@ -0,0 +1,228 @@
+import bisect
+import heapq
+import threading
+import numpy as np
+
+# Gender statistics fields of the gender distributions, keyed by dimension, and whether they hold a list of values
+ENGINE_DIMENSIONS = {
+  'country': ('countries', True),
+  'company': ('companies', True),
+  'genre': ('genres', True),
+  'department': ('department', False),
+  'year': ('year', False),
+}
+
+# Genders counted by the gender distributions (0 = unknown, 1 = female, 2 = male)
+GENDERS = 3
+
+def sort_key(value):
+  """
+  Order values as MongoDB does for the types of the gender statistics fields: numbers before strings.
+  """
+  return (isinstance(value, str), value)
+
+# In-process columnar copy of the gender statistics collection answering the gender distributions with NumPy instead
+# of aggregation pipelines. Every gender statistic is a row: its gender is stored as a small int, and the values of each
+# dimension as int codes into a dictionary of the distinct values. List fields (countries, companies and genres) are
+# stored CSR style, the codes of all rows in one array with the offset of every row's first code.
+class GenderStatisticsEngine:
+  def __init__(self, logger, gender_data_db_repo):
+    self.logger = logger
+    self.gender_data_db_repo = gender_data_db_repo
+    # Whether data has been loaded, and its data version (see GenderStatisticsService.data_version)
+    self.loaded = False
+    self.version = None
+    self.genders = np.zeros(0, dtype=np.int8)
+    # Per dimension: the distinct values, the code of each value, the codes of the rows and, for list fields,
+    # the row of each code and the offset of each row's codes
+    self.values = {dimension: [] for dimension in ENGINE_DIMENSIONS}
+    self.value_codes = {dimension: {} for dimension in ENGINE_DIMENSIONS}
+    self.codes = {dimension: np.zeros(0, dtype=np.int32) for dimension in ENGINE_DIMENSIONS}
+    # Per dimension: the distinct values in sort order, and the rank of each code in it
+    self.sorted_values = {dimension: [] for dimension in ENGINE_DIMENSIONS}
+    self.ranks = {dimension: np.zeros(0, dtype=np.int64) for dimension in ENGINE_DIMENSIONS}
+    # Per dimension: the gender of each code (the rows' genders repeated for list fields)
+    self.code_genders = {dimension: self.genders for dimension in ENGINE_DIMENSIONS}
+    self.rows = {}
+    self.offsets = {}
+    self.lock = threading.Lock()
+
+  def build(self, version=None):
+    """
+    Load all gender statistics with a single scan of the fields the distributions use.
+    """
+    fields = ['gender'] + [field for field, _ in ENGINE_DIMENSIONS.values()]
+    # Distributions only count known genders, the other rows are not loaded
+    documents = self.gender_data_db_repo.find_by_query({'gender__in': list(range(GENDERS))}, fields=fields).as_pymongo()
+
+    genders = []
+    dictionaries = {dimension: {} for dimension in ENGINE_DIMENSIONS}
+    codes = {dimension: [] for dimension in ENGINE_DIMENSIONS}
+    lengths = {dimension: [] for dimension, (_, is_list) in ENGINE_DIMENSIONS.items() if is_list}
+
+    for document in documents:
+      genders.append(document.get('gender'))
+
+      for dimension, (field, is_list) in ENGINE_DIMENSIONS.items():
+        dictionary = dictionaries[dimension]
+        value = document.get(field)
+
+        if is_list:
+          values = value or []
+          codes[dimension].extend(dictionary.setdefault(item, len(dictionary)) for item in values)
+          lengths[dimension].append(len(values))
+        else:
+          # -1 marks a missing value, not counted (as by $exists in the pipelines)
+          codes[dimension].append(-1 if value is None else dictionary.setdefault(value, len(dictionary)))
+
+    genders = np.array(genders, dtype=np.int8)
+    rows = {}
+    offsets = {}
+    for dimension, dimension_lengths in lengths.items():
+      dimension_lengths = np.array(dimension_lengths, dtype=np.int64)
+      offsets[dimension] = np.concatenate(([0], np.cumsum(dimension_lengths)))
+      rows[dimension] = np.repeat(np.arange(len(genders)), dimension_lengths)
+
+    code_genders = {dimension: genders[rows[dimension]] if dimension in rows else genders for dimension in ENGINE_DIMENSIONS}
+
+    sorted_values = {}
+    ranks = {}
+    for dimension, dictionary in dictionaries.items():
+      values = list(dictionary)
+      order = sorted(range(len(values)), key=lambda code: sort_key(values[code]))
+      sorted_values[dimension] = [sort_key(values[code]) for code in order]
+      ranks[dimension] = np.empty(len(values), dtype=np.int64)
+      ranks[dimension][order] = np.arange(len(values))
+
+    with self.lock:
+      self.genders = genders
+      self.code_genders = code_genders
+      self.values = {dimension: list(dictionary) for dimension, dictionary in dictionaries.items()}
+      self.value_codes = dictionaries
+      self.codes = {dimension: np.array(dimension_codes, dtype=np.int32) for dimension, dimension_codes in codes.items()}
+      self.sorted_values = sorted_values
+      self.ranks = ranks
+      self.rows = rows
+      self.offsets = offsets
+      self.version = version
+      self.loaded = True
+
+    self.logger.info(f"Gender statistics engine loaded with {len(genders)} rows")
+
+  def distribution(self, dimension, value=None, sort=None, limit=None, min_total=None, after=None):
+    """
+    Compute the gender distribution by a dimension, optionally for a value (or a list of values) of it, in the format
+    of the aggregation pipelines: one entry per value with its total and the count and percentage of every gender.
+    The sort, limit, min_total and after options are those of AggregationPipelineService.pagination_stages.
+    """
+    with self.lock:
+      values = self.values[dimension]
+      value_codes = self.value_codes[dimension]
+      codes = self.codes[dimension]
+      genders = self.code_genders[dimension]
+      sorted_values = self.sorted_values[dimension]
+      ranks = self.ranks[dimension]
+
+    mask = codes >= 0
+    if value:
+      filter_codes = [value_codes[item] for item in (value if isinstance(value, (list, tuple)) else [value]) if item in value_codes]
+      if not filter_codes:
+        return []
+      mask &= np.isin(codes, filter_codes)
+
+    # One count per (value, gender) pair, code * GENDERS + gender
+    counts = np.bincount(
+      codes[mask].astype(np.int64) * GENDERS + genders[mask], minlength=len(values) * GENDERS
+    ).reshape(len(values), GENDERS)
+    totals = counts.sum(axis=1)
+
+    selected = totals >= max(min_total or 0, 1)
+    if after:
+      # Values sorting after the last value of the previous page, whether or not it still exists
+      after_values = ranks >= bisect.bisect_right(sorted_values, sort_key(after["pk"]))
+      if sort == 'total':
+        selected &= (totals < after["value"]) | ((totals == after["value"]) & after_values)
+      else:
+        selected &= after_values
+    selected = np.flatnonzero(selected)
+
+    if sort == 'total':
+      selected = selected[np.lexsort((ranks[selected], -totals[selected]))]
+    elif sort == 'value':
+      selected = selected[np.argsort(ranks[selected])]
+
+    if limit:
+      selected = selected[:limit]
+
+    return [
+      {
+        "_id": values[code],
+        dimension: values[code],
+        "total_count": int(totals[code]),
+        "breakdown": [
+          {"gender": gender, "count": int(count), "percentage": int(count) / int(totals[code]) * 100}
+          for gender, count in enumerate(counts[code]) if count
+        ]
+      }
+      for code in selected
+    ]
+
+  def crosstab(self, rows, cols, sort=None, limit=None, min_total=None):
+    """
+    Compute the gender breakdown of every (row, column) cell of two dimensions, in the format of the crosstab
+    aggregation pipeline. A row with several values of a list field counts in every cell of its values.
+    """
+    with self.lock:
+      genders = self.genders
+      row_values, row_entries = self.values[rows], self.entries(rows)
+      col_values, col_entries = self.values[cols], self.entries(cols)
+
+    (row_rows, row_codes), (col_rows, col_codes) = row_entries, col_entries
+
+    # Pair every row value of a fact with every column value of the same fact: the column entries of a fact are
+    # contiguous (entries are in fact order), each row entry is repeated once per column entry of its fact
+    col_counts = np.bincount(col_rows, minlength=len(genders))
+    col_starts = np.concatenate(([0], np.cumsum(col_counts)[:-1]))
+    repeats = col_counts[row_rows]
+    row_index = np.repeat(np.arange(len(row_rows)), repeats)
+    first_of_pair = np.repeat(np.cumsum(repeats) - repeats, repeats)
+    col_index = np.repeat(col_starts[row_rows], repeats) + np.arange(len(row_index)) - first_of_pair
+
+    # Cells are sparse (e.g. companies by countries), pairs are counted with np.unique instead of a dense bincount
+    keys = (row_codes[row_index].astype(np.int64) * len(col_values) + col_codes[col_index]) * GENDERS + genders[row_rows[row_index]]
+    keys, counts = np.unique(keys, return_counts=True)
+
+    cells = {}
+    for key, count in zip(keys.tolist(), counts.tolist()):
+      cell, gender = divmod(key, GENDERS)
+      cells.setdefault(cell, []).append({"gender": gender, "count": count})
+
+    result = []
+    for cell, breakdown in cells.items():
+      row_code, col_code = divmod(cell, len(col_values))
+      total = sum(item["count"] for item in breakdown)
+
+      if min_total and total < min_total:
+        continue
+
+      for item in breakdown:
+        item["percentage"] = item["count"] / total * 100
+
+      result.append({rows: row_values[row_code], cols: col_values[col_code], "total_count": total, "breakdown": breakdown})
+
+    def cell_key(cell):
+      return (-cell["total_count"] if sort == 'total' else 0, sort_key(cell[rows]), sort_key(cell[cols]))
+
+    return heapq.nsmallest(limit, result, key=cell_key) if limit else sorted(result, key=cell_key)
+
+  def entries(self, dimension):
+    """
+    Return the (fact row, value code) entries of a dimension, in fact order, one per value of a list field and none
+    for a missing scalar value. Must be called with the lock held.
+    """
+    if dimension in self.rows:
+      return self.rows[dimension], self.codes[dimension]
+
+    codes = self.codes[dimension]
+    present = np.flatnonzero(codes >= 0)
+    return present, codes[present]
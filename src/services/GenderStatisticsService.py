@@ -1,79 +1,331 @@
+import threading
 from utils.CustomErrors import CustomError
 from utils.custom_status_codes import GENDER_DATA_CUSTOM_STATUS_CODES
+from utils.TTLCache import TTLCache
+from services.AggregationPipelineService import GENDER_DISTRIBUTION_DIMENSIONS
 
 class GenderStatisticsService:
-    def __init__(self, logger, gender_data_db_repo, aggregation_pipeline_service):
+    def __init__(self, logger, gender_data_db_repo, aggregation_pipeline_service, gender_rollup_db_repo=None, engine=None, cache=None, shared_cache=None, get_data_version=None):
+      """
+      :param gender_rollup_db_repo: Optional repository of the gender rollups computed when seeding, read instead of
+        aggregating the gender statistics collection for the dimensions it holds.
+      :param engine: Optional in-process engine (e.g. GenderStatisticsEngine) computing the distributions instead of
+        the database, reloaded when the data version changes.
+      :param cache: Optional in-process cache (e.g. TTLCache) of the aggregation results.
+      :param shared_cache: Optional cache shared by the processes of a host (e.g. SQLiteCache), checked after the in-process one.
+      :param get_data_version: Optional callable returning a value that changes when gender data is reseeded
+        (e.g. get_seeded_at), cached results of an earlier version are then no longer used.
+      """
       self.logger = logger
       self.gender_data_db_repo = gender_data_db_repo
       self.aggregation_pipeline_service = aggregation_pipeline_service
+      self.gender_rollup_db_repo = gender_rollup_db_repo
+      self.engine = engine
+      self.engine_lock = threading.Lock()
+      self.cache = cache
+      self.shared_cache = shared_cache
+      self.get_data_version = get_data_version
+      # The data version is read at most every 30 seconds, not on every request
+      self.data_version_cache = TTLCache(ttl=30, maxsize=1)
+      # The dimensions with gender rollups, read once per data version (and at most every 5 minutes without one)
+      self.rollup_dimensions_cache = TTLCache(ttl=300, maxsize=2)
 
-    def get_gender_statistics_by_country(self, country=None):
+    def data_version(self):
+        if not self.get_data_version:
+          return None
+
+        # Cached as a string, the cache treats None as a missing value
+        return self.data_version_cache.get_or_set("version", lambda: str(self.get_data_version()))
+
+    def rollup_dimensions(self):
+        """
+        Return the dimensions whose gender rollups have been computed, an empty set without a rollup repository.
+        Rollups are only written when seeding, so they are read again only when the data version changes.
+        """
+        if not self.gender_rollup_db_repo:
+          return frozenset()
+
+        return self.rollup_dimensions_cache.get_or_set(
+          self.data_version(), lambda: frozenset(self.gender_rollup_db_repo.distinct("dimension"))
+        )
+
+    def cached(self, dimension, value, compute, options=None):
+        """
+        Return the cached result of an aggregation by (dimension, filter value, options), computing and caching it when missing.
+        Gender data only changes when it is reseeded, so results are cached until they expire or the data version changes.
+        """
+        if not self.cache and not self.shared_cache:
+          return compute()
+
+        # Options (sort, limit, min_total, after) are part of the key, as a string since after is a dict
+        key = ("gender_statistics", dimension, repr(value), repr(sorted((options or {}).items())), self.data_version())
+
+        result = self.cache.get(key) if self.cache else None
+        if result is None and self.shared_cache:
+          result = self.shared_cache.get(key)
+          if result is not None and self.cache:
+            self.cache.set(key, result)
+
+        if result is None:
+          self.logger.info(f"Gender statistics by {dimension} ({value}) not cached, aggregating...")
+          result = compute()
+
+          if self.cache:
+            self.cache.set(key, result)
+          if self.shared_cache:
+            self.shared_cache.set(key, result)
+
+        return result
+
+    def refresh_engine(self):
+        """
+        Load the data of the engine, if any, when it has not been loaded yet or the gender data has been reseeded since.
+        """
+        if not self.engine:
+          return
+
+        with self.engine_lock:
+          version = self.data_version()
+
+          if not self.engine.loaded or self.engine.version != version:
+            self.logger.info("Loading gender statistics into the engine...")
+            self.engine.build(version)
+
+    def aggregate(self, dimension, value, build_pipeline, options=None):
+        """
+        Compute the gender distribution by a dimension, optionally for a value (or a list of values) of it, with the engine if any,
+        from the gender rollups when they have been computed for that dimension, and with the aggregation pipeline
+        of build_pipeline otherwise.
+        :param options: Optional sort, limit, min_total and after, see AggregationPipelineService.pagination_stages.
+        """
+        options = options or {}
+
+        if self.engine:
+          self.refresh_engine()
+          return self.engine.distribution(dimension, value, **options)
+
+        if dimension in self.rollup_dimensions():
+          return self.read_gender_rollups(dimension, value, **options)
+
+        return self.execute_aggregation_pipeline(build_pipeline(value, **options))
+
+    def read_gender_rollups(self, dimension, value=None, sort=None, limit=None, min_total=None, after=None):
+        """
+        Read the gender rollups of a dimension, in the format of the aggregation pipelines: one entry per value
+        with its total and the count and percentage of every gender. The options filter, sort and limit the rollups
+        as AggregationPipelineService.pagination_stages does the groups of a pipeline.
+        """
+        self.logger.info(f"Reading gender rollups by {dimension}...")
+
+        query = {"dimension": dimension}
+        if isinstance(value, (list, tuple)):
+          query["value__in"] = list(value)
+        elif value:
+          query["value"] = value
+        if min_total:
+          query["total_count__gte"] = min_total
+
+        if after:
+          if sort == 'total':
+            query["__raw__"] = {"$or": [
+              {"total_count": {"$lt": after["value"]}},
+              {"total_count": after["value"], "value": {"$gt": after["pk"]}}
+            ]}
+          else:
+            query["value__gt"] = after["pk"]
+
+        rollups = self.gender_rollup_db_repo.find_by_query(query, fields=["dimension", "value", "total_count", "counts"])
+
+        if sort == 'total':
+          rollups = rollups.order_by("-total_count", "value")
+        elif sort == 'value':
+          rollups = rollups.order_by("value")
+
+        if limit:
+          rollups = rollups.limit(limit)
+
+        return [self.format_gender_rollup(rollup) for rollup in rollups]
+
+    def format_gender_rollup(self, rollup):
+        return {
+          "_id": rollup.value,
+          rollup.dimension: rollup.value,
+          "total_count": rollup.total_count,
+          "breakdown": [
+            {"gender": int(gender), "count": count, "percentage": count / rollup.total_count * 100}
+            for gender, count in rollup.counts.items()
+          ]
+        }
+
+    def get_gender_statistics_summary(self, dimensions=None, options=None):
+        """
+        Retrieve the gender distributions of several dimensions (all by default) at once, for dashboards showing them together.
+        The options (sort, limit and min_total) apply to every dimension.
+        """
+        dimensions = [dimension for dimension in GENDER_DISTRIBUTION_DIMENSIONS if not dimensions or dimension in dimensions]
+        self.logger.info(f"Retrieving gender statistics summary by {', '.join(dimensions)}...")
+
+        try:
+          return self.cached("summary", ",".join(dimensions), lambda: self.aggregate_summary(dimensions, options), options)
+        except Exception as e:
+          self.logger.error(f"Error retrieving gender statistics summary: {e}")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def get_gender_statistics_crosstab(self, rows, cols, options=None):
+        """
+        Retrieve the gender breakdown of every combination of the values of two dimensions (e.g. year and department).
+        The options (sort, limit and min_total) apply to the cells.
+        """
+        self.logger.info(f"Retrieving gender statistics crosstab by {rows} and {cols}...")
+
+        try:
+          return self.cached("crosstab", f"{rows}:{cols}", lambda: self.aggregate_crosstab(rows, cols, options), options)
+        except Exception as e:
+          self.logger.error(f"Error retrieving gender statistics crosstab: {e}")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def get_gender_statistics_distribution(self, group_by, filters=None, year_range=None, genders=None, options=None):
+        """
+        Retrieve the gender distribution by any dimensions, counting only the gender statistics matching the filters
+        (see AggregationPipelineService.gender_distribution), e.g. by year and department for some countries, in one aggregation.
+        """
+        self.logger.info(f"Retrieving gender statistics distribution by {', '.join(group_by)}...")
+
+        try:
+          # Without filters, one or two dimensions are the distributions and crosstabs the engine and rollups compute
+          if not filters and not year_range and not genders and len(group_by) == 1:
+            return getattr(self, f"get_gender_statistics_by_{group_by[0]}")(None, options)
+          if not filters and not year_range and not genders and len(group_by) == 2:
+            return self.get_gender_statistics_crosstab(*group_by, options)
+
+          # Several dimensions are sorted by value unless sorted by total, as crosstabs are
+          if len(group_by) > 1:
+            options = {"sort": "value", **(options or {})}
+
+          return self.cached("distribution", (group_by, filters, year_range, genders), lambda: self.execute_aggregation_pipeline(
+            self.aggregation_pipeline_service.gender_distribution(group_by, filters, year_range, genders, **options)
+          ), options)
+        except CustomError as e:
+          raise e
+        except Exception as e:
+          self.logger.error(f"Error retrieving gender statistics distribution: {e}")
+          raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
+
+    def aggregate_crosstab(self, rows, cols, options=None):
+        """
+        Compute a crosstab with the engine if any, and with a single aggregation pass otherwise (rollups only hold one dimension).
+        """
+        options = options or {}
+
+        if self.engine:
+          self.refresh_engine()
+          return self.engine.crosstab(rows, cols, **options)
+
+        return self.execute_aggregation_pipeline(self.aggregation_pipeline_service.gender_crosstab(rows, cols, **options))
+
+    def aggregate_summary(self, dimensions, options=None):
+        """
+        Compute the gender distributions of several dimensions with the engine if any, or else with a single query:
+        one read of their gender rollups when all of them have been computed, and one $facet aggregation pass otherwise.
+        """
+        options = options or {}
+
+        if self.engine:
+          self.refresh_engine()
+          return {dimension: self.engine.distribution(dimension, **options) for dimension in dimensions}
+
+        if self.gender_rollup_db_repo and set(dimensions) <= self.rollup_dimensions():
+          self.logger.info("Reading gender rollups for the summary...")
+
+          # Sorted or limited rollups are read per dimension, only the entries shown are sent
+          if options:
+            return {dimension: self.read_gender_rollups(dimension, **options) for dimension in dimensions}
+
+          summary = {dimension: [] for dimension in dimensions}
+          rollups = self.gender_rollup_db_repo.find_by_query({"dimension__in": dimensions}, fields=["dimension", "value", "total_count", "counts"])
+          for rollup in rollups:
+            summary[rollup.dimension].append(self.format_gender_rollup(rollup))
+
+          return summary
+
+        result = self.execute_aggregation_pipeline(self.aggregation_pipeline_service.gender_distribution_summary(dimensions, **options))
+        return result[0] if result else {dimension: [] for dimension in dimensions}
+
+    def clear_cache(self):
+        """
+        Drop all cached aggregation results, e.g. after gender data was changed outside the seeding job.
+        """
+        for cache in (self.cache, self.shared_cache, self.data_version_cache, self.rollup_dimensions_cache):
+          if cache:
+            cache.clear()
+
+    def get_gender_statistics_by_country(self, country=None, options=None):
         """
         Retrieve gender statistics data by production country.
         """
         self.logger.info("Retrieving gender statistics data by country...")
 
         try:
-          # Call the aggregation pipeline service to get the pipeline
-          pipeline = self.aggregation_pipeline_service.gender_distribution_by_country(country)
-        
-          return self.execute_aggregation_pipeline(pipeline)
+          # Read the rollups or run the pipeline of the aggregation pipeline service, unless the result is cached
+          return self.cached("country", country, lambda: self.aggregate(
+            "country", country, self.aggregation_pipeline_service.gender_distribution_by_country, options
+          ), options)
         except Exception as e:
           self.logger.error(f"Error retrieving data by country: {e}")
           raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
    
-    def get_gender_statistics_by_company(self, company=None):
+    def get_gender_statistics_by_company(self, company=None, options=None):
         """
         Retrieve gender statistics data by production company.
         """
         self.logger.info("Retrieving gender statistics data by production company...")
         
         try:
-          pipeline = self.aggregation_pipeline_service.gender_distribution_by_company(company)
-            
-          return self.execute_aggregation_pipeline(pipeline)
+          return self.cached("company", company, lambda: self.aggregate(
+            "company", company, self.aggregation_pipeline_service.gender_distribution_by_company, options
+          ), options)
         except Exception as e:
           self.logger.error(f"Error retrieving data by production company: {e}")
           raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
    
-    def get_gender_statistics_by_genre(self, genre=None):
+    def get_gender_statistics_by_genre(self, genre=None, options=None):
         """
         Retrieve gender statistics data by movie genre.
         """
         self.logger.info("Retrieving gender statistics data by movie genre...")
         
         try:
-          pipeline = self.aggregation_pipeline_service.gender_distribution_by_genre(genre)
-          
-          return self.execute_aggregation_pipeline(pipeline)
+          return self.cached("genre", genre, lambda: self.aggregate(
+            "genre", genre, self.aggregation_pipeline_service.gender_distribution_by_genre, options
+          ), options)
         except Exception as e:
           self.logger.error(f"Error retrieving data by genre: {e}")
           raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
    
-    def get_gender_statistics_by_department(self, department=None):
+    def get_gender_statistics_by_department(self, department=None, options=None):
         """
         Retrieve gender statistics data by department.
         """
         self.logger.info("Retrieving gender statistics data by department...")
         
         try:
-          pipeline = self.aggregation_pipeline_service.gender_distribution_by_department(department)
-          
-          return self.execute_aggregation_pipeline(pipeline)
+          return self.cached("department", department, lambda: self.aggregate(
+            "department", department, self.aggregation_pipeline_service.gender_distribution_by_department, options
+          ), options)
         except Exception as e:
           self.logger.error(f"Error retrieving data by department: {e}")
           raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
    
-    def get_gender_statistics_by_year(self, year=None):
+    def get_gender_statistics_by_year(self, year=None, options=None):
         """
         Retrieve gender statistics data by year.
         """
         self.logger.info("Retrieving gender statistics data by year...")
         
         try:
-          pipeline = self.aggregation_pipeline_service.gender_distribution_by_year(year)
-          
-          return self.execute_aggregation_pipeline(pipeline)
+          return self.cached("year", year, lambda: self.aggregate(
+            "year", year, self.aggregation_pipeline_service.gender_distribution_by_year, options
+          ), options)
         except Exception as e:
           self.logger.error(f"Error retrieving data by year: {e}")
           raise CustomError(GENDER_DATA_CUSTOM_STATUS_CODES[500]["internal_error"], 500)
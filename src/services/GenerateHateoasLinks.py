@@ -39,16 +39,30 @@ class GenerateHateoasLinks:
 
       return links
     
-  def create_pagination_links(self, resource, page, per_page, total, **kwargs):
+  def create_pagination_links(self, resource, page, per_page, total, next_cursor=None, size_param="per_page", filters=None):
     """
     Generates pagination links for a resource.
+    Filters (e.g. the other query parameters of the request) are kept as query parameters of every link.
+    With page set to None, the links are for cursor (keyset) pagination and next carries the cursor of the next page,
+    the page size is then passed as size_param (e.g. limit for the aggregation endpoints).
     """
+    # Pagination parameters of the request are replaced by those of each link
+    filters = {key: value for key, value in (filters or {}).items() if key not in ("page", "cursor", size_param)}
+
     with self.app.app_context():
-      base_url = url_for(resource, _external=True, **kwargs)
-         
+      def create_link(**params):
+        return url_for(resource, _external=True, **{**filters, **params})
+
       # Validate inputs (as suggested by copilot)
-      page = int(page)
       per_page = int(per_page)
+
+      if page is None:
+        return {
+          "first": create_link(cursor="", **{size_param: per_page}),
+          "next": create_link(cursor=next_cursor, **{size_param: per_page}) if next_cursor else None,
+        }
+
+      page = int(page)
       
       total_pages = (total + per_page - 1) // per_page  # Calculate total pages
 
@@ -57,10 +71,10 @@ class GenerateHateoasLinks:
 
       # Per page is added to the URL to allow the client to specify the number of items per page
       pagination_links = {
-          "first": f"{base_url}?page={page}&per_page={per_page}",
-          "next": f"{base_url}?page={next_page}&per_page={per_page}" if next_page else None,
-          "previous": f"{base_url}?page={previous_page}&per_page={per_page}" if previous_page else None,
-          "last": f"{base_url}?page={total_pages}&per_page={per_page}" if total_pages > 0 else None,
+          "first": create_link(page=1, per_page=per_page),
+          "next": create_link(page=next_page, per_page=per_page) if next_page else None,
+          "previous": create_link(page=previous_page, per_page=per_page) if previous_page else None,
+          "last": create_link(page=total_pages, per_page=per_page) if total_pages > 0 else None,
       }
 
       return pagination_links
@@ -1,14 +1,69 @@
+import re
 from datetime import datetime
 from utils.CustomErrors import CustomError
 from utils.custom_status_codes import QUERY_CUSTOM_STATUS_CODES
+from utils.normalize_text import tokenize_text
+from utils.TTLCache import TTLCache
+
+# Above this many movies, a search index match is not sent to the database as a movie_id $in (nor kept in the count
+# cache key), the filter is applied by the database instead
+MAX_INDEX_CANDIDATES = 1000
 
 # Service class used to query movies from the database by parameters
 class MovieQueryService:
-  def __init__(self, logger, movie_db_repo, credit_db_repo, rating_db_repo):
+  def __init__(self, logger, movie_db_repo, credit_db_repo, rating_db_repo, actor_db_repo, search_index=None):
     self.logger = logger
     self.movie_db_repo = movie_db_repo
     self.credit_db_repo = credit_db_repo
     self.rating_db_repo = rating_db_repo
+    self.actor_db_repo = actor_db_repo
+    # Optional search index (e.g. MovieSearchIndex) resolving title, description and genre filters to movie ids,
+    # without one these filters are regex queries on the movie collection
+    self.search_index = search_index
+    # The few distinct genre names rarely change, they are read at most every five minutes
+    self.genre_names_cache = TTLCache(ttl=300, maxsize=1)
+
+  def find_genre_names(self, value):
+    """
+    Resolve a genre filter value to the stored genre names containing it, case insensitively (e.g. "dram" -> ["Drama"]).
+    """
+    genre_names = self.genre_names_cache.get_or_set("genres", lambda: self.movie_db_repo.distinct('genres.name'))
+    value = value.strip().lower()
+
+    return [name for name in genre_names if value in name.lower()]
+
+  def clear_genre_names(self):
+    """
+    Drop the cached genre names, e.g. after a movie was created or updated with a genre that may be new.
+    """
+    self.genre_names_cache.clear()
+
+  def index_movie(self, movie):
+    """
+    Add a created or updated movie to the search index, if any.
+    """
+    if self.search_index:
+      self.search_index.add_movie(movie)
+
+  def unindex_movie(self, movie_id):
+    """
+    Remove a deleted movie from the search index, if any.
+    """
+    if self.search_index:
+      self.search_index.remove_movie(movie_id)
+
+  def build_actor_name_query(self, name):
+    """
+    Build a query on the actor collection matching names whose words start with the words of the given name,
+    e.g. "tom han" matches "Tom Hanks". Anchored regexes on the indexed name words use the index instead of a scan.
+    """
+    tokens = tokenize_text(name)
+
+    if not tokens:
+      self.logger.error(f"Invalid actor name: {name}")
+      raise CustomError(QUERY_CUSTOM_STATUS_CODES[400]["invalid_actor_value"], 400)
+
+    return {"name_tokens__all": [re.compile(f"^{re.escape(token)}") for token in tokens]}
   
   def build_query(self, resource, query_params):
     self.logger.info(f"Searching for movies with query parameters {query_params}...")
@@ -20,7 +75,7 @@ class MovieQueryService:
     # Validate the query parameters
     if resource == 'movies':
       valid_fields = ['title', 'year', 'genre', 
-                    'actor', 'description', 'rating']
+                    'actor', 'description', 'rating', 'q']
     elif resource == 'actors':
       valid_fields = ['actor']
     elif resource == 'ratings':
@@ -34,32 +89,46 @@ class MovieQueryService:
     
     try:
       query = {}
+      # Ids of the movies matching all filters resolved by the search index
+      candidate_ids = None
       
       for field, value in query_params.items():
+        if self.search_index and resource == 'movies' and field in ('title', 'description', 'genre'):
+          self.logger.info(f"Searching the movie search index for {field}: {value}")
+
+          movie_ids = self.search_index.find_movie_ids(field, value)
+          if len(movie_ids) <= MAX_INDEX_CANDIDATES:
+            candidate_ids = movie_ids if candidate_ids is None else candidate_ids & movie_ids
+            continue
+
+          self.logger.info(f"Search index matched {len(movie_ids)} movies for {field}, filtering in the database instead")
+
         if field == 'actor':
           # Validate that actor is a valid string and not numeric
           if not isinstance(value, str) or value.isdigit():
             self.logger.error(f"Invalid actor name: {value}")
             raise CustomError(QUERY_CUSTOM_STATUS_CODES[400]["invalid_actor_value"], 400)
 
-          # Search the credit db collection for the actor
+          actor_query = self.build_actor_name_query(value)
+
+          if resource == 'actors':
+            # Actors are listed from the actor collection itself
+            query.update(actor_query)
+            continue
+
+          # Search the actor collection for the actor
           self.logger.info(f"Searching for movies with actor: {value}")
-          
-          actor_query = {
-            "cast__elemMatch": {
-                "name__icontains": value
-            }
-          }
 
-          credits_for_actor = self.credit_db_repo.find_by_query(actor_query)
-          
-          if not credits_for_actor:
+          actors = self.actor_db_repo.find_by_query(actor_query, fields=['movies'])
+
+          # Retrieve the ids of all movies the matching actors have played in
+          movie_ids = list({movie.movie_id for actor in actors for movie in actor.movies})
+
+          if not movie_ids:
             self.logger.info(f"No movies found for actor {value}")
             raise CustomError(QUERY_CUSTOM_STATUS_CODES[404]["no_movies_found"], 404)
 
-          # Loop through credits_for_actor and retrieve the _id for all of the objects (movies the actor has acted in)
-          movie_ids = [str(credit["id"]) for credit in credits_for_actor]
-          self.logger.info(f"Movie IDs for actor {value}: {movie_ids}")
+          self.logger.info(f"Found {len(movie_ids)} movies for actor {value}")
           
           query.update({'movie_id': {'$in': movie_ids}})
         elif field == 'rating':
@@ -81,32 +150,12 @@ class MovieQueryService:
             self.logger.error(f"Invalid rating value: {rating_threshold}")
             raise CustomError(QUERY_CUSTOM_STATUS_CODES[400]["invalid_rating_value"], 400)
           
-          ratings = []
-
-          if resource == "rating":
+          if resource == 'ratings':
             # Filtering ratings by their own value (direct rating filter)
             query["rating__gte"] = rating_threshold
-
-          elif resource == "movie":
-            # Validate that movie is a valid string
-            if not isinstance(value, str):
-              self.logger.error(f"Invalid movie: {type(value)}")
-              raise CustomError(QUERY_CUSTOM_STATUS_CODES[400]["invalid_movie_value"], 400)
-            
-            # Filtering movies by rating (finding movies whose ratings meet the threshold)
-            ratings_query = {"rating__gte": rating_threshold}
-            ratings = self.rating_db_repo.find_by_query(ratings_query)
-            
-            if ratings:
-              movie_ids = []
-
-              for rating in ratings:
-                try:
-                  movie_ids.append(str(rating.movie_id))
-                except Exception as e:
-                  self.logger.warning(f"Invalid movie_id: {e}")
-                
-              query.update({"movie_id__in": movie_ids})
+          else:
+            # Filtering movies by their average rating, a range on the indexed mean of their rating summaries
+            query["rating_summary__mean__gte"] = rating_threshold
         elif field == 'genre':
           # Validate that genre is a valid string
           if not isinstance(value, str):
@@ -115,14 +164,15 @@ class MovieQueryService:
           
           self.logger.info(f"Searching for movies with genre: {value}")
 
-          query['genres__name__icontains'] = value
-          
-          movies_of_genre = self.movie_db_repo.find_by_query(query)
-          # Loop through genres and retrieve the _id for all of the objects (movies with the genre)
-          movie_ids = [movie.movie_id for movie in movies_of_genre]
-          self.logger.info(f"Movie IDs for genre {value}: {movie_ids}")
-          
-          query.update({'movie_id': {'$in': movie_ids}})
+          # The value is resolved to the matching genre names, so the movies are found with an $in on the indexed
+          # genres.name instead of a regex over every movie
+          genre_names = self.find_genre_names(value)
+          self.logger.info(f"Genres matching {value}: {genre_names}")
+
+          query['genres__name__in'] = genre_names
+        elif field == 'q':
+          # Full-text search is applied by the repository (search_text), it is not part of the filter query
+          continue
         elif field == 'description':
           # Validate that description is a valid string
           if not isinstance(value, str):
@@ -152,6 +202,14 @@ class MovieQueryService:
 
           query.update({f"{field}__icontains": value})
 
+      if candidate_ids is not None:
+        # Combine with the movies of an actor filter, if any
+        if 'movie_id' in query:
+          candidate_ids &= set(query['movie_id']['$in'])
+
+        self.logger.info(f"Search index matched {len(candidate_ids)} movies")
+        query['movie_id'] = {'$in': list(candidate_ids)}
+
       return query
     
     except CustomError as e:
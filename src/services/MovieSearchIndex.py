@@ -0,0 +1,139 @@
+import bisect
+import threading
+from utils.normalize_text import normalize_text, tokenize_text
+
+# Movie fields covered by the index, keyed by the query parameter that filters on them
+INDEXED_FIELDS = {
+  'title': 'title',
+  'description': 'overview',
+}
+
+# In-memory inverted index over movie titles, overviews and genre names, an alternative to regex scans of the movie
+# collection when no text index is available. Every process holds its own index, built from one projected scan at
+# startup and updated by the movie writes handled by that process.
+class MovieSearchIndex:
+  def __init__(self, logger, movie_db_repo):
+    self.logger = logger
+    self.movie_db_repo = movie_db_repo
+    # Movie ids by word, one inverted index per indexed field
+    self.postings = {field: {} for field in INDEXED_FIELDS}
+    # Sorted words of each field, for prefix lookups (rebuilt lazily after writes)
+    self.sorted_words = {field: None for field in INDEXED_FIELDS}
+    # Movie ids by normalized genre name
+    self.genres = {}
+    # Indexed words and genres of each movie, needed to remove a movie from the index
+    self.movies = {}
+    self.lock = threading.Lock()
+
+  def build(self):
+    """
+    Index all movies with a single scan of the fields the index covers.
+    """
+    fields = ['movie_id', 'genres'] + list(INDEXED_FIELDS.values())
+    movies = self.movie_db_repo.find_by_query({}, fields=fields).as_pymongo()
+
+    with self.lock:
+      for movie in movies:
+        self._add_movie(movie)
+
+    self.logger.info(f"Movie search index built with {len(self.movies)} movies")
+
+  def add_movie(self, movie):
+    """
+    Index a created or updated movie (a MovieMetaData document), replacing its previous entry.
+    """
+    with self.lock:
+      self._remove_movie(movie.movie_id)
+      self._add_movie({
+        'movie_id': movie.movie_id,
+        'title': movie.title,
+        'overview': movie.overview,
+        'genres': [{'name': genre.name} for genre in movie.genres],
+      })
+
+  def remove_movie(self, movie_id):
+    with self.lock:
+      self._remove_movie(movie_id)
+
+  def find_movie_ids(self, field, value):
+    """
+    Return the ids of the movies matching a title, description or genre filter.
+    Title and description match movies with, for each word of the value, a word starting with it (e.g. "toy sto"
+    matches "Toy Story"). Genre matches movies with a genre name containing the value.
+    """
+    with self.lock:
+      if field == 'genre':
+        normalized = normalize_text(value)
+        # A value without letters or digits would be contained in every genre name, it matches none instead
+        if not normalized:
+          return set()
+        return set().union(*(ids for genre, ids in self.genres.items() if normalized in genre))
+
+      words = tokenize_text(value)
+      if not words:
+        return set()
+
+      # Intersect starting with the rarest word, which keeps the intermediate sets small
+      matches = sorted((self._find_prefix(field, word) for word in words), key=len)
+      return set.intersection(*matches)
+
+  def _find_prefix(self, field, prefix):
+    postings = self.postings[field]
+
+    if self.sorted_words[field] is None:
+      self.sorted_words[field] = sorted(postings)
+    words = self.sorted_words[field]
+
+    matches = set()
+    # Walk the words from the first one not sorting before the prefix, without copying the rest of the vocabulary
+    for index in range(bisect.bisect_left(words, prefix), len(words)):
+      word = words[index]
+      if not word.startswith(prefix):
+        break
+      matches |= postings[word]
+
+    return matches
+
+  def _add_movie(self, movie):
+    movie_id = movie.get('movie_id')
+    if not movie_id:
+      return
+
+    entry = {}
+    for field, movie_field in INDEXED_FIELDS.items():
+      words = set(tokenize_text(movie.get(movie_field)))
+      entry[field] = words
+
+      for word in words:
+        if word not in self.postings[field]:
+          self.sorted_words[field] = None
+        self.postings[field].setdefault(word, set()).add(movie_id)
+
+    genres = {normalize_text(genre.get('name')) for genre in movie.get('genres') or []} - {''}
+    entry['genre'] = genres
+    for genre in genres:
+      self.genres.setdefault(genre, set()).add(movie_id)
+
+    self.movies[movie_id] = entry
+
+  def _remove_movie(self, movie_id):
+    entry = self.movies.pop(movie_id, None)
+    if not entry:
+      return
+
+    for field in INDEXED_FIELDS:
+      for word in entry[field]:
+        ids = self.postings[field].get(word)
+        if ids is None:
+          continue
+        ids.discard(movie_id)
+        if not ids:
+          del self.postings[field][word]
+          self.sorted_words[field] = None
+
+    for genre in entry['genre']:
+      ids = self.genres.get(genre)
+      if ids is not None:
+        ids.discard(movie_id)
+        if not ids:
+          del self.genres[genre]
@@ -0,0 +1,65 @@
+import contextlib
+import json
+import sqlite3
+import time
+
+# Cache stored in a local SQLite file, shared by all processes of a host (e.g. the workers of a gunicorn deployment),
+# for JSON serializable values that are costly to compute. Same interface as TTLCache.
+class SQLiteCache:
+  def __init__(self, path, ttl=3600):
+    self.path = path
+    self.ttl = ttl
+
+    with self.connect() as connection:
+      # Write-ahead logging lets readers and a writer use the file concurrently
+      connection.execute("PRAGMA journal_mode=WAL")
+      connection.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)")
+
+  @contextlib.contextmanager
+  def connect(self):
+    """
+    Open a connection for one operation, committed on success and closed in any case.
+    """
+    # A connection per operation, connections must not be shared between threads or forked processes
+    with contextlib.closing(sqlite3.connect(self.path, timeout=5)) as connection:
+      # The connection's own context manager only commits or rolls back, it does not close
+      with connection:
+        yield connection
+
+  def get(self, key):
+    """
+    Return the cached value of a key, or None if it is missing or expired.
+    """
+    with self.connect() as connection:
+      row = connection.execute(
+        "SELECT value FROM cache WHERE key = ? AND expires_at >= ?", (repr(key), time.time())
+      ).fetchone()
+
+    return json.loads(row[0]) if row else None
+
+  def set(self, key, value):
+    now = time.time()
+
+    with self.connect() as connection:
+      connection.execute(
+        "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+        (repr(key), now + self.ttl, json.dumps(value))
+      )
+      # Expired entries are only dropped on writes, which are rare
+      connection.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+
+  def get_or_set(self, key, compute):
+    """
+    Return the cached value of a key, computing and caching it when missing or expired.
+    """
+    value = self.get(key)
+
+    if value is None:
+      value = compute()
+      self.set(key, value)
+
+    return value
+
+  def clear(self):
+    with self.connect() as connection:
+      connection.execute("DELETE FROM cache")
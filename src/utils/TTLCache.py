@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Small in-process cache whose entries expire after a time to live, used for values that are costly to compute
+# but may be slightly stale (e.g. the total number of documents matching a query)
+class TTLCache:
+  def __init__(self, ttl=60, maxsize=1024):
+    self.ttl = ttl
+    self.maxsize = maxsize
+    self.entries = OrderedDict()
+    self.lock = threading.Lock()
+
+  def get(self, key):
+    """
+    Return the cached value of a key, or None if it is missing or expired.
+    """
+    with self.lock:
+      entry = self.entries.get(key)
+
+      if entry is None:
+        return None
+
+      expires_at, value = entry
+      if expires_at < time.monotonic():
+        del self.entries[key]
+        return None
+
+      self.entries.move_to_end(key)
+      return value
+
+  def set(self, key, value):
+    with self.lock:
+      self.entries[key] = (time.monotonic() + self.ttl, value)
+      self.entries.move_to_end(key)
+
+      # Evict the least recently used entries beyond maxsize
+      while len(self.entries) > self.maxsize:
+        self.entries.popitem(last=False)
+
+  def get_or_set(self, key, compute):
+    """
+    Return the cached value of a key, computing and caching it when missing or expired.
+    """
+    value = self.get(key)
+
+    if value is None:
+      value = compute()
+      self.set(key, value)
+
+    return value
+
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
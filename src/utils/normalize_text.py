@@ -0,0 +1,28 @@
+import re
+import unicodedata
+
+# Runs of characters that are not letters or digits of any script (underscores included)
+NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+def normalize_text(value):
+  """
+  Normalize text for indexed lookups: accents removed, case folded and runs of other characters collapsed to one space,
+  e.g. "Penélope  Cruz" becomes "penelope cruz". Letters of every script are kept ("Łukasz" becomes "łukasz",
+  "Сергей" becomes "сергеи").
+  """
+  if not value:
+    return ""
+
+  decomposed = unicodedata.normalize("NFKD", value)
+  # Only nonspacing marks (accents) are removed, letters without a decomposition (e.g. Ø or Ł) are kept as they are
+  without_accents = "".join(char for char in decomposed if unicodedata.category(char) != "Mn")
+
+  return NON_ALPHANUMERIC.sub(" ", unicodedata.normalize("NFC", without_accents).casefold()).strip()
+
+def tokenize_text(value):
+  """
+  Split text into its normalized words.
+  """
+  normalized = normalize_text(value)
+
+  return normalized.split(" ") if normalized else []
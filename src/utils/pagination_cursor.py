@@ -0,0 +1,41 @@
+import base64
+import math
+from bson import ObjectId, json_util
+
+# Opaque cursor tokens for keyset pagination. A cursor holds the position of the last document of a page
+# (its primary key and, for the aggregations sorted by total, its total), the next page starts right after it.
+
+def is_number(value):
+  # bool is an int subclass, a cursor never holds one
+  return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def encode_cursor(position):
+  """
+  Encode a position returned by DBRepo.find_by_query_with_cursor as a URL-safe token.
+  """
+  token = base64.urlsafe_b64encode(json_util.dumps(position).encode()).decode()
+
+  # Padding is stripped, "=" would have to be escaped in query strings
+  return token.rstrip("=")
+
+def decode_cursor(cursor):
+  """
+  Decode a cursor token back into a position, raises ValueError for an invalid token.
+  """
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    position = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+  except Exception as e:
+    raise ValueError(f"Invalid cursor: {e}")
+
+  if not isinstance(position, dict) or "pk" not in position or set(position) - {"pk", "value"}:
+    raise ValueError("Invalid cursor")
+
+  # Cursors are client input, positions are only ever compared with keys and totals of the types they are made of
+  pk = position["pk"]
+  if not (isinstance(pk, (str, ObjectId)) or is_number(pk)):
+    raise ValueError("Invalid cursor primary key")
+  if "value" in position and not is_number(position["value"]):
+    raise ValueError("Invalid cursor value")
+
+  return position
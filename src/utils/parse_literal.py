@@ -0,0 +1,72 @@
+import ast
+import json
+import re
+
+# Matches the tokens that differ between Python literals and JSON: quoted strings, None/True/False and the JSON
+# keywords that are not Python literals. Strings are matched first, so keywords inside a string are consumed as part of that string.
+LITERAL_TOKEN = re.compile(r"""'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)"|\b(None|True|False|null|true|false)\b""", re.DOTALL)
+
+JSON_KEYWORDS = {"None": "null", "True": "true", "False": "false"}
+
+# JSON keywords ast.literal_eval rejects, they must not be decoded outside strings
+JSON_ONLY_KEYWORDS = re.compile(r"\b(null|true|false)\b")
+
+def reject_constant(constant):
+    raise ValueError(f"{constant} is not a Python literal")
+
+# strict=False allows raw control characters (e.g. newlines) inside strings, as Python literals do.
+# NaN and Infinity are JSON extensions ast.literal_eval rejects.
+json_decoder = json.JSONDecoder(strict=False, parse_constant=reject_constant)
+
+def replace_token(match):
+    """
+    Translate a single Python literal token to its JSON form.
+    """
+    single_quoted, double_quoted, keyword = match.groups()
+
+    if keyword is not None:
+        if keyword not in JSON_KEYWORDS:
+            raise ValueError(f"{keyword} is not a Python literal")
+        return JSON_KEYWORDS[keyword]
+
+    if single_quoted is not None:
+        if "\\" in single_quoted:
+            # Escaped strings are rare, let Python decode them and JSON encode the result
+            return json.dumps(ast.literal_eval(match.group(0)))
+        return '"' + single_quoted.replace('"', '\\"') + '"'
+
+    if "\\" in double_quoted:
+        return json.dumps(ast.literal_eval(match.group(0)))
+    return match.group(0)
+
+def translate_simple_literal(value):
+    """
+    Translate a literal whose strings are all single-quoted and contain no escapes or double quotes.
+    Splitting on the quote character leaves the text outside strings at the even positions, where the
+    keywords can be replaced in one pass without touching the string contents.
+    """
+    parts = value.split("'")
+    outside = "\0".join(parts[0::2])
+    if JSON_ONLY_KEYWORDS.search(outside):
+        raise ValueError("JSON keywords are not Python literals")
+    outside = outside.replace("None", "null").replace("True", "true").replace("False", "false")
+    parts[0::2] = outside.split("\0")
+    return '"'.join(parts)
+
+def parse_literal(value):
+    """
+    Parse a stringified Python literal (lists and dicts of strings, numbers, None and booleans), as stored in
+    the Kaggle CSV columns such as genres, cast and crew.
+    The literal is rewritten to JSON and decoded with the C JSON decoder, which is much faster than
+    ast.literal_eval. Anything outside that grammar falls back to ast.literal_eval.
+    Raises ValueError or SyntaxError, like ast.literal_eval, if the value is not a valid literal.
+    """
+    try:
+        # Most values in the CSV have no double quotes or escapes and can skip the tokenizer
+        if '"' not in value and "\\" not in value and "\0" not in value:
+            return json_decoder.decode(translate_simple_literal(value))
+
+        return json_decoder.decode(LITERAL_TOKEN.sub(replace_token, value))
+    except (ValueError, SyntaxError):
+        # json.JSONDecodeError is a ValueError, e.g. for tuples, sets, nan or null
+        return ast.literal_eval(value)
@@ -0,0 +1,56 @@
+import inspect
+import os
+import sys
+import mongomock
+import mongoengine
+import pytest
+from loguru import logger
+
+# The app imports its modules from src (see app.py), tests do the same
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# pymongo 4.9+ passes a sort argument to bulk updates, which mongomock 4.3 does not accept (and bulk updates do not use)
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+if 'sort' not in inspect.signature(_add_update).parameters:
+    def add_update(self, *args, sort=None, **kwargs):
+        return _add_update(self, *args, **kwargs)
+    mongomock.collection.BulkOperationBuilder.add_update = add_update
+
+@pytest.fixture
+def db():
+    """
+    An empty in-memory MongoDB (mongomock) database, used as the default MongoEngine connection.
+    """
+    mongoengine.connect('test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient, uuidRepresentation='standard')
+    yield mongoengine.connection.get_db()
+    mongoengine.disconnect()
+
+@pytest.fixture
+def repos(db):
+    """
+    The repositories of the seeded collections, as app.py creates them.
+    """
+    from repositories.DBRepo import DBRepo
+    from models.MovieModel import MovieMetaData
+    from models.RatingsModel import Rating
+    from models.CreditsModel import Credit
+    from models.GenderDataModel import GenderStatistics
+    from models.ActorModel import Actor
+    from models.GenderRollupModel import GenderRollup
+
+    return {
+        'movie': DBRepo(MovieMetaData, logger),
+        'rating': DBRepo(Rating, logger),
+        'credit': DBRepo(Credit, logger),
+        'gender_data': DBRepo(GenderStatistics, logger),
+        'actor': DBRepo(Actor, logger),
+        'gender_rollup': DBRepo(GenderRollup, logger),
+    }
+
+@pytest.fixture
+def data_service(repos):
+    from services.DataService import DataService
+
+    return DataService(
+        logger, repos['movie'], repos['rating'], repos['credit'], repos['gender_data'], repos['actor'], repos['gender_rollup'], batch_size=50
+    )
@@ -0,0 +1,66 @@
+import sqlite3
+import time
+from unittest import mock
+import pytest
+from utils.TTLCache import TTLCache
+from utils.SQLiteCache import SQLiteCache
+
+@pytest.fixture(params=["ttl", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "ttl":
+        return TTLCache(ttl=60)
+    return SQLiteCache(str(tmp_path / "cache.db"), ttl=60)
+
+def test_get_or_set_computes_once(cache):
+    compute = mock.Mock(return_value={"total": 3})
+
+    assert cache.get_or_set(("key", 1), compute) == {"total": 3}
+    assert cache.get_or_set(("key", 1), compute) == {"total": 3}
+    assert cache.get(("key", 2)) is None
+    compute.assert_called_once()
+
+def test_entries_expire(cache):
+    cache.set("key", [1, 2])
+
+    with mock.patch.object(time, "monotonic", return_value=time.monotonic() + 61), \
+         mock.patch.object(time, "time", return_value=time.time() + 61):
+        assert cache.get("key") is None
+
+def test_clear(cache):
+    cache.set("key", "value")
+    cache.clear()
+
+    assert cache.get("key") is None
+
+def test_ttl_cache_evicts_the_least_recently_used_entry():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+def test_sqlite_cache_is_shared_through_its_file(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path).set(("gender_statistics", "country"), [{"_id": "US", "total_count": 2}])
+
+    assert SQLiteCache(path).get(("gender_statistics", "country")) == [{"_id": "US", "total_count": 2}]
+
+def test_sqlite_cache_closes_its_connections(tmp_path):
+    connections = []
+    connect = sqlite3.connect
+
+    def tracked_connect(*args, **kwargs):
+        connections.append(connect(*args, **kwargs))
+        return connections[-1]
+
+    with mock.patch.object(sqlite3, "connect", side_effect=tracked_connect):
+        cache = SQLiteCache(str(tmp_path / "cache.db"))
+        cache.get_or_set("key", lambda: "value")
+        cache.clear()
+
+    assert len(connections) == 4
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
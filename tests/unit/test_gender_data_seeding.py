@@ -0,0 +1,67 @@
+from models.GenderDataModel import GenderStatistics
+from models.GenderRollupModel import GenderRollup
+from seed.seed_state import clear_seeded_collections, has_checkpoints, save_checkpoint
+
+MOVIE_LOOKUP = {
+    '862': {
+        'title': 'Toy Story',
+        'production_countries': ['US'],
+        'production_companies': ['Pixar Animation Studios'],
+        'genres': ['Animation', 'Comedy'],
+        'year': 1995
+    }
+}
+
+# John Lasseter has two Writing credits, Tom Hanks is listed twice in the cast
+CREDITS = [{
+    'id': 862,
+    'cast': str([
+        {'credit_id': 'c1', 'name': 'Tom Hanks', 'gender': 2},
+        {'credit_id': 'c2', 'name': 'Tom Hanks', 'gender': 2},
+        {'credit_id': 'c3', 'name': 'Annie Potts', 'gender': 1},
+    ]),
+    'crew': str([
+        {'credit_id': 'w1', 'name': 'John Lasseter', 'department': 'Writing', 'job': 'Screenplay', 'gender': 2},
+        {'credit_id': 'w2', 'name': 'John Lasseter', 'department': 'Writing', 'job': 'Original Story', 'gender': 2},
+        {'credit_id': 'd1', 'name': 'John Lasseter', 'department': 'Directing', 'job': 'Director', 'gender': 2},
+        {'name': 'Uncredited', 'department': 'Crew', 'job': 'Runner', 'gender': 0},
+    ])
+}]
+
+def test_every_credit_is_a_gender_statistic(data_service):
+    assert data_service.save_gender_data(MOVIE_LOOKUP, CREDITS) == 7
+
+    assert GenderStatistics.objects(department='Acting', name='Tom Hanks').count() == 2
+    assert GenderStatistics.objects(department='Writing', name='John Lasseter').count() == 2
+    # A credit without an id is identified by its position in the crew
+    assert GenderStatistics.objects(credit_id='crew:3').count() == 1
+
+def test_saving_the_same_credits_again_is_a_no_op(data_service):
+    data_service.save_gender_data(MOVIE_LOOKUP, CREDITS)
+    data_service.clear_parsed_credits()
+
+    assert data_service.save_gender_data(MOVIE_LOOKUP, CREDITS) == 0
+    assert GenderStatistics.objects.count() == 7
+
+def test_rollups_count_every_credit(data_service):
+    data_service.save_gender_data(MOVIE_LOOKUP, CREDITS)
+    incremental = {rollup.id: (rollup.total_count, rollup.counts) for rollup in GenderRollup.objects}
+
+    data_service.rebuild_gender_rollups()
+    rebuilt = {rollup.id: (rollup.total_count, rollup.counts) for rollup in GenderRollup.objects}
+
+    assert incremental == rebuilt
+    assert incremental['department:Writing'] == (2, {'2': 2})
+    assert incremental['country:US'][0] == 7
+
+def test_clear_seeded_collections(db, data_service):
+    data_service.save_gender_data(MOVIE_LOOKUP, CREDITS)
+    save_checkpoint("credits", 10)
+
+    assert has_checkpoints()
+    clear_seeded_collections()
+
+    assert GenderStatistics.objects.count() == 0
+    assert GenderRollup.objects.count() == 0
+    # Checkpoints are seed state, cleared separately by clear_seed_state
+    assert has_checkpoints()
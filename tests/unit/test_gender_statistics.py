@@ -0,0 +1,202 @@
+from unittest import mock
+import pytest
+from loguru import logger
+from services.AggregationPipelineService import AggregationPipelineService, Param, bind
+from services.GenderStatisticsEngine import GenderStatisticsEngine
+from services.GenderStatisticsService import GenderStatisticsService
+
+MOVIE_LOOKUP = {
+    '1': {'title': 'One', 'production_countries': ['US'], 'production_companies': ['Pixar'], 'genres': ['Animation', 'Comedy'], 'year': 1995},
+    '2': {'title': 'Two', 'production_countries': ['US', 'GB'], 'production_companies': ['Working Title'], 'genres': ['Drama'], 'year': 1999},
+    '3': {'title': 'Three', 'production_countries': ['FR'], 'production_companies': ['Pixar', 'Gaumont'], 'genres': ['Comedy'], 'year': 1995},
+    '4': {'title': 'Four', 'production_countries': [], 'production_companies': [], 'genres': [], 'year': None},
+}
+
+def credit(movie_id, cast, crew):
+    return {
+        'id': int(movie_id),
+        'cast': str([{'credit_id': f'{movie_id}c{i}', 'name': f'Actor {i}', 'gender': gender} for i, gender in enumerate(cast)]),
+        'crew': str([
+            {'credit_id': f'{movie_id}w{i}', 'name': f'Crew {i}', 'department': department, 'job': 'Job', 'gender': gender}
+            for i, (department, gender) in enumerate(crew)
+        ]),
+    }
+
+CREDITS = [
+    credit('1', [2, 2, 1, 0], [('Directing', 2), ('Writing', 1)]),
+    credit('2', [1, 1, 2], [('Directing', 1), ('Sound', 0)]),
+    credit('3', [2, 1], [('Writing', 2), ('Writing', 2), ('Sound', 1)]),
+    credit('4', [1], []),
+]
+
+OPTIONS = [
+    {},
+    {'sort': 'total'},
+    {'sort': 'value'},
+    {'sort': 'total', 'limit': 2},
+    {'sort': 'value', 'limit': 2, 'min_total': 2},
+]
+
+@pytest.fixture
+def gender_data(data_service):
+    data_service.save_gender_data(MOVIE_LOOKUP, CREDITS)
+
+@pytest.fixture
+def services(repos, gender_data):
+    aggregation_pipeline_service = AggregationPipelineService(logger)
+
+    return {
+        'pipeline': GenderStatisticsService(logger, repos['gender_data'], aggregation_pipeline_service),
+        'rollups': GenderStatisticsService(logger, repos['gender_data'], aggregation_pipeline_service, repos['gender_rollup']),
+        'engine': GenderStatisticsService(
+            logger, repos['gender_data'], aggregation_pipeline_service, engine=GenderStatisticsEngine(logger, repos['gender_data'])
+        ),
+    }
+
+def comparable(entries, options=None):
+    """
+    Entries with their breakdowns in gender order, and in value order unless the options sort them.
+    """
+    entries = [
+        {**entry, "breakdown": sorted(entry["breakdown"], key=lambda item: item["gender"])}
+        for entry in entries
+    ]
+    return entries if (options or {}).get('sort') else sorted(entries, key=lambda entry: repr(entry["_id"]))
+
+def test_bind_replaces_placeholders_without_changing_the_template():
+    template = [{"$match": {"year": {"$gte": Param("year_from")}, "countries": {"$in": Param("countries")}}}, {"$limit": Param("limit")}]
+
+    assert bind(template, {"year_from": 1995, "countries": ["US"], "limit": 5}) == [
+        {"$match": {"year": {"$gte": 1995}, "countries": {"$in": ["US"]}}}, {"$limit": 5}
+    ]
+    assert isinstance(template[1]["$limit"], Param)
+
+def test_pipelines_are_compiled_once_per_shape():
+    aggregation_pipeline_service = AggregationPipelineService(logger)
+
+    us = aggregation_pipeline_service.gender_distribution_by_country("US", sort='total', limit=5)
+    gb = aggregation_pipeline_service.gender_distribution_by_country("GB", sort='total', limit=10)
+    aggregation_pipeline_service.gender_distribution_by_country(["US", "GB"], sort='total', limit=5)
+
+    info = aggregation_pipeline_service.compile_gender_distribution.cache_info()
+    assert (info.misses, info.hits) == (2, 1)
+    assert us[0]["$match"]["countries"] == "US" and gb[0]["$match"]["countries"] == "GB"
+    assert {"$limit": 5} in us and {"$limit": 10} in gb
+
+@pytest.mark.parametrize("options", OPTIONS)
+@pytest.mark.parametrize("dimension", ['country', 'company', 'genre', 'department', 'year'])
+def test_backends_return_the_same_distributions(services, dimension, options):
+    results = {
+        backend: comparable(getattr(service, f"get_gender_statistics_by_{dimension}")(options=options), options)
+        for backend, service in services.items()
+    }
+
+    assert results['pipeline']
+    assert results['rollups'] == results['pipeline']
+    assert results['engine'] == results['pipeline']
+
+@pytest.mark.parametrize("sort", ['total', 'value'])
+@pytest.mark.parametrize("dimension", ['country', 'company', 'genre', 'department', 'year'])
+def test_cursor_pages_of_every_backend_cover_the_sorted_distribution(services, dimension, sort):
+    expected = getattr(services['pipeline'], f"get_gender_statistics_by_{dimension}")(options={'sort': sort})
+
+    for backend, service in services.items():
+        entries, after = [], None
+        while True:
+            options = {'sort': sort, 'limit': 2, **({'after': after} if after else {})}
+            page = getattr(service, f"get_gender_statistics_by_{dimension}")(options=options)
+            if not page:
+                break
+            entries.extend(page)
+            after = {"pk": page[-1]["_id"], **({"value": page[-1]["total_count"]} if sort == 'total' else {})}
+
+        assert [entry["_id"] for entry in entries] == [entry["_id"] for entry in expected], backend
+
+def test_sorted_crosstabs_put_the_largest_cells_first(services):
+    for backend in ('pipeline', 'engine'):
+        totals = [cell["total_count"] for cell in services[backend].get_gender_statistics_crosstab('country', 'department', options={'sort': 'total', 'limit': 3})]
+
+        assert len(totals) == 3
+        assert totals == sorted(totals, reverse=True), backend
+
+@pytest.mark.parametrize("dimension, value", [('country', 'US'), ('country', ['US', 'FR']), ('genre', ['Comedy', 'Drama']), ('genre', 'Comedy'), ('year', 1995), ('department', 'Nope')])
+def test_filtered_distributions_match(services, dimension, value):
+    results = {
+        backend: comparable(getattr(service, f"get_gender_statistics_by_{dimension}")(value))
+        for backend, service in services.items()
+    }
+
+    assert results['rollups'] == results['pipeline']
+    assert results['engine'] == results['pipeline']
+
+def test_distribution_counts(services):
+    by_department = {entry["_id"]: entry for entry in services['engine'].get_gender_statistics_by_department()}
+
+    # The movie without production countries is not seeded
+    assert by_department['Acting']['total_count'] == 9
+    assert by_department['Writing']['breakdown'] == [
+        {"gender": 1, "count": 1, "percentage": 1 / 3 * 100}, {"gender": 2, "count": 2, "percentage": 2 / 3 * 100}
+    ]
+
+def test_summaries_match(services):
+    summaries = {
+        backend: {dimension: comparable(entries, {'sort': 'total'}) for dimension, entries in service.get_gender_statistics_summary(options={'sort': 'total'}).items()}
+        for backend, service in services.items()
+    }
+
+    assert set(summaries['pipeline']) == {'country', 'company', 'genre', 'department', 'year'}
+    assert summaries['rollups'] == summaries['pipeline']
+    assert summaries['engine'] == summaries['pipeline']
+
+def cells(crosstab):
+    """
+    Crosstab cells with their breakdowns in gender order, in (row, column) order.
+    """
+    cells = [{**cell, "breakdown": sorted(cell["breakdown"], key=lambda item: item["gender"])} for cell in crosstab]
+    return sorted(cells, key=lambda cell: repr(sorted(cell.items())))
+
+@pytest.mark.parametrize("rows, cols", [('country', 'department'), ('genre', 'year')])
+def test_crosstabs_match(services, rows, cols):
+    crosstabs = {
+        backend: cells(service.get_gender_statistics_crosstab(rows, cols, options={'sort': 'total'}))
+        for backend, service in services.items() if backend != 'rollups'
+    }
+
+    assert crosstabs['pipeline']
+    assert crosstabs['engine'] == crosstabs['pipeline']
+
+def test_filtered_distribution_by_several_dimensions(services, db):
+    entries = services['pipeline'].get_gender_statistics_distribution(
+        ['year', 'department'], filters={'country': ['US', 'FR'], 'department': ['Acting', 'Writing']}, year_range=(1995, None), genders=[1, 2]
+    )
+
+    expected = {}
+    for statistic in db['gender_statistics'].find():
+        if set(statistic['countries']) & {'US', 'FR'} and statistic['department'] in ('Acting', 'Writing') \
+                and statistic['year'] >= 1995 and statistic['gender'] in (1, 2):
+            key = (statistic['year'], statistic['department'])
+            expected[key] = expected.get(key, 0) + 1
+
+    assert {(entry['year'], entry['department']): entry['total_count'] for entry in entries} == expected
+    # Sorted by value by default
+    assert [(entry['year'], entry['department']) for entry in entries] == sorted(expected)
+
+def test_rollup_dimensions_are_read_once_per_data_version(repos, gender_data):
+    versions = iter(["1", "2"])
+    service = GenderStatisticsService(
+        logger, repos['gender_data'], AggregationPipelineService(logger), repos['gender_rollup'], get_data_version=lambda: next(versions)
+    )
+
+    with mock.patch.object(repos['gender_rollup'], "distinct", wraps=repos['gender_rollup'].distinct) as distinct, \
+            mock.patch.object(repos['gender_rollup'], "exists") as exists:
+        service.get_gender_statistics_by_country()
+        service.get_gender_statistics_by_genre()
+        service.get_gender_statistics_summary()
+        assert distinct.call_count == 1
+
+        # A reseed changes the data version, the rollups are read again
+        service.data_version_cache.clear()
+        service.get_gender_statistics_by_year()
+        assert distinct.call_count == 2
+
+    exists.assert_not_called()
@@ -0,0 +1,35 @@
+import pytest
+from loguru import logger
+from models.MovieModel import MovieMetaData, Genre
+from services.MovieQueryService import MovieQueryService
+
+GENRES = ["Action", "Science Fiction", "Sci-Fi", "TV Movie", "Action/Adventure", "Drama (Period)", "C++ Stories", "A.I.", "50% Comedy", "Back\\Slash"]
+
+@pytest.fixture
+def query_service(repos):
+    for movie_id, genre in enumerate(GENRES):
+        MovieMetaData(movie_id=str(movie_id), title=genre, genres=[Genre(id=movie_id, name=genre)]).save()
+
+    return MovieQueryService(logger, repos['movie'], repos['credit'], repos['rating'], repos['actor'])
+
+def movie_ids(query):
+    return {movie.movie_id for movie in MovieMetaData.objects(**query)}
+
+@pytest.mark.parametrize("value", [
+    "action", "SCI", "sci-fi", "fi", ".", "A.I.", "a.i", ".*", "(", "(period)", ")", "+", "c++", "[", "|", "action|drama",
+    "/", "%", "^s", "e$", "?", "\\", "\\s", "tv movie", "none"
+])
+def test_genre_filter_matches_the_previous_regex_filter(query_service, value):
+    # The previous filter: a case insensitive substring match of the value, escaped, on genres.name
+    expected = movie_ids({'genres__name__icontains': value})
+
+    assert movie_ids(query_service.build_query('movies', {'genre': value})) == expected
+
+def test_genre_names_are_read_once(query_service, repos):
+    query_service.find_genre_names("drama")
+    MovieMetaData(movie_id="new", title="New", genres=[Genre(id=99, name="Western")]).save()
+
+    # Cached for five minutes, unless the cache is cleared by a movie write
+    assert query_service.find_genre_names("western") == []
+    query_service.clear_genre_names()
+    assert query_service.find_genre_names("western") == ["Western"]
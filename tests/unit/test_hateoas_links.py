@@ -0,0 +1,43 @@
+from urllib.parse import urlsplit, parse_qs
+import pytest
+from flask import Flask
+from loguru import logger
+from services.GenerateHateoasLinks import GenerateHateoasLinks
+
+@pytest.fixture
+def generate_hateoas_links():
+    app = Flask(__name__)
+    app.config['SERVER_NAME'] = 'localhost'
+    app.add_url_rule('/movies', 'get_movies', lambda: '')
+    return GenerateHateoasLinks(logger, app)
+
+def query(url):
+    return {key: values[0] for key, values in parse_qs(urlsplit(url).query).items()}
+
+def test_filters_are_kept_on_every_link(generate_hateoas_links):
+    links = generate_hateoas_links.create_pagination_links("get_movies", 2, 10, 35, filters={"genre": "Drama"})
+
+    assert query(links["first"]) == {"genre": "Drama", "page": "1", "per_page": "10"}
+    assert query(links["previous"]) == {"genre": "Drama", "page": "1", "per_page": "10"}
+    assert query(links["next"]) == {"genre": "Drama", "page": "3", "per_page": "10"}
+    assert query(links["last"]) == {"genre": "Drama", "page": "4", "per_page": "10"}
+
+def test_filters_named_like_pagination_parameters_are_replaced(generate_hateoas_links):
+    filters = {"page": "7", "per_page": "3", "cursor": "abc", "total": "1", "resource": "x", "next_cursor": "y"}
+    links = generate_hateoas_links.create_pagination_links("get_movies", 3, 10, 35, filters=filters)
+
+    assert query(links["first"]) == {"page": "1", "per_page": "10", "total": "1", "resource": "x", "next_cursor": "y"}
+    assert query(links["next"])["page"] == "4"
+
+def test_first_link_is_the_first_page_without_cursor(generate_hateoas_links):
+    links = generate_hateoas_links.create_pagination_links("get_movies", 4, 10, 35, filters={"cursor": "abc"})
+
+    assert query(links["first"]) == {"page": "1", "per_page": "10"}
+    assert links["next"] is None
+
+def test_cursor_links_use_the_size_parameter(generate_hateoas_links):
+    filters = {"country": "US", "limit": "5", "cursor": "abc"}
+    links = generate_hateoas_links.create_pagination_links("get_movies", None, 20, None, "def", size_param="limit", filters=filters)
+
+    assert parse_qs(urlsplit(links["first"]).query, keep_blank_values=True) == {"country": ["US"], "cursor": [""], "limit": ["20"]}
+    assert query(links["next"]) == {"country": "US", "cursor": "def", "limit": "20"}
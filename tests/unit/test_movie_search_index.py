@@ -0,0 +1,73 @@
+from unittest import mock
+import pytest
+from loguru import logger
+from models.MovieModel import MovieMetaData, Genre
+from services import MovieQueryService as movie_query_service
+from services.MovieQueryService import MovieQueryService
+from services.MovieSearchIndex import MovieSearchIndex
+
+@pytest.fixture
+def search_index(repos):
+    movies = [
+        MovieMetaData(movie_id="1", title="Toy Story", overview="Woody's toys come alive", genres=[Genre(id=16, name="Animation")]),
+        MovieMetaData(movie_id="2", title="Брат", overview="Данила приезжает в Петербург", genres=[Genre(id=80, name="Криминал")]),
+        MovieMetaData(movie_id="3", title="千と千尋の神隠し", overview="千尋 と 神々", genres=[Genre(id=14, name="ファンタジー")]),
+        MovieMetaData(movie_id="4", title="Ørneredet", overview="Łódź", genres=[Genre(id=18, name="Drama")]),
+    ]
+    for movie in movies:
+        movie.save()
+
+    search_index = MovieSearchIndex(logger, repos['movie'])
+    search_index.build()
+    return search_index
+
+def test_latin_titles_match_by_word_prefix(search_index):
+    assert search_index.find_movie_ids('title', "toy sto") == {"1"}
+    assert search_index.find_movie_ids('description', "TOYS") == {"1"}
+
+def test_non_latin_titles_and_overviews_are_indexed(search_index):
+    assert search_index.find_movie_ids('title', "брат") == {"2"}
+    assert search_index.find_movie_ids('description', "петер") == {"2"}
+    assert search_index.find_movie_ids('title', "千と千尋") == {"3"}
+    assert search_index.find_movie_ids('description', "千尋") == {"3"}
+    assert search_index.find_movie_ids('title', "ørne") == {"4"}
+    assert search_index.find_movie_ids('description', "łodz") == {"4"}
+
+def test_non_latin_genre_names_are_indexed(search_index):
+    assert search_index.find_movie_ids('genre', "криминал") == {"2"}
+    assert search_index.find_movie_ids('genre', "ファンタ") == {"3"}
+    assert search_index.find_movie_ids('genre', "dram") == {"4"}
+
+@pytest.mark.parametrize("field", ['title', 'description', 'genre'])
+@pytest.mark.parametrize("value", ["", "  ", "!?", "_"])
+def test_values_without_words_match_nothing(search_index, field, value):
+    assert search_index.find_movie_ids(field, value) == set()
+
+def test_updated_movie_replaces_its_entry(search_index):
+    movie = MovieMetaData.objects.get(movie_id="2")
+    movie.title = "Брат 2"
+    movie.genres = [Genre(id=28, name="Боевик")]
+    search_index.add_movie(movie)
+
+    assert search_index.find_movie_ids('genre', "криминал") == set()
+    assert search_index.find_movie_ids('genre', "боевик") == {"2"}
+    assert search_index.find_movie_ids('title', "брат 2") == {"2"}
+
+def test_prefix_lookups_at_the_ends_of_the_vocabulary(search_index):
+    assert search_index.find_movie_ids('title', "a") == set()
+    assert search_index.find_movie_ids('title', "ｚｚｚ") == set()
+    assert search_index.find_movie_ids('title', "t") == {"1"}
+
+def test_small_matches_are_sent_as_movie_ids(search_index, repos):
+    query_service = MovieQueryService(logger, repos['movie'], repos['credit'], repos['rating'], repos['actor'], search_index)
+
+    assert query_service.build_query('movies', {'title': "toy"}) == {'movie_id': {'$in': ["1"]}}
+
+def test_large_matches_are_filtered_in_the_database(search_index, repos):
+    query_service = MovieQueryService(logger, repos['movie'], repos['credit'], repos['rating'], repos['actor'], search_index)
+
+    with mock.patch.object(movie_query_service, "MAX_INDEX_CANDIDATES", 0):
+        query = query_service.build_query('movies', {'title': "toy", 'genre': "anim"})
+
+    assert query == {'title__icontains': "toy", 'genres__name__in': ["Animation"]}
+    assert [movie.movie_id for movie in MovieMetaData.objects(**query)] == ["1"]
@@ -0,0 +1,26 @@
+import pytest
+from loguru import logger
+from services.MovieQueryService import MovieQueryService
+
+# mongomock does not run $text queries, these tests check the queries sent to MongoDB
+
+def test_page_mode_ranks_by_text_score(repos):
+    documents = repos['movie'].find_by_query_with_pagination({'title__icontains': 'toy'}, page=2, per_page=10, search_text="toy story")
+
+    assert documents._query['$text'] == {'$search': "toy story"}
+    assert documents._query['title'].pattern == 'toy'
+    assert documents._ordering == [('_text_score', {'$meta': 'textScore'})]
+    assert (documents._skip, documents._limit) == (10, 10)
+
+def test_without_q_there_is_no_text_search(repos):
+    documents = repos['movie'].find_by_query_with_pagination({}, search_text=None)
+
+    assert '$text' not in documents._query
+
+@pytest.mark.parametrize("query_params", [{'q': "toy story"}, {'q': "toy story", 'year': "1995"}])
+def test_q_is_accepted_and_left_to_the_repository(repos, query_params):
+    query_service = MovieQueryService(logger, repos['movie'], repos['credit'], repos['rating'], repos['actor'])
+
+    query = query_service.build_query('movies', query_params)
+
+    assert 'q' not in query and '$text' not in query
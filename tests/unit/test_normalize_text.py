@@ -0,0 +1,39 @@
+import pytest
+from loguru import logger
+from utils.CustomErrors import CustomError
+from utils.normalize_text import normalize_text, tokenize_text
+from services.MovieQueryService import MovieQueryService
+
+def test_accents_and_case_are_removed():
+    assert normalize_text("Penélope  Cruz") == "penelope cruz"
+    assert normalize_text("STRASSE") == normalize_text("Straße")
+
+def test_punctuation_and_underscores_separate_words():
+    assert tokenize_text("A.J. Cook") == ["a", "j", "cook"]
+    assert tokenize_text("foo_bar") == ["foo", "bar"]
+    assert tokenize_text(" ,. ") == []
+
+def test_cyrillic_names_are_kept():
+    assert tokenize_text("Сергей Бодров") == ["сергеи", "бодров"]
+
+def test_cjk_names_are_kept():
+    assert tokenize_text("章子怡") == ["章子怡"]
+    assert tokenize_text("渡辺 謙") == ["渡辺", "謙"]
+    assert tokenize_text("배두나") == ["배두나"]
+
+def test_letters_without_decomposition_are_kept():
+    assert normalize_text("Ørnås") == "ørnas"
+    assert normalize_text("Łukasz Żebrowski") == "łukasz zebrowski"
+
+@pytest.mark.parametrize("name", ["Сергей Бодр", "章子怡", "Łukasz"])
+def test_actor_name_query_accepts_non_latin_names(name):
+    query_service = MovieQueryService(logger, None, None, None, None)
+
+    patterns = query_service.build_actor_name_query(name)["name_tokens__all"]
+    assert all(pattern.match(token) for pattern, token in zip(patterns, tokenize_text(name)))
+
+def test_actor_name_query_rejects_names_without_words():
+    query_service = MovieQueryService(logger, None, None, None, None)
+
+    with pytest.raises(CustomError):
+        query_service.build_actor_name_query("--")
@@ -0,0 +1,59 @@
+import base64
+import pytest
+from bson import ObjectId
+from loguru import logger
+from utils.CustomErrors import CustomError
+from utils.pagination_cursor import encode_cursor, decode_cursor
+from controllers.api.GenderDataController import GenderDataController
+
+@pytest.mark.parametrize("position", [
+    {"pk": ObjectId("65f0a1b2c3d4e5f6a7b8c9d0")},
+    {"pk": "862", "value": 7.5},
+    {"pk": 1995, "value": 12},
+    {"pk": "Łódź"},
+])
+def test_positions_round_trip(position):
+    assert decode_cursor(encode_cursor(position)) == position
+
+def test_tokens_are_url_safe_without_padding():
+    for pk in ["a", "ab", "abc", "a?b&c=d/e+f"]:
+        token = encode_cursor({"pk": pk})
+        assert set(token) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "!!!!", encode_cursor({"value": 1})[:-1], encode_cursor({"value": 1}), encode_cursor([1, 2])])
+def test_invalid_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def crafted(json):
+    return base64.urlsafe_b64encode(json.encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("json", [
+    '{"pk": "GB", "value": "abc"}', '{"pk": "GB", "value": null}', '{"pk": "GB", "value": true}', '{"pk": "GB", "value": NaN}',
+    '{"pk": {"$gt": ""}}', '{"pk": ["GB"]}', '{"pk": null}', '{"pk": true}', '{"pk": "GB", "extra": 1}',
+])
+def test_positions_of_the_wrong_types_raise_value_error(json):
+    with pytest.raises(ValueError):
+        decode_cursor(crafted(json))
+
+def test_crafted_cursor_is_a_bad_request():
+    gender_data_controller = GenderDataController(logger, None, None, None)
+
+    with pytest.raises(CustomError) as error:
+        gender_data_controller.parse_aggregation_options({'cursor': crafted('{"pk": "GB", "value": "abc"}')})
+    assert error.value.status_code == 400
+
+def test_cursor_pages_cover_the_collection(repos):
+    from models.MovieModel import MovieMetaData
+
+    for movie_id in range(7):
+        MovieMetaData(movie_id=str(movie_id), title=f"Movie {movie_id}").save()
+
+    movie_ids, after = [], None
+    while True:
+        page, after = repos['movie'].find_by_query_with_cursor({}, after=decode_cursor(encode_cursor(after)) if after else None, per_page=3)
+        movie_ids.extend(movie.movie_id for movie in page)
+        if not after:
+            break
+
+    assert movie_ids == [str(movie_id) for movie_id in range(7)]
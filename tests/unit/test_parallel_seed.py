@@ -0,0 +1,90 @@
+import multiprocessing
+from unittest import mock
+import mongoengine
+import mongomock
+import pytest
+from loguru import logger
+from seed import parallel_seed
+from seed.parallel_seed import partition_of, seed_credits, stream_credit_partitions
+from seed.seed_state import get_checkpoint
+from models.CreditsModel import Credit
+from models.GenderDataModel import GenderStatistics
+
+MOVIE_IDS = list(range(1, 13))
+
+@pytest.fixture
+def credits_csv(tmp_path, monkeypatch):
+    path = tmp_path / "credits.csv"
+    rows = [
+        f"\"[{{'credit_id': 'c{movie_id}', 'name': 'Actor {movie_id}', 'gender': {movie_id % 3}, 'id': {movie_id}}}]\",\"[]\",{movie_id}"
+        for movie_id in MOVIE_IDS
+    ]
+    path.write_text("cast,crew,id\n" + "\n".join(rows) + "\n")
+    monkeypatch.setenv("CREDITS_CSV", str(path))
+    monkeypatch.setenv("SEED_CHUNK_SIZE", "5")
+
+@pytest.fixture
+def movie_lookup():
+    return {
+        str(movie_id): {'title': f"Movie {movie_id}", 'production_countries': ['US'], 'production_companies': [], 'genres': [], 'year': 2000}
+        for movie_id in MOVIE_IDS
+    }
+
+def test_partitions_split_every_chunk_once(credits_csv):
+    with mock.patch.object(parallel_seed, "stream_credits", wraps=parallel_seed.stream_credits) as stream_credits:
+        chunks = list(stream_credit_partitions([0, 0, 0], 3))
+
+    # The CSV is read once for all partitions, in chunks of 5 rows
+    stream_credits.assert_called_once_with(skip_rows=0)
+    assert [(partition, offset) for partition, offset, _ in chunks] == [(partition, offset) for offset in (5, 10, 12) for partition in range(3)]
+
+    rows = [credit['id'] for _, _, credits_data in chunks for credit in credits_data]
+    assert sorted(rows) == MOVIE_IDS
+    assert all(partition_of(credit['id'], 3) == partition for partition, _, credits_data in chunks for credit in credits_data)
+
+def test_partitions_resume_from_their_own_offsets(credits_csv):
+    chunks = list(stream_credit_partitions([10, 5, 12], 3))
+
+    # Reading starts at the earliest offset, each partition only gets the chunks it has not written
+    assert [(partition, offset) for partition, offset, _ in chunks] == [(1, 10), (0, 12), (1, 12)]
+
+def test_single_process_seeding(data_service, credits_csv, movie_lookup):
+    totals = seed_credits(data_service, movie_lookup, logger)
+
+    assert totals == {"rows": 12, "credits": 12, "gender_data": 12}
+    assert GenderStatistics.objects.count() == 12
+    assert get_checkpoint("credits")["offsets"] == {"0": 12}
+
+def test_without_fork_seeding_uses_one_process(data_service, credits_csv, movie_lookup):
+    with mock.patch.object(multiprocessing, "get_all_start_methods", return_value=["spawn"]):
+        totals = seed_credits(data_service, movie_lookup, logger, mongo_uri="mongodb://localhost", workers=3)
+
+    assert totals["rows"] == 12
+    assert Credit.objects.count() == 12
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="worker processes need fork")
+def test_workers_get_the_rows_of_their_partition(data_service, credits_csv, movie_lookup):
+    heartbeat = mock.Mock()
+
+    def connect_to_database(mongo_uri):
+        # Every worker writes to its own (forked) in-memory database, the totals are what the workers reported
+        mongoengine.connect('test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient, uuidRepresentation='standard')
+
+    with mock.patch.object(parallel_seed, "connect_to_database", connect_to_database), \
+         mock.patch.object(parallel_seed, "stream_credits", wraps=parallel_seed.stream_credits) as stream_credits:
+        totals = seed_credits(data_service, movie_lookup, logger, mongo_uri="mongodb://localhost", workers=3, heartbeat=heartbeat)
+
+    stream_credits.assert_called_once()
+    assert totals == {"rows": 12, "credits": 12, "gender_data": 12}
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="worker processes need fork")
+def test_a_failed_worker_stops_the_seeding(data_service, credits_csv, movie_lookup, monkeypatch):
+    monkeypatch.setenv("SEED_CHUNK_SIZE", "1")
+
+    def connect_to_database(mongo_uri):
+        mongoengine.connect('test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient, uuidRepresentation='standard')
+
+    with mock.patch.object(parallel_seed, "connect_to_database", connect_to_database), \
+         mock.patch.object(parallel_seed.DataService, "save_credits", side_effect=RuntimeError("write failed")):
+        with pytest.raises(RuntimeError, match="write failed"):
+            seed_credits(data_service, movie_lookup, logger, mongo_uri="mongodb://localhost", workers=2)
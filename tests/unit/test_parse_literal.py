@@ -0,0 +1,39 @@
+import ast
+import pytest
+from utils.parse_literal import parse_literal
+
+# Values shaped like the stringified columns of the Kaggle CSVs (genres, production countries, cast and crew)
+SAMPLE_ROWS = [
+    "[{'id': 16, 'name': 'Animation'}, {'id': 35, 'name': 'Comedy'}, {'id': 10751, 'name': 'Family'}]",
+    "[{'iso_3166_1': 'US', 'name': 'United States of America'}]",
+    "[]",
+    "[{'cast_id': 14, 'character': 'Woody (voice)', 'credit_id': '52fe4284c3a36847f8024f95', 'gender': 2, 'id': 31, 'name': 'Tom Hanks', 'order': 0, 'profile_path': '/pQFoyx7rp09CJTAb932F2g8Nlho.jpg'}]",
+    "[{'credit_id': '52fe4284c3a36847f8024f49', 'department': 'Directing', 'gender': 2, 'id': 7879, 'job': 'Director', 'name': 'John Lasseter', 'profile_path': None}]",
+    # Double quotes around a string holding a single quote, as Python writes them
+    """[{'character': "Reese's Mother", 'name': 'Jane O\\'Brien', 'profile_path': None}]""",
+    # Escapes and non-ASCII names
+    "[{'name': 'Владимир Машков', 'job': 'Actor\\tLead'}, {'name': '成龙', 'order': 1}]",
+    # Keywords inside strings are left alone
+    "[{'character': 'None', 'name': 'True False', 'adult': False, 'video': True}]",
+    "{'nested': [1, 2.5, -3, 1e3], 'empty': {}, 'flag': None}",
+]
+
+@pytest.mark.parametrize("value", SAMPLE_ROWS)
+def test_matches_literal_eval(value):
+    assert parse_literal(value) == ast.literal_eval(value)
+
+@pytest.mark.parametrize("value", ["(1, 2)", "{1, 2}", "[b'bytes']"])
+def test_falls_back_to_literal_eval_outside_json(value):
+    assert parse_literal(value) == ast.literal_eval(value)
+
+@pytest.mark.parametrize("value", ["[NaN]", "[Infinity]", "[-Infinity]", "{'rating': NaN}", "[null]", "[true]", '{"a": false}'])
+def test_rejects_json_only_values_like_literal_eval(value):
+    with pytest.raises(ValueError):
+        ast.literal_eval(value)
+    with pytest.raises(ValueError):
+        parse_literal(value)
+
+@pytest.mark.parametrize("value", ["[{'name': 'x'", "not a literal", "[1, 2"])
+def test_invalid_values_raise(value):
+    with pytest.raises((ValueError, SyntaxError)):
+        parse_literal(value)
@@ -0,0 +1,35 @@
+import datetime
+import io
+import pandas
+
+# Rows as pandas reads them from movies_metadata.csv: a gap in the id column, unparseable numbers and dates,
+# and the Python literals of the list and dict columns
+MOVIES_CSV = """id,adult,belongs_to_collection,budget,genres,release_date,revenue,runtime,popularity,title,video,vote_average,vote_count
+862,False,"{'id': 10194, 'name': 'Toy Story Collection'}",30000000,"[{'id': 16, 'name': 'Animation'}]",1995-10-30,373554033.0,81.0,21.946943,Toy Story,False,7.7,5415.0
+,False,,0,[],,,,,Missing id,False,,
+8844,True,,/ff9qCepilowshEtG2GYWwzt2bs4.jpg,"[{'id': 12, 'name': 'Adventure'}, {'id': 14, 'name': 'Fantasy'}]",not a date,,,Beware Of Frost Bites,,False,,
+"""
+
+def test_prepare_movies(data_service):
+    movies_frame = pandas.read_csv(io.StringIO(MOVIES_CSV), low_memory=False)
+
+    toy_story, jumanji = data_service.prepare_movies(movies_frame)
+
+    # Float ids (read as floats because of the gap) are stored without a decimal part
+    assert toy_story['movie_id'] == '862'
+    assert toy_story['release_date'] == datetime.datetime(1995, 10, 30)
+    assert (toy_story['budget'], toy_story['revenue'], toy_story['runtime'], toy_story['vote_count']) == (30000000, 373554033, 81, 5415)
+    assert toy_story['popularity'] == 21.946943
+    assert toy_story['belongs_to_collection'] == {'id': 10194, 'name': 'Toy Story Collection'}
+    assert toy_story['genres'] == [{'id': 16, 'name': 'Animation'}]
+    assert (toy_story['adult'], toy_story['video']) == (False, False)
+    # Columns missing from the CSV are empty
+    assert (toy_story['homepage'], toy_story['spoken_languages']) == ("", [])
+
+    assert jumanji['movie_id'] == '8844'
+    assert jumanji['adult'] is True
+    # Unparseable values become None, 0 or empty, as the per-row parsing did
+    assert jumanji['release_date'] is None
+    assert (jumanji['budget'], jumanji['runtime'], jumanji['popularity'], jumanji['vote_average']) == (0, 0, 0.0, 0.0)
+    assert jumanji['belongs_to_collection'] == {}
+    assert [genre['name'] for genre in jumanji['genres']] == ['Adventure', 'Fantasy']
@@ -0,0 +1,43 @@
+from unittest import mock
+from models.MovieModel import MovieMetaData, RatingSummary
+from models.RatingsModel import Rating
+
+def save_movies_and_ratings():
+    MovieMetaData(movie_id="1", title="Rated", rating_summary=RatingSummary(count=1, total=1.0, mean=1.0, histogram={"1": 1})).save()
+    MovieMetaData(movie_id="2", title="Rated without summary").save()
+    MovieMetaData(movie_id="3", title="No longer rated", rating_summary=RatingSummary(count=1, total=5.0, mean=5.0, histogram={"5": 1})).save()
+    MovieMetaData(movie_id="4", title="Never rated").save()
+
+    for user_id, movie_id, rating in [(1, 1, 4.0), (2, 1, 3.5), (3, 1, 5.0), (1, 2, 2.0)]:
+        Rating(user_id=user_id, movie_id=movie_id, rating=rating, timestamp=0).save()
+
+def summary(movie_id):
+    rating_summary = MovieMetaData.objects.get(movie_id=movie_id).rating_summary
+    return rating_summary and (rating_summary.count, rating_summary.total, rating_summary.mean, rating_summary.histogram)
+
+def test_summaries_are_rebuilt_from_the_ratings(data_service):
+    save_movies_and_ratings()
+
+    assert data_service.rebuild_rating_summaries() == 2
+
+    assert summary("1") == (3, 12.5, 12.5 / 3, {"3": 1, "4": 1, "5": 1})
+    assert summary("2") == (1, 2.0, 2.0, {"2": 1})
+    assert summary("3") is None
+    assert summary("4") is None
+
+def test_rated_movies_keep_a_summary_during_the_rebuild(data_service, repos):
+    save_movies_and_ratings()
+    update_by_query = repos['movie'].update_by_query
+    summaries_at_unset = {}
+
+    def check_summaries(query, **kwargs):
+        summaries_at_unset.update({movie_id: summary(movie_id) for movie_id in ("1", "2", "3")})
+        return update_by_query(query, **kwargs)
+
+    with mock.patch.object(repos['movie'], 'update_by_query', side_effect=check_summaries):
+        data_service.rebuild_rating_summaries()
+
+    # Summaries are set before the unrated movies are unset, the rated ones are never without one
+    assert summaries_at_unset["1"][0] == 3
+    assert summaries_at_unset["2"][0] == 1
+    assert summaries_at_unset["3"] is not None and summary("3") is None
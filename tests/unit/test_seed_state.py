@@ -0,0 +1,98 @@
+import datetime
+import os
+from unittest import mock
+import pytest
+from seed import seed_state
+from seed.seed_state import (
+    describe_source, get_changed_sources, get_seed_status, acquire_seed_lock, refresh_seed_lock, SEED_STATUS_ID, SEED_LOCK_ID
+)
+
+def write_marker(db, sources):
+    db["seed_status"].insert_one({"_id": SEED_STATUS_ID, "sources": sources})
+
+def test_unchanged_source_is_not_hashed(db, tmp_path):
+    path = tmp_path / "ratings.csv"
+    path.write_text("userId,movieId,rating\n1,862,4.0\n")
+    write_marker(db, {"ratings": describe_source(str(path))})
+
+    with mock.patch.object(seed_state, "file_checksum") as file_checksum:
+        assert get_changed_sources(get_seed_status(), verify=True) == []
+        file_checksum.assert_not_called()
+
+def test_startup_check_compares_size_and_mtime_only(db, tmp_path):
+    path = tmp_path / "ratings.csv"
+    path.write_text("userId,movieId,rating\n1,862,4.0\n")
+    write_marker(db, {"ratings": describe_source(str(path))})
+    os.utime(path, (0, 1_000_000))
+
+    with mock.patch.object(seed_state, "file_checksum") as file_checksum:
+        assert get_changed_sources(get_seed_status()) == ["ratings"]
+        file_checksum.assert_not_called()
+
+def test_seed_job_hashes_a_touched_source_once(db, tmp_path):
+    path = tmp_path / "ratings.csv"
+    path.write_text("userId,movieId,rating\n1,862,4.0\n")
+    write_marker(db, {"ratings": describe_source(str(path))})
+    os.utime(path, (0, 1_000_000))
+
+    # Same content: not changed, and the new mtime is recorded
+    assert get_changed_sources(get_seed_status(), verify=True) == []
+    assert get_seed_status()["sources"]["ratings"]["mtime"] == 1_000_000
+
+    with mock.patch.object(seed_state, "file_checksum") as file_checksum:
+        assert get_changed_sources(get_seed_status()) == []
+        assert get_changed_sources(get_seed_status(), verify=True) == []
+        file_checksum.assert_not_called()
+
+def test_seed_job_detects_changed_content(db, tmp_path):
+    path = tmp_path / "ratings.csv"
+    path.write_text("userId,movieId,rating\n1,862,4.0\n")
+    write_marker(db, {"ratings": describe_source(str(path))})
+    # Same size, different content
+    path.write_text("userId,movieId,rating\n1,862,5.0\n")
+    os.utime(path, (0, 1_000_000))
+
+    assert get_changed_sources(get_seed_status(), verify=True) == ["ratings"]
+
+def test_missing_source_is_not_a_change(db, tmp_path):
+    write_marker(db, {"ratings": {"path": str(tmp_path / "missing.csv"), "size": 1, "mtime": 1, "sha256": ""}})
+
+    assert get_changed_sources(get_seed_status(), verify=True) == []
+
+def test_refresh_reports_a_lost_lock(db):
+    assert acquire_seed_lock("first")
+    assert refresh_seed_lock("first")
+
+    # The lock of the first seeder expired and a second one took it
+    db["seed_lock"].update_one({"_id": SEED_LOCK_ID}, {"$set": {"expires_at": datetime.datetime(2000, 1, 1)}})
+    assert acquire_seed_lock("second")
+
+    assert not refresh_seed_lock("first")
+    assert refresh_seed_lock("second")
+
+def test_rebuilds_send_heartbeats(data_service):
+    from models.MovieModel import MovieMetaData
+    from models.RatingsModel import Rating
+
+    for movie_id in range(120):
+        MovieMetaData(movie_id=str(movie_id), title=f"Movie {movie_id}").save()
+        Rating(user_id=1, movie_id=movie_id, rating=4.0, timestamp=0).save()
+
+    heartbeat = mock.Mock()
+    data_service.rebuild_rating_summaries(heartbeat)
+    # One heartbeat per batch of 50 summaries
+    assert heartbeat.call_count == 3
+
+    heartbeat.reset_mock()
+    data_service.rebuild_gender_rollups(heartbeat)
+    assert heartbeat.call_count >= 5
+
+def test_a_lost_lock_stops_a_rebuild(data_service):
+    from models.MovieModel import MovieMetaData
+    from models.RatingsModel import Rating
+
+    MovieMetaData(movie_id="1", title="Movie").save()
+    Rating(user_id=1, movie_id=1, rating=4.0, timestamp=0).save()
+
+    with pytest.raises(Exception):
+        data_service.rebuild_rating_summaries(mock.Mock(side_effect=RuntimeError("Seeding lock lost")))